@@ -1,37 +1,55 @@
 from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, status
-from supabase import Client
+from supabase import AsyncClient
 
-from core.supabase import require_supabase_client
+from core.supabase import SupabaseNotConfigured, get_async_supabase_client
 from schemas.user import UserBase
 from services.markets import MarketService
 from services.trades import TradeService
 from services.auth import AuthService
+from services.leaderboard import LeaderboardService
 from services.portfolio import PortfolioService
+from services.storage import Storage
+from services.storage import get_storage as _get_storage
 
 
-def get_supabase_client() -> Client:
-    return require_supabase_client()
+async def get_storage() -> Storage:
+    return await _get_storage()
 
 
-def get_auth_service(client: Client = Depends(get_supabase_client)) -> AuthService:
-    return AuthService(client)
+async def get_auth_client() -> Optional[AsyncClient]:
+    """Supabase client for auth calls, or ``None`` when running without Supabase."""
+    try:
+        return await get_async_supabase_client()
+    except SupabaseNotConfigured:
+        return None
+
+
+def get_auth_service(
+    storage: Storage = Depends(get_storage),
+    auth_client: Optional[AsyncClient] = Depends(get_auth_client),
+) -> AuthService:
+    return AuthService(storage, auth_client)
+
+
+def get_market_service(storage: Storage = Depends(get_storage)) -> MarketService:
+    return MarketService(storage)
 
 
-def get_market_service(client: Client = Depends(get_supabase_client)) -> MarketService:
-    return MarketService(client)
+def get_trade_service(storage: Storage = Depends(get_storage)) -> TradeService:
+    return TradeService(storage)
 
 
-def get_trade_service(client: Client = Depends(get_supabase_client)) -> TradeService:
-    return TradeService(client)
+def get_portfolio_service(storage: Storage = Depends(get_storage)) -> PortfolioService:
+    return PortfolioService(storage)
 
 
-def get_portfolio_service(client: Client = Depends(get_supabase_client)) -> PortfolioService:
-    return PortfolioService(client)
+def get_leaderboard_service(storage: Storage = Depends(get_storage)) -> LeaderboardService:
+    return LeaderboardService(storage)
 
 
-def get_current_user(
+async def get_current_user(
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
     auth_service: AuthService = Depends(get_auth_service),
 ) -> UserBase:
@@ -43,4 +61,4 @@ def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authorization header") from exc
     if scheme.lower() != "bearer":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unsupported authorization scheme")
-    return auth_service.get_user_from_token(token)
+    return await auth_service.get_user_from_token(token)
@@ -1,3 +1,3 @@
 """API route modules for the FastAPI application."""
 
-from . import auth, markets, trades, users  # noqa: F401
+from . import auth, leaderboard, markets, orders, trades, users  # noqa: F401
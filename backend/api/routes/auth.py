@@ -13,13 +13,13 @@ class SyncProfileRequest(BaseModel):
 
 
 @router.post("/sync-profile")
-def sync_profile(
+async def sync_profile(
     payload: SyncProfileRequest = Body(...),
     auth_service: AuthService = Depends(deps.get_auth_service),
     current_user: UserBase = Depends(deps.get_current_user),
 ) -> dict[str, str]:
     """Sync user profile after Supabase auth signup/login."""
-    auth_service._sync_profile(
+    await auth_service._sync_profile(
         user_id=current_user.id,
         email=current_user.email,
         display_name=payload.displayName,
@@ -30,5 +30,5 @@ def sync_profile(
 
 
 @router.get("/me", response_model=UserBase)
-def get_current_user(user: UserBase = Depends(deps.get_current_user)) -> UserBase:
+async def get_current_user(user: UserBase = Depends(deps.get_current_user)) -> UserBase:
     return user
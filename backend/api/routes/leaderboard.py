@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+
+from api import deps
+from core.config import settings
+from schemas.leaderboard import LeaderboardEntry, LeaderboardResponse
+from schemas.user import UserBase
+from services.leaderboard import LeaderboardService
+
+router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
+
+
+@router.get("", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    limit: int = Query(default=settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    offset: int = Query(default=0, ge=0),
+    service: LeaderboardService = Depends(deps.get_leaderboard_service),
+) -> LeaderboardResponse:
+    return await service.get_leaderboard(limit=limit, offset=offset)
+
+
+@router.get("/me", response_model=LeaderboardEntry)
+async def get_my_standing(
+    current_user: UserBase = Depends(deps.get_current_user),
+    service: LeaderboardService = Depends(deps.get_leaderboard_service),
+) -> LeaderboardEntry:
+    return await service.get_standing(current_user.id)
@@ -1,46 +1,150 @@
-from typing import Optional
+import asyncio
+from datetime import datetime
+from typing import Optional, Union
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
 
 from api import deps
-from schemas.market import MarketCreate, MarketListResponse, MarketUpdate, MarketWithQuote
+from core.config import settings
+from core.http_cache import not_modified, not_modified_response, set_validators
+from core.pagination import parse_fields, sparse_response
+from core.responses import ORJSONResponse
+from schemas.market import (
+    CandleInterval,
+    MarketCreate,
+    MarketHistoryResponse,
+    MarketListResponse,
+    MarketUpdate,
+    MarketWithQuote,
+    QuoteStreamRequest,
+)
+from schemas.order import OrderBookSnapshot
 from schemas.user import UserBase
 from services.markets import MarketService
+from services.order_book import order_book
+from services.quote_stream import QuoteSubscription, quote_broker, quote_message
 
 router = APIRouter(prefix="/markets", tags=["markets"])
 
 
 @router.get("", response_model=MarketListResponse)
-def list_markets(
+async def list_markets(
+    request: Request,
     category: Optional[str] = Query(default=None),
     status_filter: Optional[str] = Query(default=None, alias="status"),
+    limit: int = Query(default=settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    cursor: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None, description="Comma-separated MarketWithQuote fields to return"),
     service: MarketService = Depends(deps.get_market_service),
-) -> MarketListResponse:
-    return service.list_markets(category=category, status_filter=status_filter)
+) -> Response:
+    selected = parse_fields(fields, MarketWithQuote)
+    page = await service.list_markets(category=category, status_filter=status_filter, limit=limit, cursor=cursor)
+    etag = service.list_etag(page, sorted(selected or ()))
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response = sparse_response(page, selected) if selected else ORJSONResponse(page)
+    set_validators(response, etag)
+    return response
 
 
 @router.post("", response_model=MarketWithQuote, status_code=status.HTTP_201_CREATED)
-def create_market(
+async def create_market(
     payload: MarketCreate,
     service: MarketService = Depends(deps.get_market_service),
     _: UserBase = Depends(deps.get_current_user),
 ) -> MarketWithQuote:
-    return service.create_market(payload)
+    return await service.create_market(payload)
+
+
+@router.websocket("/stream")
+async def stream_quotes(websocket: WebSocket, service: MarketService = Depends(deps.get_market_service)) -> None:
+    """Push quote updates for subscribed markets.
+
+    Clients send ``{"action": "subscribe" | "unsubscribe", "marketIds": [...]}``. Each
+    subscribe is answered with the current quotes, followed by a ``quote`` message whenever
+    a trade or an update moves a subscribed market. A connection follows at most
+    ``QUOTE_STREAM_MAX_MARKETS`` markets.
+    """
+    await websocket.accept()
+    subscription = QuoteSubscription()
+    forwarder = asyncio.create_task(_forward_quotes(websocket, subscription))
+    try:
+        while True:
+            try:
+                message = QuoteStreamRequest.model_validate(await websocket.receive_json())
+            except (ValidationError, ValueError, TypeError):
+                await websocket.send_json({"type": "error", "detail": "Malformed subscription message"})
+                continue
+            action = message.action
+            market_ids = [str(market_id) for market_id in message.market_ids]
+
+            if action == "subscribe":
+                if len(subscription.market_ids.union(market_ids)) > settings.quote_stream_max_markets:
+                    detail = f"At most {settings.quote_stream_max_markets} markets per connection"
+                    await websocket.send_json({"type": "error", "detail": detail})
+                    continue
+                quote_broker.subscribe(subscription, market_ids, service)
+                for market in (await service.get_markets(market_ids)).values():
+                    subscription.push(market.id, quote_message(market))
+            elif action == "unsubscribe":
+                quote_broker.unsubscribe(subscription, market_ids)
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown action: {action}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        quote_broker.unsubscribe(subscription)
+        forwarder.cancel()
+
+
+async def _forward_quotes(websocket: WebSocket, subscription: QuoteSubscription) -> None:
+    while True:
+        for message in await subscription.next_batch():
+            await websocket.send_json(message)
 
 
 @router.get("/{market_id}", response_model=MarketWithQuote)
-def get_market(
+async def get_market(
     market_id: str,
+    request: Request,
+    response: Response,
     service: MarketService = Depends(deps.get_market_service),
-) -> MarketWithQuote:
-    return service.get_market(market_id)
+) -> Union[MarketWithQuote, Response]:
+    market = await service.get_market(market_id)
+    etag = service.market_etag(market)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    set_validators(response, etag)
+    return market
+
+
+@router.get("/{market_id}/history", response_model=MarketHistoryResponse)
+async def get_market_history(
+    market_id: str,
+    interval: CandleInterval = Query(default="1h"),
+    start: Optional[datetime] = Query(default=None, alias="from", description="Earliest candle start, inclusive"),
+    end: Optional[datetime] = Query(default=None, alias="to", description="Latest candle start, exclusive"),
+    limit: int = Query(default=settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    service: MarketService = Depends(deps.get_market_service),
+) -> MarketHistoryResponse:
+    """OHLCV candles of the YES price; the most recent ``limit`` in range, oldest first."""
+    return await service.get_history(market_id, interval=interval, start=start, end=end, limit=limit)
+
+
+@router.get("/{market_id}/book", response_model=OrderBookSnapshot)
+async def get_order_book(market_id: str) -> OrderBookSnapshot:
+    """Resting limit orders on the market, aggregated per price level."""
+    return OrderBookSnapshot.model_validate(await order_book.snapshot(market_id))
 
 
 @router.patch("/{market_id}", response_model=MarketWithQuote)
-def update_market(
+async def update_market(
     market_id: str,
     payload: MarketUpdate,
     service: MarketService = Depends(deps.get_market_service),
     _: UserBase = Depends(deps.get_current_user),
 ) -> MarketWithQuote:
-    return service.update_market(market_id, payload)
+    market = await service.update_market(market_id, payload)
+    quote_broker.notify(market_id, service)
+    return market
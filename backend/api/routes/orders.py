@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, status
+
+from api import deps
+from schemas.order import RestingOrderRecord
+from schemas.trade import OrderResult, TradeCreate, TradeCreateRequest
+from schemas.user import UserBase
+from services.trades import TradeService
+
+router = APIRouter(prefix="/orders", tags=["orders"])
+
+
+@router.post("", response_model=OrderResult, status_code=status.HTTP_201_CREATED)
+async def place_order(
+    payload: TradeCreateRequest,
+    trade_service: TradeService = Depends(deps.get_trade_service),
+    user: UserBase = Depends(deps.get_current_user),
+) -> OrderResult:
+    """Fill an order from the order book, then the market maker; limit remainders rest on the book."""
+    order = TradeCreate(
+        user_id=user.id,
+        market_id=payload.market_id,
+        side=payload.side,
+        stake=payload.stake,
+        limit_price_cents=payload.limit_price_cents,
+    )
+    return await trade_service.place_order(order)
+
+
+@router.get("", response_model=list[RestingOrderRecord])
+async def list_orders(
+    user: UserBase = Depends(deps.get_current_user),
+    trade_service: TradeService = Depends(deps.get_trade_service),
+) -> list[RestingOrderRecord]:
+    """The caller's resting limit orders, oldest first."""
+    return await trade_service.list_resting_orders(user.id)
+
+
+@router.delete("/{order_id}", response_model=RestingOrderRecord)
+async def cancel_order(
+    order_id: str,
+    user: UserBase = Depends(deps.get_current_user),
+    trade_service: TradeService = Depends(deps.get_trade_service),
+) -> RestingOrderRecord:
+    return await trade_service.cancel_order(user.id, order_id)
@@ -1,9 +1,23 @@
-from typing import Optional
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Literal, Optional
 
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 
 from api import deps
-from schemas.trade import TradeCreate, TradeCreateRequest, TradeListResponse, TradeRecord
+from core.config import settings
+from core.pagination import parse_fields
+from core.responses import ORJSONResponse
+from schemas.trade import (
+    TradeBatchRequest,
+    TradeBatchResponse,
+    TradeCreate,
+    TradeCreateRequest,
+    TradeListResponse,
+    TradeRecord,
+)
 from schemas.user import UserBase
 from services.trades import TradeService
 
@@ -11,20 +25,48 @@ router = APIRouter(prefix="/trades", tags=["trades"])
 
 
 @router.get("", response_model=TradeListResponse)
-def list_trades(
+async def list_trades(
     market_id: Optional[str] = Query(default=None, alias="marketId"),
+    limit: int = Query(default=settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    cursor: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None, description="Comma-separated TradeRecord fields to return"),
     user: UserBase = Depends(deps.get_current_user),
     trade_service: TradeService = Depends(deps.get_trade_service),
-) -> TradeListResponse:
-    return trade_service.list_trades(user_id=user.id, market_id=market_id)
+) -> ORJSONResponse:
+    selected = parse_fields(fields, TradeRecord)
+    page = await trade_service.list_trades(
+        user_id=user.id, market_id=market_id, limit=limit, cursor=cursor, fields=selected
+    )
+    return ORJSONResponse(page)
+
+
+@router.get("/export")
+async def export_trades(
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    market_id: Optional[str] = Query(default=None, alias="marketId"),
+    user: UserBase = Depends(deps.get_current_user),
+    trade_service: TradeService = Depends(deps.get_trade_service),
+) -> StreamingResponse:
+    """Stream the caller's full trade history as NDJSON or CSV."""
+    pages = trade_service.iter_trades(user_id=user.id, market_id=market_id)
+    if export_format == "csv":
+        body, media_type = _csv_lines(pages), "text/csv"
+    else:
+        body, media_type = _ndjson_lines(pages), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="trades.{export_format}"'},
+    )
 
 
 @router.post("", response_model=TradeRecord, status_code=status.HTTP_201_CREATED)
-def place_trade(
+async def place_trade(
     payload: TradeCreateRequest,
     trade_service: TradeService = Depends(deps.get_trade_service),
     user: UserBase = Depends(deps.get_current_user),
 ) -> TradeRecord:
+    """Trade with the market maker; POST /orders also matches the order book and rests limit orders."""
     # Create TradeCreate with userId from authenticated user
     trade_data = TradeCreate(
         user_id=user.id,
@@ -33,4 +75,32 @@ def place_trade(
         stake=payload.stake,
         limit_price_cents=payload.limit_price_cents,  # Use Python field name
     )
-    return trade_service.place_trade(trade_data)
+    return await trade_service.place_trade(trade_data)
+
+
+@router.post("/batch", response_model=TradeBatchResponse)
+async def place_trades(
+    payload: TradeBatchRequest,
+    trade_service: TradeService = Depends(deps.get_trade_service),
+    user: UserBase = Depends(deps.get_current_user),
+) -> TradeBatchResponse:
+    """Place many orders at once; per-order outcomes are returned in submission order."""
+    return await trade_service.place_trades(user.id, payload.trades)
+
+
+async def _ndjson_lines(pages: AsyncIterator[list[dict[str, Any]]]) -> AsyncIterator[str]:
+    async for page in pages:
+        yield "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in page)
+
+
+async def _csv_lines(pages: AsyncIterator[list[dict[str, Any]]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=[info.alias or name for name, info in TradeRecord.model_fields.items()])
+    writer.writeheader()
+    async for page in pages:
+        writer.writerows(page)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -10,21 +10,21 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me/profile", response_model=UserProfile)
-def get_my_profile(
+async def get_my_profile(
     current_user: UserBase = Depends(deps.get_current_user),
     auth_service: AuthService = Depends(deps.get_auth_service),
 ) -> UserProfile:
-    return auth_service.get_profile(current_user.id)
+    return await auth_service.get_profile(current_user.id)
 
 
 @router.get("/{user_id}/profile", response_model=UserProfile)
-def get_user_profile(user_id: str, auth_service: AuthService = Depends(deps.get_auth_service)) -> UserProfile:
-    return auth_service.get_profile(user_id)
+async def get_user_profile(user_id: str, auth_service: AuthService = Depends(deps.get_auth_service)) -> UserProfile:
+    return await auth_service.get_profile(user_id)
 
 
 @router.get("/me/portfolio", response_model=PortfolioSnapshot)
-def get_my_portfolio(
+async def get_my_portfolio(
     current_user: UserBase = Depends(deps.get_current_user),
     portfolio_service: PortfolioService = Depends(deps.get_portfolio_service),
 ) -> PortfolioSnapshot:
-    return portfolio_service.get_portfolio(current_user.id)
+    return await portfolio_service.get_portfolio(current_user.id)
@@ -0,0 +1 @@
+"""Offline benchmarks for backend hot paths."""
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark bursts of identical concurrent reads with and without single-flight coalescing.
+
+Seeds a SQLite storage that waits ``--latency-ms`` per round-trip, as a remote database
+would, and turns the quote cache off so every request misses it, as all of them do right
+after a trade invalidates a hot market. Then fires bursts of concurrent
+``GET /markets/{id}`` and ``GET /markets`` for the same market and page, each burst once
+with coalescing off (``READ_COALESCING_ENABLED=false``) and once with it on. Reports
+storage round-trips, wall time per burst, and how many reads actually ran and how many
+requests joined one already in flight; requests that arrive after a read finished start
+the next. Fails unless every request is either a read or coalesced into one, storage is
+read once per read that ran, and both modes serve the same bodies.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import deps
+from benchmarks.counting_storage import counting_storage
+from benchmarks.load_test import seed
+from core import metrics
+from main import create_app
+from services.markets import market_reads, page_reads, quote_cache
+from services.storage import Storage, create_sqlite_storage
+
+BURSTS = (1, 10, 100, 500)
+
+
+async def run(markets: int, bursts: list[int], latency_ms: float, page_size: int) -> None:
+    quote_cache.max_entries = 0
+    raw_storage = create_sqlite_storage(":memory:")
+    market_ids, _ = await seed(raw_storage, markets, 5, markets * 5, random.Random(42))
+    storage, counter = counting_storage(raw_storage, latency_seconds=latency_ms / 1000)
+    app = create_app()
+
+    async def override_storage() -> Storage:
+        return storage
+
+    app.dependency_overrides[deps.get_storage] = override_storage
+    paths = {
+        ("GET /markets/{id}", "market"): f"/markets/{market_ids[0]}",
+        ("GET /markets", "market_page"): f"/markets?limit={page_size}",
+    }
+    print(f"Markets: {markets}, {latency_ms:g} ms per storage round-trip, quote cache off\n")
+    print(
+        f"{'endpoint':<18} {'burst':>6} {'trips off':>10} {'trips on':>9} {'ms off':>8} {'ms on':>8} "
+        f"{'reads':>6} {'coalesced':>10}"
+    )
+
+    ok = True
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench-coalescing") as client:
+        for (name, read), path in paths.items():
+            await client.get(path)
+            for burst in bursts:
+                results = {}
+                for enabled in (False, True):
+                    market_reads.enabled = page_reads.enabled = enabled
+                    flights_before = metrics.read_flights.value(read)
+                    coalesced_before = metrics.coalesced_reads.value(read)
+                    counter.reset()
+                    started = time.perf_counter()
+                    responses = await asyncio.gather(*(client.get(path) for _ in range(burst)))
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    flights = metrics.read_flights.value(read) - flights_before
+                    coalesced = metrics.coalesced_reads.value(read) - coalesced_before
+                    bodies = {response.content for response in responses}
+                    ok = ok and all(response.status_code == 200 for response in responses) and len(bodies) == 1
+                    results[enabled] = (counter.round_trips, elapsed_ms, flights, coalesced, bodies)
+
+                (trips_off, ms_off, _, _, bodies_off), (trips_on, ms_on, flights, coalesced, bodies_on) = (
+                    results.values()
+                )
+                ok = ok and bodies_off == bodies_on and flights + coalesced == burst
+                ok = ok and trips_on == flights * (trips_off // burst)
+                print(
+                    f"{name:<18} {burst:>6} {trips_off:>10} {trips_on:>9} {ms_off:>8.1f} {ms_on:>8.1f} "
+                    f"{flights:>6.0f} {coalesced:>10.0f}"
+                )
+
+    if not ok:
+        print("\n✗ Coalesced requests were not accounted for by the reads that ran, or got different bodies")
+        sys.exit(1)
+    print("\n✓ Coalesced requests shared the reads in flight and got the same bodies as uncoalesced ones")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=200)
+    parser.add_argument("--bursts", type=int, nargs="+", default=list(BURSTS))
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.markets, args.bursts, args.latency_ms, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
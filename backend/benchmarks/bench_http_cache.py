@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark conditional GETs of GET /markets and GET /markets/{id}.
+
+Seeds a SQLite storage and polls both endpoints the way a browser or CDN revalidates:
+once for the ETag, then repeatedly with ``If-None-Match``. Compares µs per request and
+storage round-trips of full responses, with the quote cache off so every one reprices,
+with 304s, with the quote cache on as in production. ETags are built from the quoted
+body, so a 304 still reads what the quote cache does not hold: nothing for a market, the
+page's rows for a list. Fails unless revalidations do no more storage work than that, and
+a trade changes the ETag of the market it moved and of the page listing it.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import deps
+from benchmarks.counting_storage import counting_storage
+from benchmarks.load_test import BENCH_JWT_SECRET, mint_token, seed
+from core.config import settings
+from main import create_app
+from services.markets import quote_cache
+from services.storage import Storage, create_sqlite_storage
+
+
+async def poll(client: httpx.AsyncClient, path: str, headers: dict[str, str], repeat: int) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        response = await client.get(path, headers=headers)
+    return (time.perf_counter() - started) / repeat * 1e6, response.status_code
+
+
+async def run(markets: int, page_size: int, repeat: int) -> None:
+    if not settings.supabase_jwt_secret:
+        settings.supabase_jwt_secret = BENCH_JWT_SECRET
+    raw_storage = create_sqlite_storage(":memory:")
+    _, user_ids = await seed(raw_storage, markets, 5, markets * 5, random.Random(42))
+    storage, counter = counting_storage(raw_storage)
+    app = create_app()
+
+    async def override_storage() -> Storage:
+        return storage
+
+    app.dependency_overrides[deps.get_storage] = override_storage
+    print(f"Markets: {markets}, page size: {page_size}, {repeat} polls per row\n")
+    print(f"{'endpoint':<22} {'200 µs':>9} {'trips':>6} {'304 µs':>9} {'trips':>6} {'speed-up':>9}")
+
+    max_entries = quote_cache.max_entries
+    etags = {}
+    ok = True
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench-http-cache") as client:
+        # Trade a market on the polled page, so the page's ETag has to move too
+        page = (await client.get(f"/markets?limit={page_size}")).json()["items"]
+        traded, untouched = page[0]["id"], page[1]["id"]
+        # Storage round-trips a revalidation may still need once the quote cache is warm
+        paths = {
+            "GET /markets": (f"/markets?limit={page_size}", 1),
+            "GET /markets/{id}": (f"/markets/{traded}", 0),
+        }
+        for name, (path, allowed_trips) in paths.items():
+            quote_cache.max_entries = 0
+            quote_cache.clear()
+            etags[name] = (await client.get(path)).headers["etag"]
+            counter.reset()
+            full_us, _ = await poll(client, path, {}, repeat)
+            full_trips = counter.round_trips / repeat
+            quote_cache.max_entries = max_entries
+            await client.get(path)
+            counter.reset()
+            cached_us, status = await poll(client, path, {"If-None-Match": etags[name]}, repeat)
+            cached_trips = counter.round_trips / repeat
+            ok = ok and status == 304 and cached_trips <= allowed_trips
+            print(
+                f"{name:<22} {full_us:>9.1f} {full_trips:>6g} {cached_us:>9.1f} {cached_trips:>6g} "
+                f"{full_us / cached_us:>8.1f}x"
+            )
+
+        auth = {"Authorization": f"Bearer {mint_token(user_ids[0])}"}
+        await client.post("/trades", json={"marketId": traded, "side": "YES", "stake": 25}, headers=auth)
+        for name, (path, _) in paths.items():
+            response = await client.get(path, headers={"If-None-Match": etags[name]})
+            ok = ok and response.status_code == 200 and response.headers["etag"] != etags[name]
+        etag = (await client.get(f"/markets/{untouched}")).headers["etag"]
+        response = await client.get(f"/markets/{untouched}", headers={"If-None-Match": etag})
+        ok = ok and response.status_code == 304
+
+    if not ok:
+        print("\n✗ Conditional GETs did not track market changes")
+        sys.exit(1)
+    print("\n✓ Unchanged markets revalidate from the quote cache; a trade moves the ETags it should")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=300)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.markets, args.page_size, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
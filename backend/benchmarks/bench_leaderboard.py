@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark the leaderboard against ranking traders by valuing every portfolio.
+
+Seeds markets, traders and trades into SQLite, then ranks everyone the only way that was
+possible before: PortfolioService.get_portfolio per trader, sorted by unrealised P&L.
+Compares that with building the leaderboard once, reading the top page and looking up
+single ranks, and rebuilding it after more trades land in storage. Fails unless both
+rankings agree on every trader's P&L and position, and the rebuild counts the new trades.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.counting_storage import counting_storage
+from services.leaderboard import LeaderboardService, leaderboard
+from services.portfolio import PortfolioService
+from services.storage import Storage, create_sqlite_storage
+
+
+async def seed(storage: Storage, markets: int, users: int, trades: int, rng: random.Random) -> tuple[list[str], list[str]]:
+    market_ids = []
+    for index in range(markets):
+        market = await storage.markets.insert(
+            {
+                "question": f"Leaderboard market #{index}?",
+                "category": "Benchmark",
+                "resolution_date": "2030-01-01T00:00:00+00:00",
+                "baseline_probability": rng.uniform(0.1, 0.9),
+                "initial_liquidity": 500.0,
+            }
+        )
+        market_ids.append(market["id"])
+
+    user_ids = [f"leaderboard-user-{index}" for index in range(users)]
+    await storage.profiles.upsert_many(
+        [{"id": user_id, "email": f"{user_id}@example.com", "display_name": user_id} for user_id in user_ids]
+    )
+    await storage.trades.insert_many([random_trade(rng, market_ids, user_ids) for _ in range(trades)])
+    return market_ids, user_ids
+
+
+def random_trade(rng: random.Random, market_ids: list[str], user_ids: list[str]) -> dict:
+    price = round(rng.uniform(5.0, 95.0), 2)
+    stake = round(rng.uniform(1.0, 100.0), 2)
+    return {
+        "id": f"{rng.getrandbits(64):016x}",
+        "user_id": rng.choice(user_ids),
+        "market_id": rng.choice(market_ids),
+        "side": rng.choice(["YES", "NO"]),
+        "price_cents": price,
+        "shares": round(stake / price * 100.0, 4),
+        "stake": stake,
+    }
+
+
+async def run(markets: int, users: int, trades: int, top: int, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    raw_storage = create_sqlite_storage(":memory:")
+    market_ids, user_ids = await seed(raw_storage, markets, users, trades, rng)
+    storage, counter = counting_storage(raw_storage)
+    print(f"Markets: {markets}, traders: {users}, trades: {trades}\n")
+
+    counter.reset()
+    started = time.perf_counter()
+    portfolios = PortfolioService(storage)
+    pnl = {user_id: (await portfolios.get_portfolio(user_id)).summary.unrealised_pnl for user_id in user_ids}
+    naive_ms = (time.perf_counter() - started) * 1000
+    print(f"portfolio per trader: {counter.round_trips:>6} round-trips  {naive_ms:9.2f} ms")
+
+    service = LeaderboardService(storage)
+    counter.reset()
+    started = time.perf_counter()
+    await leaderboard.load(storage)
+    load_ms = (time.perf_counter() - started) * 1000
+    print(f"   leaderboard build: {counter.round_trips:>6} round-trips  {load_ms:9.2f} ms")
+
+    counter.reset()
+    started = time.perf_counter()
+    page = await service.get_leaderboard(limit=top)
+    top_ms = (time.perf_counter() - started) * 1000
+    print(f"     top {top:<4} read: {counter.round_trips:>6} round-trips  {top_ms:9.2f} ms")
+
+    started = time.perf_counter()
+    ranks = {user_id: leaderboard.standing(user_id)[0] for user_id in user_ids}
+    rank_us = (time.perf_counter() - started) / len(user_ids) * 1e6
+    print(f"         rank lookup: {rank_us:>9.2f} µs")
+    standings = {user_id: round(leaderboard.standing(user_id)[1].pnl, 2) for user_id in user_ids}
+
+    recorded = sum(leaderboard.standing(user_id)[1].trades for user_id in user_ids)
+    incoming = [{**random_trade(rng, market_ids, user_ids), "id": f"new-{index}"} for index in range(trades // 10)]
+    await raw_storage.trades.insert_many(incoming)
+    counter.reset()
+    started = time.perf_counter()
+    await leaderboard.rebuild(storage)
+    rebuild_ms = (time.perf_counter() - started) * 1000
+    label = f"+{len(incoming)} trades rebuild"
+    print(f"{label:>20}: {counter.round_trips:>6} round-trips  {rebuild_ms:9.2f} ms")
+    rebuilt = sum(standing.trades for _, standing in leaderboard.top(0, len(leaderboard)))
+
+    # Portfolio P&L is rounded to the cent, so near-ties may legitimately swap places
+    by_rank = sorted(user_ids, key=ranks.__getitem__)
+    agree = sorted(ranks.values()) == list(range(1, users + 1))
+    agree = agree and [entry.user_id for entry in page.entries] == by_rank[:top]
+    agree = agree and all(abs(standings[user_id] - pnl[user_id]) <= 0.01 for user_id in user_ids)
+    agree = agree and all(pnl[better] >= pnl[worse] - 0.01 for better, worse in zip(by_rank, by_rank[1:]))
+    agree = agree and recorded == trades and rebuilt == trades + len(incoming)
+    if not agree:
+        print("\n✗ Leaderboard ranking differs from per-portfolio valuation")
+        sys.exit(1)
+    print(f"\n✓ Leaderboard ranks all {users} traders the same as valuing each portfolio")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=50)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--trades", type=int, default=50_000)
+    parser.add_argument("--top", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.markets, args.users, args.trades, args.top, args.seed))
+
+
+if __name__ == "__main__":
+    main()
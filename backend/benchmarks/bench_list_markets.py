@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark MarketService.list_markets against the in-memory Supabase stand-in.
+
+Compares the per-market depth lookup (one trades query per market) with the batched
+depth path and reports database round-trips and wall time for each.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.memory_supabase import MemorySupabase, seed_store
+from schemas.market import MarketListResponse
+from services.markets import MarketService, quote_cache
+from services.storage import create_supabase_storage
+
+
+async def list_markets_per_market(service: MarketService, limit: int) -> MarketListResponse:
+    """The pre-batching path: one depth query per listed market."""
+    records = await service.storage.markets.page(category=None, status=None, limit=limit, after=None)
+    items = []
+    for record in records:
+        depths = await service._market_depths([record["id"]])
+        items.append(service._attach_quote(record, depths[record["id"]]))
+    return MarketListResponse(items=items, count=len(items))
+
+
+async def run(markets: int, trades_per_market: int) -> None:
+    store = MemorySupabase()
+    seed_store(store, markets, trades_per_market)
+    service = MarketService(create_supabase_storage(store))
+
+    print(f"Markets: {markets}, trades per market: {trades_per_market}\n")
+    results = {}
+    for label, call in (
+        ("per-market", lambda: list_markets_per_market(service, markets)),
+        ("batched", lambda: service.list_markets(limit=markets)),
+    ):
+        store.reset_counters()
+        quote_cache.clear()
+        started = time.perf_counter()
+        response = await call()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        results[label] = response
+        print(f"{label:>11}: {store.round_trips:>5} round-trips  {elapsed_ms:9.2f} ms  ({response.count} markets)")
+
+    per_market = {item.id: item.quote.yes_price_cents for item in results["per-market"].items}
+    batched = {item.id: item.quote.yes_price_cents for item in results["batched"].items}
+    if per_market != batched:
+        print("\n✗ Batched quotes differ from per-market quotes")
+        sys.exit(1)
+    print("\n✓ Batched quotes match per-market quotes")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=300)
+    parser.add_argument("--trades-per-market", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.markets, args.trades_per_market))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark reading price history from pre-aggregated candles against replaying trades.
+
+Seeds one market's trades into SQLite in shuffled timestamp order, then times
+MarketService.get_history against paging the full trade history and bucketing it in
+Python, which is what a chart had to do before candles existed. Also reports what the
+candle trigger adds to bulk trade inserts, and fails unless the candles match the replay.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.counting_storage import counting_storage
+from services.markets import MarketService
+from services.storage import Storage, create_sqlite_storage
+from services.trades import TradeService
+
+TRUNCATE = {
+    "1m": lambda moment: moment.replace(second=0, microsecond=0),
+    "1h": lambda moment: moment.replace(minute=0, second=0, microsecond=0),
+    "1d": lambda moment: moment.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+
+def generate_trades(market_id: str, count: int, days: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    trades = []
+    for _ in range(count):
+        price = round(rng.uniform(5.0, 95.0), 2)
+        stake = round(rng.uniform(1.0, 250.0), 2)
+        trades.append(
+            {
+                "user_id": f"history-user-{rng.randrange(50)}",
+                "market_id": market_id,
+                "side": rng.choice(["YES", "NO"]),
+                "price_cents": price,
+                "shares": round(stake / price * 100.0, 4),
+                "stake": stake,
+                "created_at": (start + timedelta(seconds=rng.uniform(0, days * 86400))).isoformat(
+                    timespec="microseconds"
+                ),
+            }
+        )
+    return trades
+
+
+async def seeded_storage(trades: int, days: int, seed: int, history: bool) -> tuple[Storage, str, float]:
+    """Storage holding one market's trades, and the seconds their bulk insert took."""
+    storage = create_sqlite_storage(":memory:")
+    if not history:
+        storage.trades.db.execute("DROP TRIGGER record_market_price")
+    market = await storage.markets.insert(
+        {"question": "History benchmark?", "category": "Benchmark", "resolution_date": "2031-01-01T00:00:00+00:00"}
+    )
+    rows = generate_trades(market["id"], trades, days, seed)
+    started = time.perf_counter()
+    for offset in range(0, len(rows), 5000):
+        await storage.trades.insert_many(rows[offset : offset + 5000])
+    return storage, market["id"], time.perf_counter() - started
+
+
+async def replay_candles(service: TradeService, market_id: str, interval: str) -> list[tuple]:
+    """Candles rebuilt from the full trade history: (start, open, high, low, close, trades)."""
+    rows = [row async for page in service.iter_trades(market_id=market_id) for row in page]
+    rows.sort(key=lambda row: row["createdAt"])
+    buckets: dict[datetime, list[Any]] = {}
+    for row in rows:
+        price = row["priceCents"] if row["side"] == "YES" else 100.0 - row["priceCents"]
+        start = TRUNCATE[interval](datetime.fromisoformat(row["createdAt"]))
+        bucket = buckets.setdefault(start, [start, price, price, price, price, 0])
+        bucket[2], bucket[3], bucket[4] = max(bucket[2], price), min(bucket[3], price), price
+        bucket[5] += 1
+    return [tuple(bucket) for _, bucket in sorted(buckets.items())]
+
+
+async def run(trades: int, days: int, interval: str, seed: int) -> None:
+    raw_storage, market_id, insert_with = await seeded_storage(trades, days, seed, history=True)
+    _, _, insert_without = await seeded_storage(trades, days, seed, history=False)
+    storage, counter = counting_storage(raw_storage)
+    limit = days * {"1m": 1440, "1h": 24, "1d": 1}[interval]
+
+    print(f"Trades: {trades} over {days} days, interval {interval}\n")
+    print(
+        f"bulk insert: {insert_without * 1000:9.2f} ms without candles, {insert_with * 1000:9.2f} ms with "
+        f"({(insert_with - insert_without) / trades * 1e6:.1f} µs per trade)"
+    )
+
+    counter.reset()
+    started = time.perf_counter()
+    history = await MarketService(storage).get_history(market_id, interval=interval, limit=limit)
+    history_ms = (time.perf_counter() - started) * 1000
+    history_trips = counter.round_trips
+
+    counter.reset()
+    started = time.perf_counter()
+    replayed = await replay_candles(TradeService(storage), market_id, interval)
+    replay_ms = (time.perf_counter() - started) * 1000
+
+    print(f"    candles: {history_trips:>5} round-trips  {history_ms:9.2f} ms  ({len(history.candles)} candles)")
+    print(f"     replay: {counter.round_trips:>5} round-trips  {replay_ms:9.2f} ms  ({replay_ms / history_ms:.1f}x)")
+
+    served = [
+        (candle.start, candle.open, candle.high, candle.low, candle.close, candle.trades) for candle in history.candles
+    ]
+    if served != replayed:
+        print("\n✗ Candles differ from the trade replay")
+        sys.exit(1)
+    print("\n✓ Candles match the trade replay")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trades", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--interval", choices=sorted(TRUNCATE), default="1h")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.trades, args.days, args.interval, args.seed))
+
+
+if __name__ == "__main__":
+    main()
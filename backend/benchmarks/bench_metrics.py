@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of request instrumentation (METRICS_ENABLED).
+
+Seeds a SQLite storage, then drives the same read endpoints sequentially through an app
+built with metrics disabled and one built with them enabled, where the storage is
+timed per call, services record pricing and validation spans and every response carries
+a ``Server-Timing`` header. Reports µs per request for both and the cost of a span hook
+outside a request. Fails unless only the instrumented app serves ``/metrics`` and the
+header, and its query counts match the requests made.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import deps
+from benchmarks.load_test import BENCH_JWT_SECRET, mint_token, seed
+from core import metrics
+from core.config import settings
+from main import create_app
+from services.auth import token_cache
+from services.markets import quote_cache
+from services.storage import Storage, create_sqlite_storage, instrument_storage
+
+
+def build_app(storage: Storage, enabled: bool):
+    settings.metrics_enabled = settings.server_timing_enabled = enabled
+    app = create_app()
+
+    async def override_storage() -> Storage:
+        return instrument_storage(storage) if enabled else storage
+
+    async def no_auth_client() -> None:
+        return None
+
+    app.dependency_overrides[deps.get_storage] = override_storage
+    app.dependency_overrides[deps.get_auth_client] = no_auth_client
+    return app
+
+
+async def drive(app, paths: list[tuple[str, dict[str, str]]], repeat: int) -> tuple[float, httpx.Response]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench-metrics") as client:
+        for path, headers in paths:
+            await client.get(path, headers=headers)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for path, headers in paths:
+                await client.get(path, headers=headers)
+        elapsed = time.perf_counter() - started
+        return elapsed / (repeat * len(paths)) * 1e6, await client.get("/metrics")
+
+
+async def run(markets: int, trades: int, repeat: int, rounds: int) -> None:
+    if not settings.supabase_jwt_secret:
+        settings.supabase_jwt_secret = BENCH_JWT_SECRET
+    # Price every request so the pricing span has work to time
+    quote_cache.max_entries = 0
+    token_cache.clear()
+
+    rng = random.Random(42)
+    storage = create_sqlite_storage(":memory:")
+    market_ids, user_ids = await seed(storage, markets, 20, trades, rng)
+    auth = {"Authorization": f"Bearer {mint_token(user_ids[0])}"}
+    paths = [
+        ("/markets?limit=50", {}),
+        *((f"/markets/{market_id}", {}) for market_id in market_ids[:5]),
+        ("/trades?limit=50", auth),
+    ]
+    print(f"Markets: {markets}, trades: {trades}, {rounds} runs of {repeat * len(paths)} requests per app\n")
+
+    # Alternate the two apps and keep each one's best run, so machine noise cancels out
+    apps = {enabled: build_app(storage, enabled) for enabled in (False, True)}
+    best = {False: float("inf"), True: float("inf")}
+    responses = {}
+    queries_before = sum(metrics.db_queries.value(table) for table in ("markets", "trades", "profiles"))
+    for _ in range(rounds):
+        for enabled, app in apps.items():
+            elapsed_us, responses[enabled] = await drive(app, paths, repeat)
+            best[enabled] = min(best[enabled], elapsed_us)
+    queries = sum(metrics.db_queries.value(table) for table in ("markets", "trades", "profiles")) - queries_before
+    disabled_us, enabled_us = best[False], best[True]
+    disabled_metrics, enabled_metrics = responses[False], responses[True]
+    print(f"metrics disabled: {disabled_us:9.1f} µs per request")
+    overhead = (enabled_us - disabled_us) / disabled_us * 100
+    print(f" metrics enabled: {enabled_us:9.1f} µs per request  ({overhead:+.1f}%)")
+
+    loops = 100_000
+    started = time.perf_counter()
+    for _ in range(loops):
+        with metrics.span("pricing"):
+            pass
+    print(f"   idle span hook: {(time.perf_counter() - started) / loops * 1e9:8.0f} ns")
+
+    requests = rounds * (repeat + 1) * len(paths)
+    routes = ("/markets", "/markets/{market_id}", "/trades")
+    timed = sum(metrics.http_request_db_queries.sum("GET", route) for route in routes)
+    ok = disabled_metrics.status_code == 404 and enabled_metrics.status_code == 200
+    ok = ok and "server-timing" in enabled_metrics.headers and "server-timing" not in disabled_metrics.headers
+    ok = ok and "http_requests_total" in enabled_metrics.text and queries == timed > 0
+    ok = ok and sum(metrics.http_requests.value("GET", route, "200") for route in routes) == requests
+    if not ok:
+        print("\n✗ Instrumentation did not record the requests that were made")
+        sys.exit(1)
+    print(f"\n✓ {requests} requests and {queries:.0f} queries recorded; nothing exported while disabled")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=200)
+    parser.add_argument("--trades", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.markets, args.trades, args.repeat, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
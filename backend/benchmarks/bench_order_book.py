@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark order book matching throughput in orders per second.
+
+Seeds resting limit orders across a few markets, then streams random incoming limit
+orders through the matching engine: each one crosses the opposite ladder and any
+remainder rests. Runs without a write-ahead log, with one, and with one that fsyncs
+every commit, then replays each log into a fresh engine and fails unless the rebuilt
+books match the live ones exactly.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.order_book import OrderBookEngine, RestingOrder, WriteAheadLog
+
+USERS = [f"trader-{index}" for index in range(50)]
+
+
+def random_order(rng: random.Random, market_ids: list[str]) -> RestingOrder:
+    return RestingOrder(
+        id=str(uuid.UUID(int=rng.getrandbits(128))),
+        user_id=rng.choice(USERS),
+        market_id=rng.choice(market_ids),
+        side=rng.choice(["YES", "NO"]),
+        limit_price_cents=float(rng.randint(20, 80)),
+        shares=round(rng.uniform(10, 500), 4),
+        created_at="2030-01-01T00:00:00.000000+00:00",
+    )
+
+
+async def run_engine(
+    wal: Optional[WriteAheadLog], market_ids: list[str], resting: int, orders: int, seed: int
+) -> tuple[OrderBookEngine, float, int]:
+    """Return the engine, orders/s and the number of orders that traded against the book."""
+    rng = random.Random(seed)
+    engine = OrderBookEngine(wal)
+    await engine.load()
+    await engine.rest([random_order(rng, market_ids) for _ in range(resting)])
+
+    incoming = [random_order(rng, market_ids) for _ in range(orders)]
+    crossed = 0
+    started = time.perf_counter()
+    for order in incoming:
+        session = engine.session()
+        stake = order.shares * order.limit_price_cents / 100.0
+        fills, remaining = session.match(order.user_id, order.market_id, order.side, order.limit_price_cents, stake)
+        await session.commit()
+        crossed += bool(fills)
+        if remaining >= 0.01:
+            order.shares = round(remaining / order.limit_price_cents * 100.0, 4)
+            await engine.rest([order])
+    elapsed = time.perf_counter() - started
+    return engine, orders / elapsed, crossed
+
+
+async def run(args: argparse.Namespace) -> None:
+    market_ids = [f"market-{index}" for index in range(args.markets)]
+    print(f"Markets: {args.markets}, resting: {args.resting}, incoming: {args.orders}\n")
+
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [
+            ("in memory", None, args.orders),
+            ("WAL", WriteAheadLog(str(Path(directory) / "buffered.wal"), fsync=False), args.orders),
+            ("WAL + fsync", WriteAheadLog(str(Path(directory) / "fsync.wal"), fsync=True), args.fsync_orders),
+        ]
+        for label, wal, orders in runs:
+            engine, rate, crossed = await run_engine(wal, market_ids, args.resting, orders, args.seed)
+            line = f"{label:>12}: {rate:>10,.0f} orders/s  ({crossed:,} of {orders:,} crossed the book)"
+            if wal is not None:
+                wal.close()
+                replayed = OrderBookEngine(WriteAheadLog(str(wal.path)))
+                await replayed.load()
+                replayed_books = [await replayed.snapshot(market_id) for market_id in market_ids]
+                same = replayed_books == [await engine.snapshot(market_id) for market_id in market_ids]
+                ok = ok and same
+                line += "  replay " + ("matches" if same else "DIFFERS")
+            print(line)
+
+    if not ok:
+        print("\n✗ Replayed order books differ from the live ones")
+        sys.exit(1)
+    print("\n✓ Replayed order books match the live ones")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=10)
+    parser.add_argument("--resting", type=int, default=5000, help="Resting orders seeded before timing")
+    parser.add_argument("--orders", type=int, default=20000, help="Incoming orders to match")
+    parser.add_argument("--fsync-orders", type=int, default=2000, help="Incoming orders for the fsync run")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
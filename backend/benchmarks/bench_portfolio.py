@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark PortfolioService.get_portfolio against the in-memory Supabase stand-in.
+
+Values one user's holdings with the per-holding get_market lookups the service used to
+make and with the bulk valuation path, and fails if the bulk path needs more than a
+fixed number of round-trips.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.memory_supabase import MemorySupabase, seed_store
+from services.markets import quote_cache
+from services.portfolio import PortfolioService
+from services.storage import create_supabase_storage
+
+USER_ID = "benchmark-user"
+# one page of the user's trades + referenced markets + their depth rows
+MAX_BULK_ROUND_TRIPS = 3
+
+
+async def value_per_holding(service: PortfolioService) -> None:
+    """Round-trips for the old shape: one get_market per (market, side) holding."""
+    trades = await service.storage.trades.page(
+        user_id=USER_ID, market_id=None, limit=10**9, after=None, columns=("market_id", "side")
+    )
+    for market_id, _ in {(trade["market_id"], trade["side"]) for trade in trades}:
+        await service.market_service.get_market(market_id, use_cache=False)
+
+
+async def run(markets: int, trades_per_market: int) -> None:
+    store = MemorySupabase()
+    seed_store(store, markets, trades_per_market)
+    service = PortfolioService(create_supabase_storage(store))
+
+    print(f"Positions in {markets} markets, {trades_per_market} trades each\n")
+    for label, call in (
+        ("per-holding", lambda: value_per_holding(service)),
+        ("bulk", lambda: service.get_portfolio(USER_ID)),
+    ):
+        store.reset_counters()
+        quote_cache.clear()
+        started = time.perf_counter()
+        await call()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{label:>12}: {store.round_trips:>5} round-trips  {elapsed_ms:9.2f} ms")
+        bulk_round_trips = store.round_trips
+
+    if bulk_round_trips > MAX_BULK_ROUND_TRIPS:
+        print(f"\n✗ Bulk valuation used {bulk_round_trips} round-trips (limit {MAX_BULK_ROUND_TRIPS})")
+        sys.exit(1)
+    print(f"\n✓ Bulk valuation stays within {MAX_BULK_ROUND_TRIPS} round-trips")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=50)
+    parser.add_argument("--trades-per-market", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.markets, args.trades_per_market))
+
+
+if __name__ == "__main__":
+    main()
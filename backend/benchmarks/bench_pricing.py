@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark scalar calculate_market_quote against calculate_market_quotes_batch.
+
+Prices the same randomly generated markets both ways, checks the outputs agree, and
+reports wall time per pass.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from services.pricing import MarketPricingInputs, calculate_market_quote, calculate_market_quotes_batch
+
+
+def generate_inputs(markets: int) -> list[MarketPricingInputs]:
+    rng = random.Random(7)
+    return [
+        MarketPricingInputs(
+            baseline_probability=rng.uniform(0.05, 0.95),
+            yes_shares=rng.uniform(0.0, 50_000.0),
+            no_shares=rng.uniform(0.0, 50_000.0),
+            liquidity=rng.uniform(100.0, 5_000.0),
+        )
+        for _ in range(markets)
+    ]
+
+
+def best_of(repeat: int, call) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def run(markets: int, repeat: int) -> None:
+    inputs = generate_inputs(markets)
+    columns = {
+        "baseline_probability": np.array([item.baseline_probability for item in inputs]),
+        "yes_shares": np.array([item.yes_shares for item in inputs]),
+        "no_shares": np.array([item.no_shares for item in inputs]),
+        "liquidity": np.array([item.liquidity for item in inputs]),
+        "boost": np.array([item.boost for item in inputs]),
+    }
+
+    scalar_ms = best_of(repeat, lambda: [calculate_market_quote(item) for item in inputs])
+    batch_ms = best_of(repeat, lambda: calculate_market_quotes_batch(**columns))
+
+    print(f"Markets: {markets}, best of {repeat}\n")
+    print(f"  scalar: {scalar_ms:9.2f} ms")
+    print(f"   batch: {batch_ms:9.2f} ms  ({scalar_ms / batch_ms:.1f}x)")
+
+    scalar = [calculate_market_quote(item) for item in inputs]
+    batch = calculate_market_quotes_batch(**columns)
+    mismatches = sum(
+        1
+        for index, quote in enumerate(scalar)
+        if quote["yesPriceCents"] != batch["yesPriceCents"][index]
+        or quote["noPriceCents"] != batch["noPriceCents"][index]
+        or quote["impliedProbability"] != batch["impliedProbability"][index]
+    )
+    if mismatches:
+        print(f"\n✗ {mismatches} batch quotes differ from scalar quotes")
+        sys.exit(1)
+    print("\n✓ Batch quotes match scalar quotes")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.markets, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Compare the blended pricing model with the LMSR market maker.
+
+Times fills and quotes for both engines over randomly generated markets, prints the
+average price each one charges as the order size grows, and checks the LMSR invariants:
+every fill costs exactly the change in the cost function, and splitting an order into
+slices buys the same shares as placing it at once.
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import replace
+from math import exp, log
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.pricing import PRICING_ENGINES, MarketPricingInputs, calculate_market_quote
+
+STAKES = [10.0, 100.0, 1_000.0, 10_000.0]
+
+
+def generate_inputs(markets: int, engine: str) -> list[MarketPricingInputs]:
+    rng = random.Random(7)
+    return [
+        MarketPricingInputs(
+            baseline_probability=rng.uniform(0.05, 0.95),
+            yes_shares=rng.uniform(0.0, 5_000.0),
+            no_shares=rng.uniform(0.0, 5_000.0),
+            liquidity=rng.uniform(100.0, 5_000.0),
+            engine=engine,
+        )
+        for _ in range(markets)
+    ]
+
+
+def lmsr_cost(inputs: MarketPricingInputs) -> float:
+    """C(q) evaluated directly, with the baseline folded in as an offset to the share totals."""
+    b = max(inputs.liquidity, 1.0)
+    prior = min(max(inputs.baseline_probability, 0.01), 0.99)
+    yes = (inputs.yes_shares + b * log(prior)) / b
+    no = (inputs.no_shares + b * log(1.0 - prior)) / b
+    top = max(yes, no)
+    return b * (top + log(exp(yes - top) + exp(no - top)))
+
+
+def per_call_us(call, items: list[MarketPricingInputs]) -> float:
+    started = time.perf_counter()
+    for item in items:
+        call(item)
+    return (time.perf_counter() - started) / len(items) * 1e6
+
+
+def check_lmsr(markets: int, slices: int) -> int:
+    engine = PRICING_ENGINES["lmsr"]
+    rng = random.Random(11)
+    failures = 0
+    for inputs in generate_inputs(markets, "lmsr"):
+        side = rng.choice(["YES", "NO"])
+        stake = rng.uniform(1.0, 5_000.0)
+        _, shares = engine.buy(inputs, side, stake)
+
+        after = replace(inputs)
+        if side == "YES":
+            after.yes_shares += shares
+        else:
+            after.no_shares += shares
+        cost_error = abs(lmsr_cost(after) - lmsr_cost(inputs) - stake)
+
+        sliced = 0.0
+        running = replace(inputs)
+        for _ in range(slices):
+            _, bought = engine.buy(running, side, stake / slices)
+            sliced += bought
+            if side == "YES":
+                running.yes_shares += bought
+            else:
+                running.no_shares += bought
+
+        if cost_error > 1e-6 * stake or abs(sliced - shares) > 1e-6 * shares:
+            failures += 1
+    return failures
+
+
+def run(markets: int, liquidity: float, slices: int) -> None:
+    print(f"Markets: {markets}\n")
+    print(f"{'engine':>8} {'fill µs':>9} {'quote µs':>9}")
+    for name, engine in PRICING_ENGINES.items():
+        inputs = generate_inputs(markets, name)
+        fill_us = per_call_us(lambda item: engine.buy(item, "YES", 100.0), inputs)
+        quote_us = per_call_us(calculate_market_quote, inputs)
+        print(f"{name:>8} {fill_us:>9.2f} {quote_us:>9.2f}")
+
+    print(f"\nAverage YES price paid on a fresh 50% market with liquidity {liquidity:g}:")
+    print(f"{'stake':>10} " + " ".join(f"{name:>9}" for name in PRICING_ENGINES))
+    for stake in STAKES:
+        prices = [
+            engine.buy(MarketPricingInputs(liquidity=liquidity, engine=name), "YES", stake)[0]
+            for name, engine in PRICING_ENGINES.items()
+        ]
+        print(f"{stake:>10,.0f} " + " ".join(f"{price:>9.2f}" for price in prices))
+
+    failures = check_lmsr(markets, slices)
+    if failures:
+        print(f"\n✗ {failures} LMSR fills broke the cost-function invariants")
+        sys.exit(1)
+    print(f"\n✓ LMSR fills match the cost function and are path independent over {slices} slices")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=20_000)
+    parser.add_argument("--liquidity", type=float, default=500.0)
+    parser.add_argument("--slices", type=int, default=10, help="Slices per order in the path independence check")
+    args = parser.parse_args()
+    run(args.markets, args.liquidity, args.slices)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark AuthService.get_profile against counting a user's trades on every read.
+
+Seeds one user's trade history into SQLite, then compares the old profile read, which
+fetched every trade to count them and their distinct markets, with the user_stats lookup.
+Fails unless both report the same totals.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.counting_storage import counting_storage
+from services.auth import AuthService
+from services.storage import Storage, create_sqlite_storage
+
+USER_ID = "profile-user"
+
+
+async def seed(storage: Storage, markets: int, trades: int) -> None:
+    rng = random.Random(42)
+    market_ids = []
+    for index in range(markets):
+        market = await storage.markets.insert(
+            {"question": f"Profile market #{index}?", "category": "Benchmark", "resolution_date": "2030-01-01T00:00:00+00:00"}
+        )
+        market_ids.append(market["id"])
+    await storage.profiles.upsert(
+        {"id": USER_ID, "email": f"{USER_ID}@example.com", "joined_at": "2025-01-01T00:00:00+00:00"}
+    )
+    rows = []
+    for _ in range(trades):
+        price = rng.uniform(5.0, 95.0)
+        stake = round(rng.uniform(1.0, 100.0), 2)
+        rows.append(
+            {
+                "user_id": USER_ID,
+                "market_id": rng.choice(market_ids),
+                "side": rng.choice(["YES", "NO"]),
+                "price_cents": price,
+                "shares": round(stake / price * 100.0, 4),
+                "stake": stake,
+            }
+        )
+    await storage.trades.insert_many(rows)
+
+
+async def count_trades(storage: Storage) -> tuple[int, int]:
+    """The old profile read: every trade, counted in Python."""
+    await storage.profiles.get(USER_ID)
+    trades = await storage.trades.page(
+        user_id=USER_ID, market_id=None, limit=10**9, after=None, columns=("market_id", "stake", "side")
+    )
+    return len(trades), len({trade["market_id"] for trade in trades})
+
+
+async def run(markets: int, trades: int, repeat: int) -> None:
+    raw_storage = create_sqlite_storage(":memory:")
+    await seed(raw_storage, markets, trades)
+    storage, counter = counting_storage(raw_storage)
+    service = AuthService(storage, None)
+    print(f"One user, {trades} trades across {markets} markets\n")
+
+    results = {}
+    for label, call in (
+        ("count trades", lambda: count_trades(storage)),
+        ("user_stats", lambda: service.get_profile(USER_ID)),
+    ):
+        counter.reset()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            results[label] = await call()
+        elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+        print(f"{label:>13}: {counter.round_trips / repeat:>5.0f} round-trips  {elapsed_ms:9.3f} ms per read")
+
+    profile = results["user_stats"]
+    if results["count trades"] != (profile.total_trades, profile.open_positions):
+        print("\n✗ user_stats disagrees with the trade history")
+        sys.exit(1)
+    print("\n✓ user_stats matches the trade history")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=200)
+    parser.add_argument("--trades", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.markets, args.trades, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark list response serialisation for GET /trades and GET /markets.
+
+Seeds SQLite with trades and markets, then renders pages of 1k, 10k and 100k rows two
+ways. The ``response_model`` path validates a model per row, and FastAPI then dumps the
+page, re-validates it against ``response_model`` and encodes it with the stdlib ``json``.
+The fast path maps trade rows straight to the API shape, constructs the market page
+without a second validation, and renders both with ``ORJSONResponse``.
+Fails unless both produce the same JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.responses import ORJSONResponse
+from schemas.market import MarketListResponse
+from schemas.trade import TradeListResponse, TradeRecord
+from services.markets import MarketService, quote_cache
+from services.storage import Storage, create_sqlite_storage
+from services.trades import TradeService
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def response_model_body(adapter: TypeAdapter, page: BaseModel) -> bytes:
+    """What FastAPI does with a returned model: dump, re-validate, serialise, ``json.dumps``."""
+    value = adapter.validate_python(page.model_dump(by_alias=True))
+    return JSONResponse(adapter.dump_python(value, mode="json", by_alias=True)).body
+
+
+async def seed(storage: Storage, rows: int, rng: random.Random) -> None:
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    markets = [
+        {
+            "id": str(uuid.uuid4()),
+            "question": f"Serialisation market #{index}?",
+            "category": rng.choice(["Economics", "Politics", "Technology"]),
+            "resolution_date": "2030-01-01T00:00:00+00:00",
+            "tags": ["benchmark"],
+            "baseline_probability": rng.uniform(0.1, 0.9),
+            "created_at": (started + timedelta(seconds=index)).isoformat(),
+            "updated_at": (started + timedelta(seconds=index)).isoformat(),
+        }
+        for index in range(rows)
+    ]
+    storage.markets.db.insert_many("markets", markets)
+    market_ids = [market["id"] for market in markets[:100]]
+    trades = []
+    for index in range(rows):
+        price = rng.uniform(5.0, 95.0)
+        stake = round(rng.uniform(1.0, 100.0), 2)
+        trades.append(
+            {
+                "user_id": f"serialisation-user-{index % 50}",
+                "market_id": rng.choice(market_ids),
+                "side": rng.choice(["YES", "NO"]),
+                "price_cents": price,
+                "shares": round(stake / price * 100.0, 4),
+                "stake": stake,
+            }
+        )
+    await storage.trades.insert_many(trades)
+
+
+async def timed(call: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = call()
+        if asyncio.iscoroutine(result):
+            result = await result
+    return (time.perf_counter() - started) * 1000 / repeat, result
+
+
+async def run(sizes: list[int], repeat: int, seed_value: int) -> None:
+    # Price every page afresh instead of serving models cached by the previous size
+    quote_cache.max_entries = 0
+    storage = create_sqlite_storage(":memory:")
+    print(f"Seeding {max(sizes)} markets and trades...")
+    await seed(storage, max(sizes), random.Random(seed_value))
+    trades, markets = TradeService(storage), MarketService(storage)
+    trade_adapter, market_adapter = TypeAdapter(TradeListResponse), TypeAdapter(MarketListResponse)
+
+    async def trades_before(rows: int) -> bytes:
+        page, cursor = await trades._fetch_page(user_id=None, market_id=None, limit=rows, cursor=None, columns=None)
+        items = [TradeRecord.model_validate(trades._trade_payload(row)) for row in page]
+        return response_model_body(trade_adapter, TradeListResponse(items=items, count=len(items), next_cursor=cursor))
+
+    async def trades_after(rows: int) -> bytes:
+        return ORJSONResponse(await trades.list_trades(limit=rows)).body
+
+    print(f"\n{'endpoint':<14} {'rows':>7} {'response_model':>15} {'fast path':>10} {'speed-up':>9}")
+    agree = True
+    for rows in sizes:
+        reps = max(1, repeat * SIZES[0] // rows)
+        fetch_ms, _ = await timed(
+            lambda: trades._fetch_page(user_id=None, market_id=None, limit=rows, cursor=None, columns=None), reps
+        )
+        before_ms, before = await timed(lambda: trades_before(rows), reps)
+        after_ms, after = await timed(lambda: trades_after(rows), reps)
+        agree = agree and json.loads(before) == orjson.loads(after)
+        print(
+            f"{'GET /trades':<14} {rows:>7} {before_ms:>12.1f} ms {after_ms:>7.1f} ms {before_ms / after_ms:>8.1f}x"
+            f"  (incl. {fetch_ms:.1f} ms reading rows)"
+        )
+
+    for rows in sizes:
+        reps = max(1, repeat * SIZES[0] // rows)
+        quote_ms, page = await timed(lambda: markets.list_markets(limit=rows), 1)
+        before_ms, before = await timed(lambda: response_model_body(market_adapter, page), reps)
+        after_ms, after = await timed(lambda: ORJSONResponse(page).body, reps)
+        agree = agree and json.loads(before) == orjson.loads(after)
+        print(
+            f"{'GET /markets':<14} {rows:>7} {before_ms:>12.1f} ms {after_ms:>7.1f} ms {before_ms / after_ms:>8.1f}x"
+            f"  (after {quote_ms:.1f} ms quoting the page)"
+        )
+
+    if not agree:
+        print("\n✗ Fast path JSON differs from the response_model path")
+        sys.exit(1)
+    print("\n✓ Both paths render identical JSON")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=10, help="Repetitions at 1k rows, scaled down for larger pages")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark storage work across API worker processes with and without the shared cache tier.
+
+Seeds a SQLite database file and starts ``--workers`` processes, each with its own quote
+cache as under ``uvicorn --workers``. One after another, as behind a load balancer, each
+worker reads a page of markets and then markets one by one. Worker 0 then books a trade and
+every worker reads the traded market again. Storage round-trips are summed over the workers
+for ``SHARED_CACHE_BACKEND=none``, ``redis`` (served by ``memory_redis.py``) and ``shm``.
+Fails unless each shared backend reads storage less than ``none`` does and every worker sees
+the trade's new price once the invalidation has been published.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from multiprocessing.synchronize import Event
+from pathlib import Path
+from typing import Any, Optional
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.counting_storage import counting_storage
+from benchmarks.load_test import seed
+from benchmarks.memory_redis import serve_in_thread
+from schemas.trade import TradeCreateRequest
+from services.markets import MarketService, shared_markets
+from services.order_book import order_book
+from services.shared_cache import RedisSharedCache, SharedCache, SharedMemoryCache
+from services.storage import create_sqlite_storage
+from services.trades import TradeService
+
+BACKENDS = ("none", "redis", "shm")
+# Long enough for the shm backend's 50 ms poll to deliver the invalidation
+SETTLE_SECONDS = 0.25
+
+
+def build_backend(backend: str, location: str) -> Optional[SharedCache]:
+    if backend == "redis":
+        return RedisSharedCache(location)
+    if backend == "shm":
+        return SharedMemoryCache(location)
+    return None
+
+
+async def serve(
+    index: int,
+    backend: str,
+    location: str,
+    db_path: str,
+    market_ids: list[str],
+    user_id: str,
+    page_size: int,
+    turns: list[list[Event]],
+    trade: Event,
+    traded: Event,
+) -> dict[str, Any]:
+    order_book.wal = None
+    shared_markets.backend = build_backend(backend, location)
+    storage, counter = counting_storage(create_sqlite_storage(db_path))
+    service = MarketService(storage)
+    traded_market = market_ids[0]
+
+    async def take_turn(phase: int, reads: list[str]) -> tuple[int, float]:
+        # Blocking waits run in a thread so the subscription keeps receiving meanwhile
+        await asyncio.to_thread(turns[phase][index].wait)
+        counter.reset()
+        if phase == 0:
+            await service.list_markets(limit=page_size)
+        for market_id in reads:
+            await service.get_market(market_id)
+        price = (await service.get_market(traded_market)).quote.yes_price_cents
+        turns[phase][index + 1].set()
+        return counter.round_trips, price
+
+    cold_trips, price_before = await take_turn(0, market_ids)
+    if index == 0:
+        await asyncio.to_thread(trade.wait)
+        await TradeService(storage).place_orders(
+            user_id, [TradeCreateRequest(market_id=traded_market, side="YES", stake=250)]
+        )
+        traded.set()
+    await asyncio.to_thread(traded.wait)
+    await asyncio.sleep(SETTLE_SECONDS)
+    after_trips, price_after = await take_turn(1, [traded_market])
+    await shared_markets.close()
+    return {
+        "index": index,
+        "cold": cold_trips,
+        "after": after_trips,
+        "before": price_before,
+        "price": price_after,
+    }
+
+
+def worker(index: int, *args: Any) -> None:
+    results = args[-1]
+    results.put(asyncio.run(serve(index, *args[:-1])))
+
+
+async def seed_database(db_path: str, markets: int, trades: int) -> tuple[list[str], list[str]]:
+    return await seed(create_sqlite_storage(db_path), markets, 5, trades, random.Random(42))
+
+
+def run_backend(backend: str, location: str, workers: int, markets: int, reads: int, page_size: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = str(Path(directory) / "tempora.sqlite3")
+        market_ids, user_ids = asyncio.run(seed_database(db_path, markets, markets * 5))
+        if backend == "shm":
+            location = str(Path(directory) / "shared-cache.sqlite3")
+
+        context = multiprocessing.get_context("spawn")
+        turns = [[context.Event() for _ in range(workers + 1)] for _ in range(2)]
+        trade, traded = context.Event(), context.Event()
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=worker,
+                args=(
+                    index,
+                    backend,
+                    location,
+                    db_path,
+                    market_ids[:reads],
+                    user_ids[0],
+                    page_size,
+                    turns,
+                    trade,
+                    traded,
+                    results,
+                ),
+            )
+            for index in range(workers)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        turns[0][0].set()
+        turns[0][workers].wait()
+        trade.set()
+        traded.wait()
+        turns[1][0].set()
+        turns[1][workers].wait()
+        reports = sorted((results.get(timeout=30) for _ in processes), key=lambda report: report["index"])
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+    # Worker 0 booked the trade and invalidated its own cache, so its price is the truth
+    price = reports[0]["price"]
+    return {
+        "cold": sum(report["cold"] for report in reports),
+        "after": sum(report["after"] for report in reports),
+        "fresh": sum(report["price"] == price for report in reports),
+        "moved": price != reports[0]["before"],
+        "seconds": elapsed,
+    }
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--markets", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=50, help="Markets each worker reads one by one")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    _, port = serve_in_thread()
+    locations = {"none": "", "redis": f"redis://127.0.0.1:{port}/0", "shm": ""}
+    print(
+        f"Workers: {args.workers}, markets: {args.markets}; each reads a page of {args.page_size} "
+        f"and {args.reads} markets, then the traded market\n"
+    )
+    print(f"{'backend':<8} {'cold trips':>11} {'after trade':>12} {'fresh workers':>14} {'wall s':>7}")
+    reports = {}
+    for backend in BACKENDS:
+        report = reports[backend] = run_backend(
+            backend, locations[backend], args.workers, args.markets, args.reads, args.page_size
+        )
+        print(
+            f"{backend:<8} {report['cold']:>11} {report['after']:>12} "
+            f"{report['fresh']:>10}/{args.workers:<3} {report['seconds']:>7.2f}"
+        )
+
+    shared = [reports[backend] for backend in BACKENDS if backend != "none"]
+    ok = all(report["moved"] for report in reports.values())
+    ok = ok and all(report["cold"] < reports["none"]["cold"] and report["fresh"] == args.workers for report in shared)
+    if not ok:
+        print("\n✗ The shared tier did not save storage work or left workers with a stale quote")
+        sys.exit(1)
+    print("\n✓ Shared backends read storage once for all workers, and every worker saw the trade")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark POST /trades/batch against the same orders sent one by one to POST /trades.
+
+Both paths run in-process against fresh, identically seeded SQLite storage. The script
+reports wall time, throughput and storage round-trips, and fails unless the batch books
+every order at exactly the price the sequential path produced.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+import jwt
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import deps
+from benchmarks.counting_storage import CallCounter, counting_storage
+from core.config import settings
+from main import create_app
+from services.order_book import order_book
+from services.storage import Storage, create_sqlite_storage
+
+BENCH_JWT_SECRET = "trade-batch-secret-trade-batch-secret"
+USER_ID = "batch-bot"
+
+
+async def seeded_app(markets: int) -> tuple[Any, CallCounter, list[str]]:
+    raw_storage = create_sqlite_storage(":memory:")
+    market_ids = []
+    for index in range(markets):
+        market = await raw_storage.markets.insert(
+            {
+                "question": f"Batch market #{index}?",
+                "category": "Benchmark",
+                "resolution_date": "2030-01-01T00:00:00+00:00",
+                "baseline_probability": 0.5,
+                "initial_liquidity": 500.0,
+            }
+        )
+        market_ids.append(market["id"])
+    storage, counter = counting_storage(raw_storage)
+
+    app = create_app()
+
+    async def override_storage() -> Storage:
+        return storage
+
+    async def no_auth_client() -> None:
+        return None
+
+    app.dependency_overrides[deps.get_storage] = override_storage
+    app.dependency_overrides[deps.get_auth_client] = no_auth_client
+    return app, counter, market_ids
+
+
+def build_orders(market_ids: list[str], count: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {"marketId": rng.choice(market_ids), "side": rng.choice(["YES", "NO"]), "stake": round(rng.uniform(1, 250), 2)}
+        for _ in range(count)
+    ]
+
+
+async def run(markets: int, orders_count: int, seed: int) -> None:
+    if not settings.supabase_jwt_secret:
+        settings.supabase_jwt_secret = BENCH_JWT_SECRET
+    token = jwt.encode(
+        {"sub": USER_ID, "email": f"{USER_ID}@example.com", "aud": settings.supabase_jwt_audience, "exp": int(time.time()) + 3600},
+        settings.supabase_jwt_secret,
+        algorithm="HS256",
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    # Market orders with an empty book go straight to the market maker; nothing to journal
+    order_book.wal = None
+
+    print(f"Orders: {orders_count} across {markets} markets\n")
+    prices: dict[str, list[float]] = {}
+    for label in ("sequential", "batch"):
+        app, counter, market_ids = await seeded_app(markets)
+        # Market ids differ per store, so orders are drawn by position from the same seed
+        orders = build_orders(market_ids, orders_count, seed)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            counter.reset()
+            started = time.perf_counter()
+            if label == "sequential":
+                responses = [await client.post("/trades", json=order, headers=headers) for order in orders]
+                prices[label] = [response.json()["priceCents"] for response in responses]
+            else:
+                response = await client.post("/trades/batch", json={"trades": orders}, headers=headers)
+                prices[label] = [result["fills"][0]["priceCents"] for result in response.json()["results"]]
+            elapsed = time.perf_counter() - started
+        print(
+            f"{label:>11}: {counter.round_trips:>5} round-trips  {elapsed * 1000:9.2f} ms  "
+            f"({orders_count / elapsed:,.0f} orders/s)"
+        )
+
+    if prices["sequential"] != prices["batch"]:
+        print("\n✗ Batch prices differ from sequential booking")
+        sys.exit(1)
+    print("\n✓ Batch prices match sequential booking")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=5)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.markets, args.orders, args.seed))
+
+
+if __name__ == "__main__":
+    main()
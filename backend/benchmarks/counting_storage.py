@@ -0,0 +1,60 @@
+"""
+Storage wrapper that counts repository calls, backend-agnostic.
+
+Every awaited repository method is one database round-trip for both shipped backends, so
+the count is comparable with the ``execute()`` counts of ``memory_supabase.py``. A
+``latency_seconds`` delay per call makes in-process storage overlap concurrent requests
+the way a remote database does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Any, Callable
+
+from services.storage import Storage
+
+
+class CallCounter:
+    def __init__(self) -> None:
+        self.round_trips = 0
+        self.calls_by_method: Counter[str] = Counter()
+
+    def reset(self) -> None:
+        self.round_trips = 0
+        self.calls_by_method.clear()
+
+
+class CountingRepository:
+    def __init__(self, inner: Any, name: str, counter: CallCounter, latency_seconds: float = 0.0) -> None:
+        self._inner = inner
+        self._name = name
+        self._counter = counter
+        self._latency_seconds = latency_seconds
+
+    def __getattr__(self, attribute: str) -> Any:
+        target = getattr(self._inner, attribute)
+        if not callable(target):
+            return target
+        return self._counted(f"{self._name}.{attribute}", target)
+
+    def _counted(self, label: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            self._counter.round_trips += 1
+            self._counter.calls_by_method[label] += 1
+            if self._latency_seconds:
+                await asyncio.sleep(self._latency_seconds)
+            return await method(*args, **kwargs)
+
+        return call
+
+
+def counting_storage(storage: Storage, latency_seconds: float = 0.0) -> tuple[Storage, CallCounter]:
+    counter = CallCounter()
+    wrapped = Storage(
+        markets=CountingRepository(storage.markets, "markets", counter, latency_seconds),
+        trades=CountingRepository(storage.trades, "trades", counter, latency_seconds),
+        profiles=CountingRepository(storage.profiles, "profiles", counter, latency_seconds),
+    )
+    return wrapped, counter
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Load-test the FastAPI app in-process against seeded local storage.
+
+Boots main.create_app() on a SQLite storage (STORAGE_BACKEND=sqlite) seeded with
+synthetic markets, users and trades, then drives each endpoint with concurrent clients
+and reports p50/p95/p99 latency, throughput and storage round-trips per request.
+
+Pass --baseline to compare a run against checked-in results; the run fails when any
+endpoint needs more round-trips per request than the baseline recorded.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+import jwt
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import deps
+from benchmarks.counting_storage import CallCounter, counting_storage
+from core.config import settings
+from main import create_app
+from services.auth import token_cache
+from services.markets import quote_cache
+from services.storage import Storage, create_sqlite_storage
+
+BENCH_JWT_SECRET = "load-test-secret-load-test-secret"
+DEFAULT_BASELINE = Path(__file__).parent / "results" / "load_test_baseline.json"
+
+Scenario = Callable[[random.Random], tuple[str, dict[str, str]]]
+
+
+async def seed(storage: Storage, markets: int, users: int, trades: int, rng: random.Random) -> tuple[list[str], list[str]]:
+    """Insert markets, one profile per user and trades spread uniformly between them."""
+    resolution = (datetime.now(timezone.utc) + timedelta(days=365)).isoformat()
+    market_ids = []
+    for index in range(markets):
+        market = await storage.markets.insert(
+            {
+                "question": f"Load test market #{index}?",
+                "category": rng.choice(["Economics", "Politics", "Technology"]),
+                "status": "open",
+                "resolution_date": resolution,
+                "tags": [],
+                "baseline_probability": rng.uniform(0.1, 0.9),
+                "initial_liquidity": 500.0,
+                "settlement_dates": [],
+            }
+        )
+        market_ids.append(market["id"])
+
+    user_ids = [f"load-user-{index}" for index in range(users)]
+    for user_id in user_ids:
+        await storage.profiles.upsert({"id": user_id, "email": f"{user_id}@example.com", "display_name": user_id})
+
+    for _ in range(trades):
+        price = rng.uniform(5.0, 95.0)
+        stake = round(rng.uniform(1.0, 100.0), 2)
+        await storage.trades.insert(
+            {
+                "user_id": rng.choice(user_ids),
+                "market_id": rng.choice(market_ids),
+                "side": rng.choice(["YES", "NO"]),
+                "price_cents": price,
+                "shares": round(stake / price * 100.0, 4),
+                "stake": stake,
+            }
+        )
+    return market_ids, user_ids
+
+
+def mint_token(user_id: str) -> str:
+    claims = {
+        "sub": user_id,
+        "email": f"{user_id}@example.com",
+        "aud": settings.supabase_jwt_audience,
+        "exp": int(time.time()) + 3600,
+    }
+    return jwt.encode(claims, settings.supabase_jwt_secret, algorithm="HS256")
+
+
+def build_scenarios(market_ids: list[str], user_ids: list[str], page_size: int) -> dict[str, Scenario]:
+    tokens = {user_id: {"Authorization": f"Bearer {mint_token(user_id)}"} for user_id in user_ids}
+    return {
+        "GET /markets": lambda rng: (f"/markets?limit={page_size}", {}),
+        "GET /markets/{id}": lambda rng: (f"/markets/{rng.choice(market_ids)}", {}),
+        "GET /trades": lambda rng: (f"/trades?limit={page_size}", tokens[rng.choice(user_ids)]),
+        "GET /users/me/portfolio": lambda rng: ("/users/me/portfolio", tokens[rng.choice(user_ids)]),
+    }
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    counter: CallCounter,
+    requests: int,
+    concurrency: int,
+    seed_value: int,
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    failures = 0
+    remaining = iter(range(requests))
+
+    async def worker(worker_id: int) -> None:
+        nonlocal failures
+        rng = random.Random(seed_value + worker_id)
+        for _ in remaining:
+            path, headers = scenario(rng)
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                failures += 1
+
+    counter.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "failures": failures,
+        "throughputRps": round(requests / elapsed, 1),
+        "p50Ms": round(percentile(latencies, 0.50), 3),
+        "p95Ms": round(percentile(latencies, 0.95), 3),
+        "p99Ms": round(percentile(latencies, 0.99), 3),
+        "roundTripsPerRequest": round(counter.round_trips / requests, 3),
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> bool:
+    """Print deltas against ``baseline``; return False if any endpoint needs more round-trips."""
+    ok = True
+    print(f"\nAgainst baseline ({baseline['recordedAt']}):")
+    for name, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            print(f"  {name:<24} (not in baseline)")
+            continue
+        p95_change = (current["p95Ms"] - previous["p95Ms"]) / previous["p95Ms"] * 100 if previous["p95Ms"] else 0.0
+        trips, baseline_trips = current["roundTripsPerRequest"], previous["roundTripsPerRequest"]
+        marker = "✗" if trips > baseline_trips else "✓"
+        ok = ok and trips <= baseline_trips
+        print(f"  {marker} {name:<24} p95 {p95_change:+7.1f}%   round-trips {baseline_trips:g} → {trips:g}")
+    return ok
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    if not settings.supabase_jwt_secret:
+        settings.supabase_jwt_secret = BENCH_JWT_SECRET
+    if not args.warm_quote_cache:
+        # A zero-sized cache stores nothing, so every request prices its markets afresh
+        quote_cache.max_entries = 0
+    quote_cache.clear()
+    token_cache.clear()
+
+    rng = random.Random(args.seed)
+    raw_storage = create_sqlite_storage(args.sqlite_path)
+    market_ids, user_ids = await seed(raw_storage, args.markets, args.users, args.trades, rng)
+    storage, counter = counting_storage(raw_storage)
+
+    app = create_app()
+
+    async def override_storage() -> Storage:
+        return storage
+
+    async def no_auth_client() -> None:
+        return None
+
+    app.dependency_overrides[deps.get_storage] = override_storage
+    app.dependency_overrides[deps.get_auth_client] = no_auth_client
+
+    print(
+        f"Markets: {args.markets}, users: {args.users}, trades: {args.trades}, "
+        f"concurrency: {args.concurrency}, requests per endpoint: {args.requests}\n"
+    )
+    print(f"{'endpoint':<24} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'trips/req':>10} {'errors':>7}")
+
+    endpoints: dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+        for name, scenario in build_scenarios(market_ids, user_ids, args.page_size).items():
+            if args.warmup:
+                await drive(client, scenario, counter, args.warmup, args.concurrency, args.seed)
+            stats = await drive(client, scenario, counter, args.requests, args.concurrency, args.seed)
+            endpoints[name] = stats
+            print(
+                f"{name:<24} {stats['throughputRps']:>8.1f} {stats['p50Ms']:>9.2f} {stats['p95Ms']:>9.2f} "
+                f"{stats['p99Ms']:>9.2f} {stats['roundTripsPerRequest']:>10g} {stats['failures']:>7}"
+            )
+
+    return {
+        "recordedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parameters": {
+            "markets": args.markets,
+            "users": args.users,
+            "trades": args.trades,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "pageSize": args.page_size,
+            "warmQuoteCache": args.warm_quote_cache,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--trades", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed requests per endpoint before measuring")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sqlite-path", default=":memory:")
+    parser.add_argument(
+        "--warm-quote-cache",
+        action="store_true",
+        help="Leave the quote cache enabled (by default every request prices markets from storage)",
+    )
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this path")
+    parser.add_argument("--baseline", type=Path, nargs="?", const=DEFAULT_BASELINE, help="Compare against results JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    failures = sum(stats["failures"] for stats in results["endpoints"].values())
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+
+    if failures:
+        print(f"\n✗ {failures} requests failed")
+        sys.exit(1)
+    if args.baseline:
+        if not compare(results, json.loads(args.baseline.read_text())):
+            print("\n✗ Round-trips per request regressed")
+            sys.exit(1)
+        print("\n✓ No round-trip regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+In-memory stand-in for the subset of a Redis server that the shared cache uses.
+
+Speaks RESP2 on a local TCP port (PING, AUTH, SELECT, GET, MGET, SET with PX/EX, INCR,
+PUBLISH and SUBSCRIBE), so benchmarks can point several worker processes at one shared
+cache without a Redis install. Every command counts toward ``commands``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from services.shared_cache.redis import read_reply
+
+Reply = bytes
+
+
+def _simple(text: str) -> Reply:
+    return b"+%s\r\n" % text.encode()
+
+
+def _error(text: str) -> Reply:
+    return b"-ERR %s\r\n" % text.encode()
+
+
+def _integer(value: int) -> Reply:
+    return b":%d\r\n" % value
+
+
+def _bulk(value: Optional[bytes]) -> Reply:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(items: list[Reply]) -> Reply:
+    return b"*%d\r\n" % len(items) + b"".join(items)
+
+
+class MemoryRedisServer:
+    def __init__(self) -> None:
+        self.entries: dict[bytes, tuple[float, bytes]] = {}
+        self.subscribers: dict[bytes, set[asyncio.StreamWriter]] = defaultdict(set)
+        self.commands = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Listen on ``host``; returns the bound port."""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.entries[key]
+            return None
+        return entry[1]
+
+    def _dispatch(self, command: list[bytes], writer: asyncio.StreamWriter) -> Reply:
+        self.commands += 1
+        name, args = command[0].upper(), command[1:]
+        if name == b"PING":
+            return _simple("PONG")
+        if name in (b"AUTH", b"SELECT"):
+            return _simple("OK")
+        if name == b"GET":
+            return _bulk(self._get(args[0]))
+        if name == b"MGET":
+            return _array([_bulk(self._get(key)) for key in args])
+        if name == b"SET":
+            ttl = float("inf")
+            options = [option.upper() for option in args[2:]]
+            if b"PX" in options:
+                ttl = int(args[2 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                ttl = int(args[2 + options.index(b"EX") + 1])
+            self.entries[args[0]] = (time.monotonic() + ttl, args[1])
+            return _simple("OK")
+        if name == b"INCR":
+            value = int(self._get(args[0]) or 0) + 1
+            self.entries[args[0]] = (float("inf"), b"%d" % value)
+            return _integer(value)
+        if name == b"PUBLISH":
+            message = _array([_bulk(b"message"), _bulk(args[0]), _bulk(args[1])])
+            receivers = list(self.subscribers.get(args[0], ()))
+            for receiver in receivers:
+                receiver.write(message)
+            return _integer(len(receivers))
+        if name == b"SUBSCRIBE":
+            replies = []
+            for count, channel in enumerate(args, start=1):
+                self.subscribers[channel].add(writer)
+                replies.append(_array([_bulk(b"subscribe"), _bulk(channel), _integer(count)]))
+            return b"".join(replies)
+        return _error(f"unknown command '{name.decode()}'")
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                command: Any = await read_reply(reader)
+                writer.write(self._dispatch(command, writer))
+                await writer.drain()
+        except (EOFError, ConnectionError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+            writer.close()
+
+
+def serve_in_thread() -> tuple[MemoryRedisServer, int]:
+    """Run a server on its own event loop in a daemon thread; returns it and its port."""
+    server = MemoryRedisServer()
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    port: list[int] = []
+
+    def run() -> None:
+        asyncio.set_event_loop(loop)
+        port.append(loop.run_until_complete(server.start()))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="memory-redis", daemon=True).start()
+    ready.wait()
+    return server, port[0]
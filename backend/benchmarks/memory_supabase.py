@@ -0,0 +1,468 @@
+"""
+In-memory stand-in for the subset of the supabase/postgrest client used by the services.
+
+Every awaited ``execute()`` counts as one database round-trip so benchmarks can report how many
+requests a code path would send to Supabase without needing a live project.
+"""
+
+from __future__ import annotations
+
+import copy
+import operator
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+
+from services.pricing import price_orders
+
+Row = dict[str, Any]
+Predicate = Callable[[Row], bool]
+
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+}
+
+
+@dataclass
+class MemoryResponse:
+    data: Any
+    count: Optional[int] = None
+
+
+@dataclass
+class MemoryQuery:
+    store: "MemorySupabase"
+    table_name: str
+    action: str = "select"
+    columns: Optional[list[str]] = None
+    payload: Any = None
+    count_mode: Optional[str] = None
+    filters: list[Callable[[dict[str, Any]], bool]] = field(default_factory=list)
+    ordering: list[tuple[str, bool]] = field(default_factory=list)
+    row_limit: Optional[int] = None
+    single_row: bool = False
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "MemoryQuery":
+        self.columns = None if columns.strip() == "*" else [column.strip() for column in columns.split(",")]
+        self.count_mode = count
+        return self
+
+    def insert(self, payload: Any, **options: Any) -> "MemoryQuery":
+        self.action, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload: Any, **options: Any) -> "MemoryQuery":
+        self.action, self.payload = "upsert", payload
+        return self
+
+    def update(self, payload: dict[str, Any]) -> "MemoryQuery":
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self) -> "MemoryQuery":
+        self.action = "delete"
+        return self
+
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        self.filters.append(_comparison(column, "lt", value))
+        return self
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        self.filters.append(_comparison(column, "lte", value))
+        return self
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        self.filters.append(_comparison(column, "gt", value))
+        return self
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        self.filters.append(_comparison(column, "gte", value))
+        return self
+
+    def or_(self, filters: str) -> "MemoryQuery":
+        terms = [_parse_filter(term) for term in _split_terms(filters)]
+        self.filters.append(lambda row: any(term(row) for term in terms))
+        return self
+
+    def in_(self, column: str, values: list[Any]) -> "MemoryQuery":
+        allowed = set(values)
+        self.filters.append(lambda row: row.get(column) in allowed)
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "MemoryQuery":
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "MemoryQuery":
+        self.row_limit = size
+        return self
+
+    def single(self) -> "MemoryQuery":
+        self.single_row = True
+        return self
+
+    async def execute(self) -> MemoryResponse:
+        self.store.round_trips += 1
+        self.store.calls_by_table[self.table_name] = self.store.calls_by_table.get(self.table_name, 0) + 1
+        rows = self.store.tables.setdefault(self.table_name, [])
+        if self.action == "insert":
+            return MemoryResponse(data=[self.store.insert_row(self.table_name, row) for row in self._payload_rows()])
+        if self.action == "upsert":
+            return MemoryResponse(data=[self.store.upsert_row(self.table_name, row) for row in self._payload_rows()])
+
+        matched = [row for row in rows if all(predicate(row) for predicate in self.filters)]
+        if self.action == "update":
+            for row in matched:
+                row.update(self.payload)
+            return MemoryResponse(data=copy.deepcopy(matched))
+        if self.action == "delete":
+            self.store.tables[self.table_name] = [row for row in rows if row not in matched]
+            return MemoryResponse(data=copy.deepcopy(matched))
+
+        for column, desc in reversed(self.ordering):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(matched)
+        if self.row_limit is not None:
+            matched = matched[: self.row_limit]
+        projected = [self._project(row) for row in matched]
+        if self.single_row:
+            return MemoryResponse(data=projected[0] if projected else None, count=total)
+        return MemoryResponse(data=projected, count=total if self.count_mode else None)
+
+    def _payload_rows(self) -> list[dict[str, Any]]:
+        return self.payload if isinstance(self.payload, list) else [self.payload]
+
+    def _project(self, row: dict[str, Any]) -> dict[str, Any]:
+        if self.columns is None:
+            return copy.deepcopy(row)
+        return {column: copy.deepcopy(row.get(column)) for column in self.columns}
+
+
+def _comparison(column: str, op: str, value: Any) -> Predicate:
+    compare = _OPERATORS[op]
+
+    def predicate(row: Row) -> bool:
+        current = row.get(column)
+        if current is None:
+            return False
+        # PostgREST filter strings carry every value as text
+        if isinstance(value, str) and isinstance(current, (int, float)):
+            return compare(current, type(current)(value))
+        return compare(current, value)
+
+    return predicate
+
+
+def _split_terms(expression: str) -> list[str]:
+    """Split a PostgREST logic expression on top-level commas."""
+    terms, depth, quoted, current = [], 0, False, []
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == "," and depth == 0:
+            terms.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    terms.append("".join(current))
+    return [term.strip() for term in terms if term.strip()]
+
+
+def _parse_filter(term: str) -> Predicate:
+    """Parse ``column.op.value``, ``and(...)`` or ``or(...)`` into a row predicate."""
+    for combinator, reducer in (("and(", all), ("or(", any)):
+        if term.startswith(combinator) and term.endswith(")"):
+            children = [_parse_filter(child) for child in _split_terms(term[len(combinator) : -1])]
+            return lambda row, children=children, reducer=reducer: reducer(child(row) for child in children)
+    column, op, value = term.split(".", 2)
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    return _comparison(column, op, value)
+
+
+class MemorySupabase:
+    """Dict-backed tables that answer the postgrest query chains our services build.
+
+    The triggers and functions from ``scripts/create_tables.sql`` are mirrored as Python
+    callables so derived tables such as ``market_depth`` stay in step with ``trades``.
+    """
+
+    primary_keys = {"market_depth": "market_id", "user_stats": "user_id"}
+
+    def __init__(self) -> None:
+        self.tables: dict[str, list[dict[str, Any]]] = {}
+        self.functions: dict[str, Callable[..., Any]] = {
+            "book_trades": book_trades,
+            "rebuild_market_depth": rebuild_market_depth,
+            "rebuild_user_stats": rebuild_user_stats,
+        }
+        self.after_insert: dict[str, list[Callable[["MemorySupabase", dict[str, Any]], None]]] = {
+            "trades": [apply_trade_to_market_depth, record_market_price, apply_trade_to_user_stats],
+        }
+        # market_candles rows by primary key, so the trigger mirror stays O(1) per trade
+        self.candles_by_key: dict[tuple[str, str, str], dict[str, Any]] = {}
+        # user_positions and user_stats rows by primary key, for the same reason
+        self.positions_by_key: dict[tuple[str, str], dict[str, Any]] = {}
+        self.stats_by_user: dict[str, dict[str, Any]] = {}
+        self.round_trips = 0
+        self.calls_by_table: dict[str, int] = {}
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(store=self, table_name=name)
+
+    def rpc(self, name: str, params: Optional[dict[str, Any]] = None) -> "MemoryRpc":
+        return MemoryRpc(store=self, name=name, params=params or {})
+
+    def reset_counters(self) -> None:
+        self.round_trips = 0
+        self.calls_by_table = {}
+
+    def insert_row(self, table_name: str, row: dict[str, Any]) -> dict[str, Any]:
+        stored = dict(row)
+        if self.primary_keys.get(table_name, "id") == "id":
+            stored.setdefault("id", str(uuid.uuid4()))
+        stored.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        self.tables.setdefault(table_name, []).append(stored)
+        for trigger in self.after_insert.get(table_name, []):
+            trigger(self, stored)
+        return copy.deepcopy(stored)
+
+    def upsert_row(self, table_name: str, row: dict[str, Any]) -> dict[str, Any]:
+        key = self.primary_keys.get(table_name, "id")
+        existing = self.find_row(table_name, key, row.get(key))
+        if existing is not None:
+            existing.update(row)
+            return copy.deepcopy(existing)
+        return self.insert_row(table_name, row)
+
+    def find_row(self, table_name: str, column: str, value: Any) -> Optional[dict[str, Any]]:
+        if value is None:
+            return None
+        for row in self.tables.setdefault(table_name, []):
+            if row.get(column) == value:
+                return row
+        return None
+
+
+def apply_trade_to_market_depth(store: MemorySupabase, trade: dict[str, Any]) -> None:
+    """Mirror of the ``apply_trade_to_market_depth`` trigger."""
+    depth = store.find_row("market_depth", "market_id", trade["market_id"])
+    if depth is None:
+        depth = {
+            "market_id": trade["market_id"],
+            "yes_shares": 0.0,
+            "no_shares": 0.0,
+            "total_volume": 0.0,
+            "trade_count": 0,
+            "last_trade_at": None,
+        }
+        store.tables.setdefault("market_depth", []).append(depth)
+    if trade["side"] == "YES":
+        depth["yes_shares"] += trade["shares"]
+    else:
+        depth["no_shares"] += trade["shares"]
+    depth["total_volume"] += trade["stake"]
+    depth["updated_at"] = datetime.now(timezone.utc).isoformat()
+    depth["trade_count"] += 1
+    depth["last_trade_at"] = max(filter(None, (depth["last_trade_at"], trade.get("created_at"))), default=None)
+
+
+# Candle periods and how much of a UTC ISO-8601 timestamp each one keeps
+_CANDLE_PREFIXES = {
+    "1m": (16, ":00.000000+00:00"),
+    "1h": (13, ":00:00.000000+00:00"),
+    "1d": (10, "T00:00:00.000000+00:00"),
+}
+
+
+def record_market_price(store: MemorySupabase, trade: dict[str, Any]) -> None:
+    """Mirror of the ``record_market_price`` trigger."""
+    price = trade["price_cents"] if trade["side"] == "YES" else 100.0 - trade["price_cents"]
+    created_at = datetime.fromisoformat(trade["created_at"]).astimezone(timezone.utc).isoformat(timespec="microseconds")
+    store.tables.setdefault("market_prices", []).append(
+        {
+            "trade_id": trade["id"],
+            "market_id": trade["market_id"],
+            "yes_price_cents": price,
+            "volume": trade["stake"],
+            "created_at": created_at,
+        }
+    )
+    candles = store.tables.setdefault("market_candles", [])
+    for period, (length, suffix) in _CANDLE_PREFIXES.items():
+        bucket_start = created_at[:length] + suffix
+        key = (trade["market_id"], period, bucket_start)
+        candle = store.candles_by_key.get(key)
+        if candle is None:
+            candle = store.candles_by_key[key] = {
+                "market_id": trade["market_id"],
+                "period": period,
+                "bucket_start": bucket_start,
+                "open": price,
+                "high": price,
+                "low": price,
+                "close": price,
+                "volume": trade["stake"],
+                "trade_count": 1,
+                "open_at": created_at,
+                "close_at": created_at,
+            }
+            candles.append(candle)
+            continue
+        if created_at < candle["open_at"]:
+            candle["open"], candle["open_at"] = price, created_at
+        if created_at >= candle["close_at"]:
+            candle["close"], candle["close_at"] = price, created_at
+        candle["high"] = max(candle["high"], price)
+        candle["low"] = min(candle["low"], price)
+        candle["volume"] += trade["stake"]
+        candle["trade_count"] += 1
+
+
+def apply_trade_to_user_stats(store: MemorySupabase, trade: dict[str, Any]) -> None:
+    """Mirror of the ``apply_trade_to_user_stats`` trigger."""
+    key = (trade["user_id"], trade["market_id"])
+    position = store.positions_by_key.get(key)
+    opened = position is None
+    if opened:
+        position = store.positions_by_key[key] = {
+            "user_id": trade["user_id"],
+            "market_id": trade["market_id"],
+            "yes_shares": 0.0,
+            "no_shares": 0.0,
+            "total_staked": 0.0,
+            "trade_count": 0,
+        }
+        store.tables.setdefault("user_positions", []).append(position)
+    position["yes_shares" if trade["side"] == "YES" else "no_shares"] += trade["shares"]
+    position["total_staked"] += trade["stake"]
+    position["trade_count"] += 1
+
+    stats = store.stats_by_user.get(trade["user_id"])
+    if stats is None:
+        stats = store.stats_by_user[trade["user_id"]] = {
+            "user_id": trade["user_id"],
+            "total_trades": 0,
+            "open_positions": 0,
+            "total_staked": 0.0,
+            "realised_pnl": 0.0,
+            "last_trade_at": None,
+        }
+        store.tables.setdefault("user_stats", []).append(stats)
+    stats["total_trades"] += 1
+    stats["open_positions"] += int(opened)
+    stats["total_staked"] += trade["stake"]
+    stats["last_trade_at"] = max(filter(None, (stats["last_trade_at"], trade.get("created_at"))), default=None)
+
+
+def rebuild_market_depth(store: MemorySupabase, p_market_id: Optional[str] = None) -> int:
+    """Mirror of the ``rebuild_market_depth`` SQL function."""
+    store.tables["market_depth"] = [
+        row
+        for row in store.tables.get("market_depth", [])
+        if p_market_id is not None and row["market_id"] != p_market_id
+    ]
+    rebuilt: set[str] = set()
+    for trade in store.tables.get("trades", []):
+        if p_market_id is None or trade["market_id"] == p_market_id:
+            apply_trade_to_market_depth(store, trade)
+            rebuilt.add(trade["market_id"])
+    return len(rebuilt)
+
+
+def rebuild_user_stats(store: MemorySupabase, p_user_id: Optional[str] = None) -> int:
+    """Mirror of the ``rebuild_user_stats`` SQL function."""
+    for table, index in (("user_positions", store.positions_by_key), ("user_stats", store.stats_by_user)):
+        store.tables[table] = [
+            row for row in store.tables.get(table, []) if p_user_id is not None and row["user_id"] != p_user_id
+        ]
+        for key in [key for key, row in index.items() if p_user_id is None or row["user_id"] == p_user_id]:
+            del index[key]
+    rebuilt: set[str] = set()
+    for trade in store.tables.get("trades", []):
+        if p_user_id is None or trade["user_id"] == p_user_id:
+            apply_trade_to_user_stats(store, trade)
+            rebuilt.add(trade["user_id"])
+    return len(rebuilt)
+
+
+def book_trades(store: MemorySupabase, p_user_id: str, p_orders: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Mirror of the ``book_trades`` SQL function."""
+    market_ids = {order["market_id"] for order in p_orders}
+    markets = {market_id: store.find_row("markets", "id", market_id) for market_id in market_ids}
+    markets = {market_id: row for market_id, row in markets.items() if row is not None}
+    depths = {market_id: store.find_row("market_depth", "market_id", market_id) for market_id in markets}
+    known = [(ordinal, order) for ordinal, order in enumerate(p_orders) if order["market_id"] in markets]
+    priced = price_orders(
+        markets,
+        {market_id: row for market_id, row in depths.items() if row is not None},
+        [order for _, order in known],
+    )
+    return [
+        {"ordinal": ordinal, **(store.insert_row("trades", {"user_id": p_user_id, **trade}) if trade else {"id": None})}
+        for (ordinal, _), trade in zip(known, priced)
+    ]
+
+
+@dataclass
+class MemoryRpc:
+    store: MemorySupabase
+    name: str
+    params: dict[str, Any]
+
+    async def execute(self) -> MemoryResponse:
+        self.store.round_trips += 1
+        handler = self.store.functions.get(self.name)
+        if handler is None:
+            raise LookupError(f"Function '{self.name}' is not registered on the in-memory store")
+        return MemoryResponse(data=handler(self.store, **self.params))
+
+
+def seed_store(store: MemorySupabase, markets: int, trades_per_market: int) -> None:
+    """Populate open markets with a random mix of YES/NO trades."""
+    rng = random.Random(42)
+    resolution = (datetime.now(timezone.utc) + timedelta(days=365)).isoformat()
+    for index in range(markets):
+        market = store.insert_row(
+            "markets",
+            {
+                "question": f"Benchmark market #{index}?",
+                "category": "Benchmark",
+                "status": "open",
+                "resolution_date": resolution,
+                "tags": [],
+                "baseline_probability": rng.uniform(0.1, 0.9),
+                "initial_liquidity": 500.0,
+                "settlement_dates": [],
+            },
+        )
+        for _ in range(trades_per_market):
+            price = rng.uniform(5.0, 95.0)
+            stake = round(rng.uniform(1.0, 100.0), 2)
+            store.insert_row(
+                "trades",
+                {
+                    "user_id": "benchmark-user",
+                    "market_id": market["id"],
+                    "side": rng.choice(["YES", "NO"]),
+                    "price_cents": price,
+                    "shares": round(stake / price * 100.0, 4),
+                    "stake": stake,
+                },
+            )
@@ -0,0 +1,158 @@
+"""In-process caching primitives shared by the services."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+from core import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Size-bounded LRU cache whose entries also expire ``ttl_seconds`` after being stored.
+
+    A ``max_entries`` of zero disables the cache: every lookup is a miss and nothing is stored.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl_seconds: Optional[float] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SingleFlight(Generic[K, V]):
+    """Collapses concurrent identical reads: callers of a key already in flight await its result.
+
+    Nothing outlives the call; this shares work, not results over time. ``forget`` detaches
+    a key's call once a write lands, so callers arriving afterwards start a fresh read
+    while those already waiting still get the one they joined. Calls run as tasks and are
+    awaited through ``asyncio.shield``, so a caller that goes away does not cancel the
+    read for everyone else. With ``enabled`` false every call runs on its own.
+    """
+
+    def __init__(self, name: str, *, enabled: bool = True) -> None:
+        self.name = name
+        self.enabled = enabled
+        self._calls: dict[K, asyncio.Task[V]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        if not self.enabled:
+            return await call()
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(call())
+            task.add_done_callback(partial(self._finished, key))
+            self._calls[key] = task
+            self.calls += 1
+            metrics.read_flights.inc(self.name)
+        else:
+            self.coalesced += 1
+            metrics.coalesced_reads.inc(self.name)
+        return await asyncio.shield(task)
+
+    def forget(self, key: K) -> None:
+        self._calls.pop(key, None)
+
+    def clear(self) -> None:
+        self._calls.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"inFlight": len(self._calls), "calls": self.calls, "coalesced": self.coalesced}
+
+    def _finished(self, key: K, task: asyncio.Task[V]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Every caller may have gone; do not report the failure as never retrieved
+        if not task.cancelled():
+            task.exception()
+
+
+class VersionClock(Generic[K]):
+    """A change counter for a collection, so a read can tell whether a write overtook it.
+
+    ``bump`` records that a key changed and advances ``current``; a read that took
+    ``current`` before it started checks ``unchanged_since`` before caching its result.
+    """
+
+    def __init__(self) -> None:
+        self.current = 0
+        self._lock = threading.Lock()
+
+    def bump(self, key: K) -> None:
+        with self._lock:
+            self.current += 1
+
+    def reset(self) -> None:
+        """Treat every read in flight as overtaken, for when changes may have gone unseen."""
+        with self._lock:
+            self.current += 1
+
+    def unchanged_since(self, snapshot: int) -> bool:
+        """Whether nothing was bumped since ``current`` read ``snapshot``."""
+        return self.current == snapshot
@@ -1,5 +1,6 @@
 from functools import lru_cache
-from typing import Any
+from pathlib import Path
+from typing import Any, Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -10,11 +11,54 @@ class Settings(BaseSettings):
     supabase_url: str | None = Field(default=None, alias="SUPABASE_URL")
     supabase_service_role_key: str | None = Field(default=None, alias="SUPABASE_SERVICE_ROLE_KEY")
     supabase_anon_key: str | None = Field(default=None, alias="SUPABASE_ANON_KEY")
+    supabase_jwt_secret: str | None = Field(default=None, alias="SUPABASE_JWT_SECRET")
+    supabase_jwt_audience: str = Field(default="authenticated", alias="SUPABASE_JWT_AUDIENCE")
+    storage_backend: Literal["supabase", "sqlite"] = Field(default="supabase", alias="STORAGE_BACKEND")
+    sqlite_path: str = Field(default=":memory:", alias="SQLITE_PATH")
     cors_allow_origins: str = Field(default="*", alias="CORS_ALLOW_ORIGINS")
     pricing_baseline: float = Field(default=50.0, alias="PRICING_BASELINE")
     pricing_sensitivity: float = Field(default=0.045, alias="PRICING_SENSITIVITY")
     pricing_floor: float = Field(default=5.0, alias="PRICING_FLOOR")
     pricing_ceiling: float = Field(default=95.0, alias="PRICING_CEILING")
+    page_default_limit: int = Field(default=100, alias="PAGE_DEFAULT_LIMIT")
+    page_max_limit: int = Field(default=1000, alias="PAGE_MAX_LIMIT")
+    export_page_size: int = Field(default=1000, alias="EXPORT_PAGE_SIZE")
+    trade_batch_max_size: int = Field(default=500, alias="TRADE_BATCH_MAX_SIZE")
+    # Worker processes the server runs; uvicorn and gunicorn read it as their --workers default
+    web_concurrency: int = Field(default=1, alias="WEB_CONCURRENCY")
+    # The book lives in one process's memory; turn it off to run more than one worker
+    order_book_enabled: bool = Field(default=True, alias="ORDER_BOOK_ENABLED")
+    # Empty keeps resting orders in memory only; they are lost on restart
+    order_book_wal_path: str = Field(default="", alias="ORDER_BOOK_WAL_PATH")
+    order_book_wal_fsync: bool = Field(default=True, alias="ORDER_BOOK_WAL_FSYNC")
+    order_book_max_resting_per_user: int = Field(default=100, alias="ORDER_BOOK_MAX_RESTING_PER_USER")
+    order_book_max_resting_per_market: int = Field(default=5000, alias="ORDER_BOOK_MAX_RESTING_PER_MARKET")
+    quote_cache_max_entries: int = Field(default=2048, alias="QUOTE_CACHE_MAX_ENTRIES")
+    quote_cache_ttl_seconds: float = Field(default=5.0, alias="QUOTE_CACHE_TTL_SECONDS")
+    market_cache_max_age_seconds: int = Field(default=1, alias="MARKET_CACHE_MAX_AGE_SECONDS")
+    market_cache_stale_while_revalidate_seconds: int = Field(
+        default=5, alias="MARKET_CACHE_STALE_WHILE_REVALIDATE_SECONDS"
+    )
+    shared_cache_backend: Literal["none", "memory", "redis", "shm"] = Field(
+        default="none", alias="SHARED_CACHE_BACKEND"
+    )
+    shared_cache_url: str = Field(default="redis://localhost:6379/0", alias="SHARED_CACHE_URL")
+    shared_cache_path: str = Field(default="/dev/shm/tempora-cache.sqlite3", alias="SHARED_CACHE_PATH")
+    shared_cache_ttl_seconds: float = Field(default=30.0, alias="SHARED_CACHE_TTL_SECONDS")
+    shared_cache_timeout_seconds: float = Field(default=0.5, alias="SHARED_CACHE_TIMEOUT_SECONDS")
+    # How long the shared tier is skipped after a failed call before it is tried again
+    shared_cache_retry_seconds: float = Field(default=5.0, alias="SHARED_CACHE_RETRY_SECONDS")
+    shared_cache_poll_seconds: float = Field(default=0.05, alias="SHARED_CACHE_POLL_SECONDS")
+    read_coalescing_enabled: bool = Field(default=True, alias="READ_COALESCING_ENABLED")
+    quote_stream_coalesce_seconds: float = Field(default=0.1, alias="QUOTE_STREAM_COALESCE_SECONDS")
+    quote_stream_max_markets: int = Field(default=100, alias="QUOTE_STREAM_MAX_MARKETS")
+    leaderboard_remark_seconds: float = Field(default=30.0, alias="LEADERBOARD_REMARK_SECONDS")
+    auth_token_cache_max_entries: int = Field(default=4096, alias="AUTH_TOKEN_CACHE_MAX_ENTRIES")
+    auth_token_cache_ttl_seconds: float = Field(default=60.0, alias="AUTH_TOKEN_CACHE_TTL_SECONDS")
+    # Off by default: /metrics is unauthenticated, and Server-Timing shows every client
+    # the request's storage and span timings. Enable them where only operators can reach
+    metrics_enabled: bool = Field(default=False, alias="METRICS_ENABLED")
+    server_timing_enabled: bool = Field(default=False, alias="SERVER_TIMING_ENABLED")
 
     model_config = SettingsConfigDict(
         env_file=(".env",),
@@ -23,6 +67,14 @@ class Settings(BaseSettings):
         case_sensitive=False,
     )
 
+    @field_validator("order_book_wal_path")
+    @classmethod
+    def _absolute_wal_path(cls, value: str) -> str:
+        # A relative path would follow whatever directory the server happened to start in
+        if value and not Path(value).is_absolute():
+            raise ValueError("ORDER_BOOK_WAL_PATH must be an absolute path")
+        return value
+
     @property
     def cors_allow_origins_list(self) -> list[str]:
         """Parse CORS origins from comma-separated string."""
@@ -0,0 +1,48 @@
+"""Strong ETags, conditional GETs and ``Cache-Control`` hints for public reads."""
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+from core.config import settings
+
+
+def make_etag(*parts: object) -> str:
+    """A strong entity tag identifying the representation described by ``parts``."""
+    digest = hashlib.blake2b("\x1f".join(str(part) for part in parts).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def cache_control() -> str:
+    max_age = settings.market_cache_max_age_seconds
+    if max_age <= 0:
+        # Caches may keep the body, but must revalidate it with the ETag every time
+        return "public, no-cache"
+    directives = f"public, max-age={max_age}"
+    if settings.market_cache_stale_while_revalidate_seconds > 0:
+        directives += f", stale-while-revalidate={settings.market_cache_stale_while_revalidate_seconds}"
+    return directives
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's ``If-None-Match`` already holds ``etag``.
+
+    ``If-None-Match`` compares weakly, so a cache that downgraded the tag to ``W/`` still matches.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control()},
+    )
+
+
+def set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control()
@@ -0,0 +1,265 @@
+"""Request-level instrumentation: Prometheus metrics and ``Server-Timing`` spans.
+
+``MetricsMiddleware`` opens a ``RequestTimings`` for every HTTP request. Storage calls
+report into it through ``observe_query`` and services time their CPU-bound phases with
+``span("pricing")`` / ``span("validation")``. When the request finishes the totals are
+folded into process-wide counters and histograms, rendered at ``/metrics`` in the
+Prometheus text format, and summarised in a ``Server-Timing`` response header.
+
+Both are opt-in: ``/metrics`` has no authentication and ``Server-Timing`` reaches every
+client, so ``METRICS_ENABLED`` and ``SERVER_TIMING_ENABLED`` default to off and belong
+on deployments whose API port only operators can reach.
+
+Outside a request (or with ``METRICS_ENABLED=false``, where the middleware is never
+installed) ``span`` hands back a shared no-op context manager, so the hooks left in the
+services cost one context-variable lookup.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import AbstractContextManager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_INF = 'le="+Inf"'
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] += amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[-2] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def sum(self, *labels: str) -> float:
+        series = self._values.get(labels)
+        return series[-1] if series else 0.0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                cumulative = 0.0
+                for bound, observed in zip(self.buckets, series):
+                    cumulative += observed
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labels, labels, le)} {_number(cumulative)}")
+                cumulative += series[-2]
+                lines.append(f"{self.name}_bucket{_labels(self.labels, labels, _INF)} {_number(cumulative)}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_number(series[-1])}")
+                lines.append(f"{self.name}_count{_labels(self.labels, labels)} {_number(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Any] = []
+
+    def register(self, metric: Any) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(
+    Counter("http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+)
+http_request_duration = registry.register(
+    Histogram("http_request_duration_seconds", "Time to handle an HTTP request.", ("method", "route"))
+)
+http_request_db_queries = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Database round-trips made while handling one HTTP request.",
+        ("method", "route"),
+        COUNT_BUCKETS,
+    )
+)
+http_request_phase = registry.register(
+    Histogram(
+        "http_request_phase_seconds",
+        "Time spent per request in each instrumented phase (db, pricing, validation, serialization).",
+        ("route", "phase"),
+    )
+)
+db_queries = registry.register(Counter("db_queries_total", "Database round-trips by table.", ("table",)))
+read_flights = registry.register(
+    Counter("read_flights_total", "Coalescable reads that went on to the caches and storage, by kind.", ("read",))
+)
+coalesced_reads = registry.register(
+    Counter("coalesced_reads_total", "Reads answered by an identical read already in flight, by kind.", ("read",))
+)
+db_query_duration = registry.register(
+    Histogram("db_query_duration_seconds", "Database round-trip latency by table.", ("table",))
+)
+
+
+@dataclass(slots=True)
+class RequestTimings:
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    spans: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+_NOOP: AbstractContextManager[None] = nullcontext()
+
+
+class _Span:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: RequestTimings, name: str) -> None:
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        self.timings.spans[self.name] += time.perf_counter() - self.started
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Add the time spent in the block to phase ``name`` of the current request."""
+    timings = _current.get()
+    if timings is None:
+        return _NOOP
+    return _Span(timings, name)
+
+
+def observe_query(table: str, seconds: float) -> None:
+    """Record one database round-trip against ``table``."""
+    db_queries.inc(table)
+    db_query_duration.observe(seconds, table)
+    timings = _current.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += seconds
+
+
+def server_timing(timings: RequestTimings, total_seconds: float) -> str:
+    entries = [f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.db_queries} queries"']
+    entries.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in sorted(timings.spans.items()))
+    entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and exports its storage round-trips and phase timings."""
+
+    def __init__(self, app: ASGIApp, *, server_timing: bool = True) -> None:
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(timings, time.perf_counter() - timings.started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - timings.started
+            method = scope["method"]
+            route = scope.get("route")
+            # The route template, not the raw path, so ids do not explode label cardinality
+            path = getattr(route, "path", None) or "unmatched"
+            http_requests.inc(method, path, str(status_code))
+            http_request_duration.observe(elapsed, method, path)
+            http_request_db_queries.observe(timings.db_queries, method, path)
+            http_request_phase.observe(timings.db_seconds, path, "db")
+            for name, seconds in timings.spans.items():
+                http_request_phase.observe(seconds, path, name)
@@ -0,0 +1,72 @@
+"""Keyset pagination and sparse field selection for list endpoints."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from core.responses import ORJSONResponse
+
+
+def encode_cursor(row: dict[str, Any]) -> str:
+    """Opaque cursor pointing just past ``row`` in ``(created_at, id)`` order."""
+    payload = json.dumps([row["created_at"], row["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """The ``(created_at, id)`` a cursor points past, parsed and written back out.
+
+    Cursors come from clients, so only a real timestamp and UUID, re-serialised, ever
+    reach a storage filter; anything else is a 400 rather than an error from storage.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        timestamp = datetime.fromisoformat(created_at)
+        key = uuid.UUID(row_id)
+    except (binascii.Error, ValueError, TypeError, AttributeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor") from exc
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    # The format every backend stores, so keyset comparisons also hold on SQLite's text columns
+    return timestamp.astimezone(timezone.utc).isoformat(timespec="microseconds"), str(key)
+
+
+def paginate(rows: list[dict[str, Any]], limit: int) -> tuple[list[dict[str, Any]], Optional[str]]:
+    """Trim a ``limit + 1`` fetch to one page and derive the cursor for the next page."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1])
+
+
+def parse_fields(fields: Optional[str], model: type[BaseModel]) -> Optional[set[str]]:
+    """Resolve a comma-separated ``fields`` parameter (API aliases) to ``model`` field names."""
+    if not fields:
+        return None
+    by_alias = {info.alias or name: name for name, info in model.model_fields.items()}
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(by_alias)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return {by_alias[field] for field in requested} or None
+
+
+def sparse_response(page: BaseModel, fields: set[str]) -> ORJSONResponse:
+    """Serialise a list response keeping only ``fields`` on each item."""
+    return ORJSONResponse(
+        page.model_dump(
+            by_alias=True,
+            include={"items": {"__all__": fields}, "count": True, "next_cursor": True},
+        )
+    )
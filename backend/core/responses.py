@@ -0,0 +1,26 @@
+"""Response classes for endpoints that return large payloads."""
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from core.metrics import span
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON rendered with orjson, bypassing ``response_model`` re-validation.
+
+    Returning a response directly skips FastAPI's validate-then-serialise pass, so the
+    content must already be API-shaped: a pydantic model (dumped by alias) or plain data
+    with camelCase keys. UTC datetimes are rendered with a ``Z`` suffix, exactly as
+    pydantic renders them, so switching an endpoint over does not change its output.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with span("serialization"):
+            if isinstance(content, BaseModel):
+                content = content.model_dump(by_alias=True)
+            return orjson.dumps(content, option=orjson.OPT_UTC_Z)
@@ -1,10 +1,12 @@
+import time
 from functools import lru_cache
-from typing import cast
+from typing import Any, Optional, cast
 
 from fastapi import HTTPException, status
-from supabase import Client, create_client
+from supabase import AsyncClient, Client, acreate_client, create_client
 
 from core.config import settings
+from core.metrics import observe_query
 
 
 class SupabaseNotConfigured(RuntimeError):
@@ -20,6 +22,68 @@ def get_supabase_client() -> Client:
     return cast(Client, create_client(settings.supabase_url, settings.supabase_service_role_key))
 
 
+class _InstrumentedQuery:
+    """A PostgREST request builder whose ``execute()`` is recorded as one round-trip."""
+
+    __slots__ = ("_builder", "_label")
+
+    def __init__(self, builder: Any, label: str) -> None:
+        self._builder = builder
+        self._label = label
+
+    def __getattr__(self, attribute: str) -> Any:
+        target = getattr(self._builder, attribute)
+        if hasattr(target, "execute"):
+            # Properties such as ``not_`` return the next builder in the chain
+            return _InstrumentedQuery(target, self._label)
+        if not callable(target):
+            return target
+
+        def chained(*args: Any, **kwargs: Any) -> Any:
+            result = target(*args, **kwargs)
+            return _InstrumentedQuery(result, self._label) if hasattr(result, "execute") else result
+
+        return chained
+
+    async def execute(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return await self._builder.execute()
+        finally:
+            observe_query(self._label, time.perf_counter() - started)
+
+
+class InstrumentedAsyncClient:
+    """Wraps an ``AsyncClient`` so every table query and RPC reports to ``core.metrics``."""
+
+    def __init__(self, client: AsyncClient) -> None:
+        self._client = client
+
+    def table(self, name: str) -> Any:
+        return _InstrumentedQuery(self._client.table(name), name)
+
+    def rpc(self, name: str, params: Optional[dict[str, Any]] = None, **kwargs: Any) -> Any:
+        return _InstrumentedQuery(self._client.rpc(name, params, **kwargs), f"rpc:{name}")
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._client, attribute)
+
+
+_async_client: Optional[AsyncClient] = None
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    global _async_client
+    if _async_client is None:
+        if not settings.supabase_url or not settings.supabase_service_role_key:
+            raise SupabaseNotConfigured(
+                "Supabase credentials are not configured. Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY."
+            )
+        client = await acreate_client(settings.supabase_url, settings.supabase_service_role_key)
+        _async_client = cast(AsyncClient, InstrumentedAsyncClient(client)) if settings.metrics_enabled else client
+    return _async_client
+
+
 def require_supabase_client() -> Client:
     try:
         return get_supabase_client()
@@ -28,3 +92,13 @@ def require_supabase_client() -> Client:
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Supabase credentials missing. This endpoint requires database access.",
         ) from exc
+
+
+async def require_async_supabase_client() -> AsyncClient:
+    try:
+        return await get_async_supabase_client()
+    except SupabaseNotConfigured as exc:  # pragma: no cover - defensive guard
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Supabase credentials missing. This endpoint requires database access.",
+        ) from exc
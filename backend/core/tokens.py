@@ -0,0 +1,74 @@
+"""Local verification of Supabase-issued access tokens."""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Optional
+
+import jwt
+from jwt import PyJWKClient, PyJWKClientError
+
+from core.config import settings
+
+_ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+_jwks_client: Optional[PyJWKClient] = None
+_jwks_lock = threading.Lock()
+
+
+class TokenVerificationUnavailable(Exception):
+    """Raised when a token cannot be checked locally (no secret configured, unknown key id)."""
+
+
+async def verify_access_token(token: str) -> dict[str, Any]:
+    """Check signature, expiry and audience of ``token`` and return its claims.
+
+    Raises ``jwt.InvalidTokenError`` when the token is definitively invalid and
+    ``TokenVerificationUnavailable`` when only Supabase itself can decide.
+    """
+    key, algorithm = await _signing_key(token)
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience=settings.supabase_jwt_audience,
+        options={"require": ["exp", "sub"]},
+    )
+
+
+def unverified_expiry(token: str) -> Optional[float]:
+    """The ``exp`` claim of ``token`` without checking its signature, if it has one."""
+    try:
+        expiry = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        return None
+    return float(expiry) if isinstance(expiry, (int, float)) else None
+
+
+async def _signing_key(token: str) -> tuple[Any, str]:
+    algorithm = jwt.get_unverified_header(token).get("alg")
+    if algorithm == "HS256":
+        if not settings.supabase_jwt_secret:
+            raise TokenVerificationUnavailable("SUPABASE_JWT_SECRET is not configured")
+        return settings.supabase_jwt_secret, algorithm
+    if algorithm in _ASYMMETRIC_ALGORITHMS:
+        client = _get_jwks_client()
+        if client is None:
+            raise TokenVerificationUnavailable("SUPABASE_URL is not configured")
+        try:
+            # Fetching the key set is blocking HTTP the first time and whenever it expires
+            signing_key = await asyncio.to_thread(client.get_signing_key_from_jwt, token)
+            return signing_key.key, algorithm
+        except PyJWKClientError as exc:
+            raise TokenVerificationUnavailable(str(exc)) from exc
+    raise TokenVerificationUnavailable(f"Unsupported token algorithm: {algorithm}")
+
+
+def _get_jwks_client() -> Optional[PyJWKClient]:
+    global _jwks_client
+    if not settings.supabase_url:
+        return None
+    with _jwks_lock:
+        if _jwks_client is None:
+            _jwks_client = PyJWKClient(f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json")
+        return _jwks_client
@@ -1,8 +1,28 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from api.routes import auth, markets, trades, users
+from api.routes import auth, leaderboard, markets, orders, trades, users
+from core import metrics
 from core.config import settings
+from services.auth import token_cache
+from services.leaderboard import leaderboard as leaderboard_standings
+from services.markets import market_reads, page_reads, quote_cache, shared_markets
+from services.order_book import check_deployment, order_book
+from services.quote_stream import quote_broker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    check_deployment()
+    # Replay the order book log before serving, rather than inside the first trade's locks
+    await order_book.load()
+    yield
+    order_book.close()
+    await shared_markets.close()
 
 
 def create_app() -> FastAPI:
@@ -10,6 +30,7 @@ def create_app() -> FastAPI:
         title="Tempora Prediction Markets API",
         version="0.1.0",
         summary="Backend services for the Tempora prediction market frontend",
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -19,16 +40,48 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.metrics_enabled:
+        app.add_middleware(metrics.MetricsMiddleware, server_timing=settings.server_timing_enabled)
 
     app.include_router(auth.router)
     app.include_router(users.router)
     app.include_router(markets.router)
     app.include_router(trades.router)
+    app.include_router(orders.router)
+    app.include_router(leaderboard.router)
 
     @app.get("/health", tags=["meta"])
     def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/health/cache", tags=["meta"])
+    def cache_stats() -> dict[str, dict[str, Any]]:
+        return {
+            "quotes": quote_cache.stats(),
+            "sharedMarkets": shared_markets.stats(),
+            "marketReads": market_reads.stats(),
+            "marketPageReads": page_reads.stats(),
+            "authTokens": token_cache.stats(),
+        }
+
+    @app.get("/health/stream", tags=["meta"])
+    def stream_stats() -> dict[str, int]:
+        return quote_broker.stats()
+
+    @app.get("/health/order-book", tags=["meta"])
+    def order_book_stats() -> dict[str, Any]:
+        return order_book.stats()
+
+    @app.get("/health/leaderboard", tags=["meta"])
+    def leaderboard_stats() -> dict[str, Any]:
+        return leaderboard_standings.stats()
+
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", include_in_schema=False)
+        def prometheus_metrics() -> PlainTextResponse:
+            return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
     return app
 
 
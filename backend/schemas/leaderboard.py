@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: str = Field(alias="userId")
+    display_name: Optional[str] = Field(default=None, alias="displayName")
+    pnl: float
+    roi: float
+    volume: float
+    trades: int
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class LeaderboardResponse(BaseModel):
+    """Traders ranked by unrealised P&L, valued at the quotes current as of ``marked_at``."""
+    entries: list[LeaderboardEntry]
+    total_traders: int = Field(alias="totalTraders")
+    marked_at: Optional[datetime] = Field(default=None, alias="markedAt")
+
+    model_config = ConfigDict(populate_by_name=True)
@@ -1,8 +1,15 @@
 from datetime import datetime
 from typing import List, Literal, Optional
+from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from core.config import settings
+
+
+PricingEngineName = Literal["blended", "lmsr"]
+CandleInterval = Literal["1m", "1h", "1d"]
+
 
 class SettlementDate(BaseModel):
     label: str
@@ -19,6 +26,7 @@ class MarketBase(BaseModel):
     updated_at: datetime = Field(alias="updatedAt")
     description: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
+    pricing_engine: PricingEngineName = Field(default="blended", alias="pricingEngine")
 
     model_config = ConfigDict(populate_by_name=True)
 
@@ -30,6 +38,9 @@ class MarketCreate(BaseModel):
     description: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
     initial_liquidity: float = Field(default=500.0, alias="initialLiquidity", ge=0.0)
+    pricing_engine: PricingEngineName = Field(
+        default="blended", alias="pricingEngine", description="Market maker that quotes and fills orders"
+    )
 
 
 class MarketUpdate(BaseModel):
@@ -60,3 +71,33 @@ class MarketWithQuote(MarketBase):
 class MarketListResponse(BaseModel):
     items: List[MarketWithQuote]
     count: int
+    next_cursor: Optional[str] = Field(default=None, alias="nextCursor")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class QuoteStreamRequest(BaseModel):
+    """A client message on the quote stream."""
+    action: str
+    market_ids: List[UUID] = Field(
+        default_factory=list, alias="marketIds", max_length=settings.quote_stream_max_markets
+    )
+
+
+class Candle(BaseModel):
+    """OHLC of the YES price in cents over one interval, with the dollar volume traded."""
+    start: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    trades: int
+
+
+class MarketHistoryResponse(BaseModel):
+    market_id: str = Field(alias="marketId")
+    interval: CandleInterval
+    candles: List[Candle]
+
+    model_config = ConfigDict(populate_by_name=True)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RestingOrderRecord(BaseModel):
+    """Unfilled remainder of a limit order, waiting on the order book."""
+    id: str
+    user_id: str = Field(alias="userId")
+    market_id: str = Field(alias="marketId")
+    side: Literal["YES", "NO"]
+    limit_price_cents: float = Field(alias="limitPriceCents")
+    shares: float
+    created_at: datetime = Field(alias="createdAt")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class PriceLevel(BaseModel):
+    price_cents: float = Field(alias="priceCents")
+    shares: float
+    orders: int
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class OrderBookSnapshot(BaseModel):
+    """Aggregated resting orders per price level, best price first."""
+    market_id: str = Field(alias="marketId")
+    yes: list[PriceLevel]
+    no: list[PriceLevel]
+
+    model_config = ConfigDict(populate_by_name=True)
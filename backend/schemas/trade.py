@@ -3,6 +3,9 @@ from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from core.config import settings
+from schemas.order import RestingOrderRecord
+
 
 TradeSide = Literal["YES", "NO"]
 
@@ -13,7 +16,7 @@ class TradeCreateRequest(BaseModel):
     side: TradeSide
     stake: float = Field(ge=0.5, description="Dollar amount the trader is risking")
     limit_price_cents: Optional[float] = Field(
-        default=None, alias="limitPriceCents", ge=1.0, le=99.0, description="Optional limit price override"
+        default=None, alias="limitPriceCents", ge=1.0, le=99.0, description="Highest price per share to pay; unfilled remainders rest on the order book"
     )
 
     model_config = ConfigDict(populate_by_name=True)
@@ -26,7 +29,7 @@ class TradeCreate(BaseModel):
     side: TradeSide
     stake: float = Field(ge=0.5, description="Dollar amount the trader is risking")
     limit_price_cents: Optional[float] = Field(
-        default=None, alias="limitPriceCents", ge=1.0, le=99.0, description="Optional limit price override"
+        default=None, alias="limitPriceCents", ge=1.0, le=99.0, description="Highest price per share to pay; unfilled remainders rest on the order book"
     )
 
     model_config = ConfigDict(populate_by_name=True)
@@ -48,3 +51,39 @@ class TradeRecord(BaseModel):
 class TradeListResponse(BaseModel):
     items: list[TradeRecord]
     count: int
+    next_cursor: Optional[str] = Field(default=None, alias="nextCursor")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class TradeBatchRequest(BaseModel):
+    trades: list[TradeCreateRequest] = Field(min_length=1, max_length=settings.trade_batch_max_size)
+
+
+class OrderResult(BaseModel):
+    """Trades an order produced, matched on the order book first and then the market maker.
+
+    A limit order that cannot be filled in full at its limit leaves ``restingOrder`` behind.
+    ``error`` says why an order was rejected, or why part of it was neither filled nor rested.
+    """
+    status: Literal["filled", "partially_filled", "resting", "rejected"]
+    fills: list[TradeRecord] = Field(default_factory=list)
+    resting_order: Optional[RestingOrderRecord] = Field(default=None, alias="restingOrder")
+    error: Optional[str] = None
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class TradeBatchResult(OrderResult):
+    """Outcome of one order in a batch, in submission order."""
+    index: int
+
+
+class TradeBatchResponse(BaseModel):
+    results: list[TradeBatchResult]
+    filled: int
+    partially_filled: int = Field(alias="partiallyFilled")
+    resting: int
+    rejected: int
+
+    model_config = ConfigDict(populate_by_name=True)
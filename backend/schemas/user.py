@@ -45,6 +45,7 @@ class UserProfile(BaseModel):
     last_seen_at: Optional[datetime] = Field(default=None, alias="lastSeenAt")
     total_trades: int = Field(default=0, alias="totalTrades")
     open_positions: int = Field(default=0, alias="openPositions")
+    total_staked: float = Field(default=0.0, alias="totalStaked")
     realised_pnl: float = Field(default=0.0, alias="realisedPnL")
 
     model_config = ConfigDict(populate_by_name=True)
@@ -110,3 +110,579 @@ CREATE TRIGGER update_profiles_updated_at BEFORE UPDATE ON profiles
 CREATE TRIGGER update_markets_updated_at BEFORE UPDATE ON markets
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+
+-- Market depth aggregate, maintained incrementally as trades are booked so quoting
+-- never has to rescan a market's full trade history.
+CREATE TABLE IF NOT EXISTS market_depth (
+    market_id UUID PRIMARY KEY REFERENCES markets(id) ON DELETE CASCADE,
+    yes_shares DOUBLE PRECISION NOT NULL DEFAULT 0,
+    no_shares DOUBLE PRECISION NOT NULL DEFAULT 0,
+    total_volume DOUBLE PRECISION NOT NULL DEFAULT 0,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    last_trade_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE market_depth ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view market depth"
+    ON market_depth FOR SELECT
+    USING (true);
+
+GRANT SELECT ON market_depth TO authenticated;
+
+-- Fold each new trade into its market's depth row in the same transaction as the insert
+CREATE OR REPLACE FUNCTION apply_trade_to_market_depth()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO market_depth (market_id, yes_shares, no_shares, total_volume, trade_count, last_trade_at, updated_at)
+    VALUES (
+        NEW.market_id,
+        CASE WHEN NEW.side = 'YES' THEN NEW.shares ELSE 0 END,
+        CASE WHEN NEW.side = 'NO' THEN NEW.shares ELSE 0 END,
+        NEW.stake,
+        1,
+        NEW.created_at,
+        NOW()
+    )
+    ON CONFLICT (market_id) DO UPDATE SET
+        yes_shares = market_depth.yes_shares + EXCLUDED.yes_shares,
+        no_shares = market_depth.no_shares + EXCLUDED.no_shares,
+        total_volume = market_depth.total_volume + EXCLUDED.total_volume,
+        trade_count = market_depth.trade_count + 1,
+        last_trade_at = GREATEST(market_depth.last_trade_at, EXCLUDED.last_trade_at),
+        updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+CREATE TRIGGER apply_trade_to_market_depth AFTER INSERT ON trades
+    FOR EACH ROW EXECUTE FUNCTION apply_trade_to_market_depth();
+
+-- Rebuild depth rows from the trades table (all markets when p_market_id is NULL)
+CREATE OR REPLACE FUNCTION rebuild_market_depth(p_market_id UUID DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    -- Block concurrent trade inserts from touching depth until the rebuild commits
+    LOCK TABLE market_depth IN SHARE ROW EXCLUSIVE MODE;
+
+    DELETE FROM market_depth WHERE p_market_id IS NULL OR market_id = p_market_id;
+
+    INSERT INTO market_depth (market_id, yes_shares, no_shares, total_volume, trade_count, last_trade_at, updated_at)
+    SELECT
+        market_id,
+        COALESCE(SUM(shares) FILTER (WHERE side = 'YES'), 0),
+        COALESCE(SUM(shares) FILTER (WHERE side = 'NO'), 0),
+        COALESCE(SUM(stake), 0),
+        COUNT(*),
+        MAX(created_at),
+        NOW()
+    FROM trades
+    WHERE p_market_id IS NULL OR market_id = p_market_id
+    GROUP BY market_id;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- A full-table rebuild is an operator task: keep it away from the anon and user keys
+REVOKE EXECUTE ON FUNCTION rebuild_market_depth(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_market_depth(UUID) TO service_role;
+
+-- Price history: one point per booked trade, as the YES price the trade implies, rolled up
+-- into 1m/1h/1d OHLCV candles by the same trigger so charts never replay trades.
+CREATE TABLE IF NOT EXISTS market_prices (
+    trade_id UUID PRIMARY KEY REFERENCES trades(id) ON DELETE CASCADE,
+    market_id UUID NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    yes_price_cents DOUBLE PRECISION NOT NULL,
+    volume DOUBLE PRECISION NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_prices_market_created_at ON market_prices(market_id, created_at);
+
+-- open_at/close_at keep open and close correct when trades arrive out of timestamp order
+CREATE TABLE IF NOT EXISTS market_candles (
+    market_id UUID NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    period TEXT NOT NULL CHECK (period IN ('1m', '1h', '1d')),
+    bucket_start TIMESTAMPTZ NOT NULL,
+    open DOUBLE PRECISION NOT NULL,
+    high DOUBLE PRECISION NOT NULL,
+    low DOUBLE PRECISION NOT NULL,
+    close DOUBLE PRECISION NOT NULL,
+    volume DOUBLE PRECISION NOT NULL,
+    trade_count INTEGER NOT NULL,
+    open_at TIMESTAMPTZ NOT NULL,
+    close_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (market_id, period, bucket_start)
+);
+
+ALTER TABLE market_prices ENABLE ROW LEVEL SECURITY;
+ALTER TABLE market_candles ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view market prices"
+    ON market_prices FOR SELECT
+    USING (true);
+
+CREATE POLICY "Anyone can view market candles"
+    ON market_candles FOR SELECT
+    USING (true);
+
+GRANT SELECT ON market_prices TO authenticated;
+GRANT SELECT ON market_candles TO authenticated;
+
+-- Append each new trade to the price series and fold it into its three candles
+CREATE OR REPLACE FUNCTION record_market_price()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO market_prices (trade_id, market_id, yes_price_cents, volume, created_at)
+    VALUES (
+        NEW.id,
+        NEW.market_id,
+        CASE WHEN NEW.side = 'YES' THEN NEW.price_cents ELSE 100.0 - NEW.price_cents END,
+        NEW.stake,
+        NEW.created_at
+    );
+
+    INSERT INTO market_candles AS c
+        (market_id, period, bucket_start, open, high, low, close, volume, trade_count, open_at, close_at)
+    SELECT
+        p.market_id,
+        b.period,
+        date_trunc(b.unit, p.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+        p.yes_price_cents,
+        p.yes_price_cents,
+        p.yes_price_cents,
+        p.yes_price_cents,
+        p.volume,
+        1,
+        p.created_at,
+        p.created_at
+    FROM market_prices p
+    CROSS JOIN (VALUES ('1m', 'minute'), ('1h', 'hour'), ('1d', 'day')) AS b(period, unit)
+    WHERE p.trade_id = NEW.id
+    ON CONFLICT (market_id, period, bucket_start) DO UPDATE SET
+        open = CASE WHEN EXCLUDED.open_at < c.open_at THEN EXCLUDED.open ELSE c.open END,
+        high = GREATEST(c.high, EXCLUDED.high),
+        low = LEAST(c.low, EXCLUDED.low),
+        close = CASE WHEN EXCLUDED.close_at >= c.close_at THEN EXCLUDED.close ELSE c.close END,
+        volume = c.volume + EXCLUDED.volume,
+        trade_count = c.trade_count + 1,
+        open_at = LEAST(c.open_at, EXCLUDED.open_at),
+        close_at = GREATEST(c.close_at, EXCLUDED.close_at);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+CREATE TRIGGER record_market_price AFTER INSERT ON trades
+    FOR EACH ROW EXECUTE FUNCTION record_market_price();
+
+-- Rebuild the price series and candles from the trades table (all markets when p_market_id
+-- is NULL), e.g. to backfill history for trades booked before these tables existed
+CREATE OR REPLACE FUNCTION rebuild_market_history(p_market_id UUID DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    -- Block concurrent trade inserts from touching either table until the rebuild commits
+    LOCK TABLE market_prices, market_candles IN SHARE ROW EXCLUSIVE MODE;
+
+    DELETE FROM market_prices WHERE p_market_id IS NULL OR market_id = p_market_id;
+    DELETE FROM market_candles WHERE p_market_id IS NULL OR market_id = p_market_id;
+
+    INSERT INTO market_prices (trade_id, market_id, yes_price_cents, volume, created_at)
+    SELECT id, market_id, CASE WHEN side = 'YES' THEN price_cents ELSE 100.0 - price_cents END, stake, created_at
+    FROM trades
+    WHERE p_market_id IS NULL OR market_id = p_market_id;
+
+    INSERT INTO market_candles
+        (market_id, period, bucket_start, open, high, low, close, volume, trade_count, open_at, close_at)
+    SELECT
+        p.market_id,
+        b.period,
+        date_trunc(b.unit, p.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket_start,
+        (ARRAY_AGG(p.yes_price_cents ORDER BY p.created_at, p.trade_id))[1],
+        MAX(p.yes_price_cents),
+        MIN(p.yes_price_cents),
+        (ARRAY_AGG(p.yes_price_cents ORDER BY p.created_at DESC, p.trade_id DESC))[1],
+        SUM(p.volume),
+        COUNT(*),
+        MIN(p.created_at),
+        MAX(p.created_at)
+    FROM market_prices p
+    CROSS JOIN (VALUES ('1m', 'minute'), ('1h', 'hour'), ('1d', 'day')) AS b(period, unit)
+    WHERE p_market_id IS NULL OR p.market_id = p_market_id
+    GROUP BY p.market_id, b.period, 3;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+REVOKE EXECUTE ON FUNCTION rebuild_market_history(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_market_history(UUID) TO service_role;
+
+-- Per-user trading stats, maintained by a trigger on trades so profile reads are a
+-- primary-key lookup instead of a scan of the user's trade history. user_positions holds
+-- one row per (user, market) and tells the trigger when a trade opens a new position.
+CREATE TABLE IF NOT EXISTS user_positions (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    market_id UUID NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    yes_shares DOUBLE PRECISION NOT NULL DEFAULT 0,
+    no_shares DOUBLE PRECISION NOT NULL DEFAULT 0,
+    total_staked DOUBLE PRECISION NOT NULL DEFAULT 0,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, market_id)
+);
+
+-- realised_pnl stays zero until settlement exists
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    total_trades INTEGER NOT NULL DEFAULT 0,
+    open_positions INTEGER NOT NULL DEFAULT 0,
+    total_staked DOUBLE PRECISION NOT NULL DEFAULT 0,
+    realised_pnl DOUBLE PRECISION NOT NULL DEFAULT 0,
+    last_trade_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE user_positions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own positions"
+    ON user_positions FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Anyone can view user stats"
+    ON user_stats FOR SELECT
+    USING (true);
+
+GRANT SELECT ON user_positions TO authenticated;
+GRANT SELECT ON user_stats TO authenticated;
+
+-- Fold each new trade into its user's position and stats rows in the same transaction
+CREATE OR REPLACE FUNCTION apply_trade_to_user_stats()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_opened BOOLEAN;
+BEGIN
+    INSERT INTO user_positions (user_id, market_id, yes_shares, no_shares, total_staked, trade_count)
+    VALUES (
+        NEW.user_id,
+        NEW.market_id,
+        CASE WHEN NEW.side = 'YES' THEN NEW.shares ELSE 0 END,
+        CASE WHEN NEW.side = 'NO' THEN NEW.shares ELSE 0 END,
+        NEW.stake,
+        1
+    )
+    ON CONFLICT (user_id, market_id) DO UPDATE SET
+        yes_shares = user_positions.yes_shares + EXCLUDED.yes_shares,
+        no_shares = user_positions.no_shares + EXCLUDED.no_shares,
+        total_staked = user_positions.total_staked + EXCLUDED.total_staked,
+        trade_count = user_positions.trade_count + 1
+    -- xmax is 0 only on a freshly inserted row: the trade opened a new position
+    RETURNING (xmax = 0) INTO v_opened;
+
+    INSERT INTO user_stats (user_id, total_trades, open_positions, total_staked, last_trade_at, updated_at)
+    VALUES (NEW.user_id, 1, CASE WHEN v_opened THEN 1 ELSE 0 END, NEW.stake, NEW.created_at, NOW())
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_trades = user_stats.total_trades + 1,
+        open_positions = user_stats.open_positions + EXCLUDED.open_positions,
+        total_staked = user_stats.total_staked + EXCLUDED.total_staked,
+        last_trade_at = GREATEST(user_stats.last_trade_at, EXCLUDED.last_trade_at),
+        updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+CREATE TRIGGER apply_trade_to_user_stats AFTER INSERT ON trades
+    FOR EACH ROW EXECUTE FUNCTION apply_trade_to_user_stats();
+
+-- Rebuild positions and stats from the trades table (all users when p_user_id is NULL)
+CREATE OR REPLACE FUNCTION rebuild_user_stats(p_user_id UUID DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    -- Block concurrent trade inserts from touching either table until the rebuild commits
+    LOCK TABLE user_positions, user_stats IN SHARE ROW EXCLUSIVE MODE;
+
+    DELETE FROM user_positions WHERE p_user_id IS NULL OR user_id = p_user_id;
+    DELETE FROM user_stats WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+    INSERT INTO user_positions (user_id, market_id, yes_shares, no_shares, total_staked, trade_count)
+    SELECT
+        user_id,
+        market_id,
+        COALESCE(SUM(shares) FILTER (WHERE side = 'YES'), 0),
+        COALESCE(SUM(shares) FILTER (WHERE side = 'NO'), 0),
+        COALESCE(SUM(stake), 0),
+        COUNT(*)
+    FROM trades
+    WHERE p_user_id IS NULL OR user_id = p_user_id
+    GROUP BY user_id, market_id;
+
+    INSERT INTO user_stats (user_id, total_trades, open_positions, total_staked, last_trade_at, updated_at)
+    SELECT user_id, COUNT(*), COUNT(DISTINCT market_id), COALESCE(SUM(stake), 0), MAX(created_at), NOW()
+    FROM trades
+    WHERE p_user_id IS NULL OR user_id = p_user_id
+    GROUP BY user_id;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+REVOKE EXECUTE ON FUNCTION rebuild_user_stats(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_user_stats(UUID) TO service_role;
+
+-- Keyset pagination indexes for (created_at DESC, id DESC) listing
+CREATE INDEX IF NOT EXISTS idx_markets_created_at_id ON markets(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trades_created_at_id ON trades(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trades_user_created_at_id ON trades(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trades_market_created_at_id ON trades(market_id, created_at DESC, id DESC);
+
+-- Quote a market from its depth with the same blend as services/pricing.py calculate_market_quote.
+-- Returns the YES price in cents, clamped but unrounded; the NO price is 100 minus it.
+CREATE OR REPLACE FUNCTION market_yes_price(
+    p_baseline_probability DOUBLE PRECISION,
+    p_yes_shares DOUBLE PRECISION,
+    p_no_shares DOUBLE PRECISION,
+    p_liquidity DOUBLE PRECISION,
+    p_sensitivity DOUBLE PRECISION,
+    p_floor DOUBLE PRECISION,
+    p_ceiling DOUBLE PRECISION
+)
+RETURNS DOUBLE PRECISION AS $$
+    SELECT LEAST(
+        GREATEST(
+            (0.55 * p_baseline_probability
+                + 0.4 / (1 + EXP(-((p_yes_shares - p_no_shares) / GREATEST(p_liquidity, 1.0)) * p_sensitivity))
+            ) * 100.0,
+            p_floor
+        ),
+        p_ceiling
+    );
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Market maker that quotes and fills each market; see PRICING_ENGINES in services/pricing.py
+ALTER TABLE markets ADD COLUMN IF NOT EXISTS pricing_engine TEXT NOT NULL DEFAULT 'blended'
+    CHECK (pricing_engine IN ('blended', 'lmsr'));
+
+-- Fill p_stake dollars of p_side from the market maker, mirroring fill_order in
+-- services/pricing.py: 'blended' fills at the rounded pre-trade quote, 'lmsr' charges the
+-- change in the LMSR cost function. Returns the price in cents and the shares bought,
+-- rounded as they are stored.
+CREATE OR REPLACE FUNCTION market_fill(
+    p_engine TEXT,
+    p_baseline_probability DOUBLE PRECISION,
+    p_yes_shares DOUBLE PRECISION,
+    p_no_shares DOUBLE PRECISION,
+    p_liquidity DOUBLE PRECISION,
+    p_side TEXT,
+    p_stake DOUBLE PRECISION,
+    p_sensitivity DOUBLE PRECISION,
+    p_floor DOUBLE PRECISION,
+    p_ceiling DOUBLE PRECISION,
+    OUT price_cents DOUBLE PRECISION,
+    OUT shares DOUBLE PRECISION
+) AS $$
+DECLARE
+    v_yes_price DOUBLE PRECISION;
+    v_b DOUBLE PRECISION := GREATEST(p_liquidity, 1.0);
+    v_prior DOUBLE PRECISION := LEAST(GREATEST(p_baseline_probability, 0.01), 0.99);
+    v_logit DOUBLE PRECISION;
+    v_shares DOUBLE PRECISION;
+BEGIN
+    IF p_engine = 'lmsr' THEN
+        -- Log-odds of the bought side; shares solve C(q + shares) = C(q) + stake
+        v_logit := (p_yes_shares - p_no_shares) / v_b + LN(v_prior / (1.0 - v_prior));
+        IF p_side = 'NO' THEN
+            v_logit := -v_logit;
+        END IF;
+        v_shares := p_stake
+            + v_b * LN(1.0 - 0.5 * (1.0 - TANH(v_logit / 2.0)) * EXP(-p_stake / v_b))
+            + v_b * (GREATEST(-v_logit, 0.0) + LN(1.0 + EXP(-ABS(v_logit))));
+        price_cents := ROUND((p_stake / v_shares * 100.0)::NUMERIC, 2);
+        shares := ROUND(v_shares::NUMERIC, 4);
+        RETURN;
+    END IF;
+
+    v_yes_price := market_yes_price(
+        p_baseline_probability, p_yes_shares, p_no_shares, p_liquidity, p_sensitivity, p_floor, p_ceiling
+    );
+    IF p_side = 'YES' THEN
+        price_cents := ROUND(v_yes_price::NUMERIC, 2);
+    ELSE
+        price_cents := ROUND((100.0 - v_yes_price)::NUMERIC, 2);
+    END IF;
+    shares := ROUND((p_stake / price_cents * 100.0)::NUMERIC, 4);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Pricing settings the booking functions quote with, in a single row. The API writes its
+-- PRICING_* settings here before it first books a trade (services/storage/supabase.py), so
+-- SQL and Python quotes stay in step and callers cannot choose their own prices.
+CREATE TABLE IF NOT EXISTS pricing_settings (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    default_baseline DOUBLE PRECISION NOT NULL DEFAULT 0.5,
+    sensitivity DOUBLE PRECISION NOT NULL DEFAULT 0.045,
+    floor_cents DOUBLE PRECISION NOT NULL DEFAULT 5.0,
+    ceiling_cents DOUBLE PRECISION NOT NULL DEFAULT 95.0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO pricing_settings (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+-- No policies: only the service role, which bypasses RLS, reads or writes it
+ALTER TABLE pricing_settings ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON pricing_settings FROM PUBLIC, anon, authenticated;
+
+-- book_trade booked a single order; orders now go through book_trades, even one at a time
+DROP FUNCTION IF EXISTS book_trade(
+    UUID, UUID, TEXT, DOUBLE PRECISION, DOUBLE PRECISION,
+    DOUBLE PRECISION, DOUBLE PRECISION, DOUBLE PRECISION, DOUBLE PRECISION
+);
+DROP FUNCTION IF EXISTS book_trade(UUID, UUID, TEXT, DOUBLE PRECISION, DOUBLE PRECISION);
+
+-- Book a batch of trades for one user in one transaction. p_orders is a JSON array of
+-- {market_id, side, stake, limit_price_cents}. Depth rows are locked in market_id order so
+-- concurrent batches cannot deadlock. Each market's orders are priced in submission order
+-- against the depth left by the previous one, then all trades go in with a single INSERT.
+-- Returns one row per order on a known market, tagged with its zero-based position in
+-- p_orders; limit orders the market maker's price has not reached come back with a NULL id.
+-- Orders for unknown markets are skipped. Prices come from pricing_settings.
+-- Earlier versions took the pricing settings as arguments
+DROP FUNCTION IF EXISTS book_trades(
+    UUID, JSONB, DOUBLE PRECISION, DOUBLE PRECISION, DOUBLE PRECISION, DOUBLE PRECISION
+);
+CREATE OR REPLACE FUNCTION book_trades(
+    p_user_id UUID,
+    p_orders JSONB
+)
+RETURNS TABLE (
+    ordinal INTEGER,
+    id UUID,
+    user_id UUID,
+    market_id UUID,
+    side TEXT,
+    price_cents DOUBLE PRECISION,
+    shares DOUBLE PRECISION,
+    stake DOUBLE PRECISION,
+    created_at TIMESTAMPTZ
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_order RECORD;
+    v_pricing pricing_settings%ROWTYPE;
+    v_current_market UUID;
+    v_yes_shares DOUBLE PRECISION;
+    v_no_shares DOUBLE PRECISION;
+    v_fill RECORD;
+    v_stake DOUBLE PRECISION;
+    v_ordinals INTEGER[] := '{}';
+    v_ids UUID[] := '{}';
+    v_markets UUID[] := '{}';
+    v_sides TEXT[] := '{}';
+    v_prices DOUBLE PRECISION[] := '{}';
+    v_all_shares DOUBLE PRECISION[] := '{}';
+    v_stakes DOUBLE PRECISION[] := '{}';
+    v_unfilled INTEGER[] := '{}';
+BEGIN
+    SELECT * INTO STRICT v_pricing FROM pricing_settings;
+
+    INSERT INTO market_depth (market_id)
+    SELECT DISTINCT m.id
+    FROM jsonb_to_recordset(p_orders) AS o(market_id UUID)
+    JOIN markets m ON m.id = o.market_id
+    ON CONFLICT (market_id) DO NOTHING;
+
+    PERFORM 1
+    FROM market_depth d
+    WHERE d.market_id IN (SELECT (value->>'market_id')::UUID FROM jsonb_array_elements(p_orders))
+    ORDER BY d.market_id
+    FOR UPDATE;
+
+    FOR v_order IN
+        SELECT
+            (o.idx - 1)::INTEGER AS idx,
+            (o.value->>'market_id')::UUID AS market_id,
+            o.value->>'side' AS side,
+            (o.value->>'stake')::DOUBLE PRECISION AS stake,
+            (o.value->>'limit_price_cents')::DOUBLE PRECISION AS limit_price_cents,
+            m.pricing_engine,
+            m.baseline_probability,
+            m.initial_liquidity,
+            d.yes_shares,
+            d.no_shares
+        FROM jsonb_array_elements(p_orders) WITH ORDINALITY AS o(value, idx)
+        JOIN markets m ON m.id = (o.value->>'market_id')::UUID
+        JOIN market_depth d ON d.market_id = m.id
+        ORDER BY m.id, o.idx
+    LOOP
+        IF v_current_market IS DISTINCT FROM v_order.market_id THEN
+            v_current_market := v_order.market_id;
+            v_yes_shares := v_order.yes_shares;
+            v_no_shares := v_order.no_shares;
+        END IF;
+
+        v_stake := ROUND(v_order.stake::NUMERIC, 2);
+        SELECT * INTO v_fill FROM market_fill(
+            v_order.pricing_engine,
+            COALESCE(v_order.baseline_probability, v_pricing.default_baseline),
+            v_yes_shares,
+            v_no_shares,
+            COALESCE(v_order.initial_liquidity, v_yes_shares + v_no_shares + 1.0),
+            v_order.side,
+            v_stake,
+            v_pricing.sensitivity,
+            v_pricing.floor_cents,
+            v_pricing.ceiling_cents
+        );
+        IF v_order.limit_price_cents IS NOT NULL AND v_fill.price_cents > v_order.limit_price_cents THEN
+            v_unfilled := v_unfilled || v_order.idx;
+            CONTINUE;
+        END IF;
+
+        IF v_order.side = 'YES' THEN
+            v_yes_shares := v_yes_shares + v_fill.shares;
+        ELSE
+            v_no_shares := v_no_shares + v_fill.shares;
+        END IF;
+
+        v_ordinals := v_ordinals || v_order.idx;
+        v_ids := v_ids || gen_random_uuid();
+        v_markets := v_markets || v_order.market_id;
+        v_sides := v_sides || v_order.side;
+        v_prices := v_prices || v_fill.price_cents;
+        v_all_shares := v_all_shares || v_fill.shares;
+        v_stakes := v_stakes || v_stake;
+    END LOOP;
+
+    -- apply_trade_to_market_depth folds every row into the depth rows locked above
+    RETURN QUERY
+    WITH inserted AS (
+        INSERT INTO trades (id, user_id, market_id, side, price_cents, shares, stake, created_at)
+        SELECT b.id, p_user_id, b.market_id, b.side, b.price_cents, b.shares, b.stake, NOW()
+        FROM unnest(v_ids, v_markets, v_sides, v_prices, v_all_shares, v_stakes)
+            AS b(id, market_id, side, price_cents, shares, stake)
+        RETURNING *
+    )
+    SELECT u.ordinal, i.id, i.user_id, i.market_id, i.side, i.price_cents, i.shares, i.stake, i.created_at
+    FROM inserted i
+    JOIN unnest(v_ids, v_ordinals) AS u(id, ordinal) ON u.id = i.id
+    ORDER BY u.ordinal;
+
+    RETURN QUERY
+    SELECT u.ordinal, NULL::UUID, p_user_id, NULL::UUID, NULL::TEXT, NULL::DOUBLE PRECISION,
+        NULL::DOUBLE PRECISION, NULL::DOUBLE PRECISION, NULL::TIMESTAMPTZ
+    FROM unnest(v_unfilled) AS u(ordinal);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- It books for any p_user_id, bypassing the trades RLS policy, so only the API may call it
+REVOKE EXECUTE ON FUNCTION book_trades(UUID, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION book_trades(UUID, JSONB) TO service_role;
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Generate a production-sized synthetic dataset for scale and performance testing.
+
+Creates N markets, M users and K trades with skewed distributions: a few hot markets
+take most of the flow (Zipf-distributed market popularity) and a few whale traders
+place most trades and the largest stakes (Pareto-distributed user activity). Rows are
+written with chunked bulk inserts, either to Supabase or to a local SQLite database.
+
+Examples:
+    python scripts/generate_data.py --target sqlite --sqlite-path /tmp/tempora.db \\
+        --markets 5000 --users 20000 --trades 2000000
+    python scripts/generate_data.py --target supabase --markets 200 --users 50 --trades 50000
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import settings
+from core.supabase import SupabaseNotConfigured, get_async_supabase_client
+from services.storage import Storage, create_sqlite_storage, create_supabase_storage
+
+CATEGORIES = ["Economics", "Politics", "Technology", "Science", "Sports", "Climate", "Culture"]
+SUBJECTS = ["inflation", "the election", "AI regulation", "a Mars landing", "the World Cup", "sea ice", "box office"]
+# Concurrent admin calls when creating Supabase auth users
+AUTH_CONCURRENCY = 20
+
+
+def generate_markets(count: int, rng: random.Random, now: datetime, history_days: int) -> list[dict[str, Any]]:
+    markets = []
+    for index in range(count):
+        resolution = now + timedelta(days=rng.randint(30, 730))
+        markets.append(
+            {
+                "id": str(uuid.uuid4()),
+                "question": f"Synthetic market #{index}: will {rng.choice(SUBJECTS)} surprise by {resolution:%b %Y}?",
+                "category": rng.choice(CATEGORIES),
+                "status": "open",
+                "resolution_date": resolution.isoformat(),
+                "description": None,
+                "tags": ["synthetic"],
+                "baseline_probability": round(rng.betavariate(2, 2), 4),
+                "initial_liquidity": rng.choice([250.0, 500.0, 1000.0, 2500.0]),
+                "settlement_dates": [{"label": "Final Settlement", "date": resolution.isoformat()}],
+                "created_at": (now - timedelta(days=history_days * rng.random())).isoformat(timespec="microseconds"),
+            }
+        )
+    return markets
+
+
+def cumulative(weights: list[float]) -> list[float]:
+    return list(itertools.accumulate(weights))
+
+
+def generate_trades(
+    count: int,
+    markets: list[dict[str, Any]],
+    user_ids: list[str],
+    rng: random.Random,
+    now: datetime,
+    history_days: int,
+    market_skew: float,
+    whale_alpha: float,
+) -> Iterator[dict[str, Any]]:
+    """Yield trades lazily so millions of rows never sit in memory at once."""
+    # Zipf popularity over a shuffled ranking, so hot markets are not just the first ones created
+    ranks = list(range(1, len(markets) + 1))
+    rng.shuffle(ranks)
+    market_weights = cumulative([1.0 / rank**market_skew for rank in ranks])
+    # Heavy-tailed activity: whales trade often and, via stake_scale, in size
+    activity = [rng.paretovariate(whale_alpha) for _ in user_ids]
+    user_weights = cumulative(activity)
+    stake_scale = {user_id: weight**0.5 for user_id, weight in zip(user_ids, activity)}
+    history_seconds = history_days * 86400
+
+    for _ in range(count):
+        market = rng.choices(markets, cum_weights=market_weights)[0]
+        user_id = rng.choices(user_ids, cum_weights=user_weights)[0]
+        probability = market["baseline_probability"]
+        side = "YES" if rng.random() < probability else "NO"
+        yes_price = min(settings.pricing_ceiling, max(settings.pricing_floor, probability * 100 + rng.gauss(0, 5)))
+        price = round(yes_price if side == "YES" else 100.0 - yes_price, 2)
+        stake = round(min(25_000.0, 10.0 * stake_scale[user_id] * rng.lognormvariate(0, 0.75)), 2)
+        yield {
+            "user_id": user_id,
+            "market_id": market["id"],
+            "side": side,
+            "price_cents": price,
+            "shares": round(stake / price * 100.0, 4),
+            "stake": stake,
+            "created_at": (now - timedelta(seconds=history_seconds * rng.random())).isoformat(timespec="microseconds"),
+        }
+
+
+def chunked(rows: Iterator[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+
+async def create_users(count: int, target: str, client: Any) -> list[dict[str, Any]]:
+    """Profiles for ``count`` users; on Supabase each one is first created in auth.users."""
+    if target == "sqlite":
+        return [
+            {"id": str(uuid.uuid4()), "email": f"synthetic-{index}@example.test", "display_name": f"Trader {index}"}
+            for index in range(count)
+        ]
+
+    semaphore = asyncio.Semaphore(AUTH_CONCURRENCY)
+    run_id = uuid.uuid4().hex[:8]
+
+    async def create(index: int) -> dict[str, Any]:
+        email = f"synthetic-{run_id}-{index}@example.test"
+        async with semaphore:
+            response = await client.auth.admin.create_user(
+                {"email": email, "password": uuid.uuid4().hex, "email_confirm": True}
+            )
+        return {"id": response.user.id, "email": email, "display_name": f"Trader {index}"}
+
+    return await asyncio.gather(*(create(index) for index in range(count)))
+
+
+async def write_chunks(label: str, total: int, chunks: Iterator[list[dict[str, Any]]], insert: Any) -> None:
+    written = 0
+    started = time.perf_counter()
+    for chunk in chunks:
+        written += await insert(chunk)
+        rate = written / max(time.perf_counter() - started, 1e-9)
+        print(f"  {label}: {written:>10,}/{total:,}  ({rate:,.0f} rows/s)", end="\r", flush=True)
+    print()
+
+
+async def generate(args: argparse.Namespace) -> None:
+    client = None
+    if args.target == "supabase":
+        try:
+            client = await get_async_supabase_client()
+        except SupabaseNotConfigured as exc:
+            print(f"ERROR: {exc}")
+            sys.exit(1)
+        storage: Storage = create_supabase_storage(client)
+    else:
+        storage = create_sqlite_storage(args.sqlite_path)
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+
+    print(f"Generating {args.markets:,} markets, {args.users:,} users, {args.trades:,} trades → {args.target}")
+    markets = generate_markets(args.markets, rng, now, args.history_days)
+    await write_chunks("markets", len(markets), chunked(iter(markets), args.chunk_size), storage.markets.insert_many)
+
+    profiles = await create_users(args.users, args.target, client)
+    for profile in profiles:
+        profile["joined_at"] = (now - timedelta(days=args.history_days * rng.random())).isoformat()
+    await write_chunks("profiles", len(profiles), chunked(iter(profiles), args.chunk_size), storage.profiles.upsert_many)
+
+    trades = generate_trades(
+        args.trades,
+        markets,
+        [profile["id"] for profile in profiles],
+        rng,
+        now,
+        args.history_days,
+        args.market_skew,
+        args.whale_alpha,
+    )
+    await write_chunks("trades", args.trades, chunked(trades, args.chunk_size), storage.trades.insert_many)
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["supabase", "sqlite"], default=settings.storage_backend)
+    parser.add_argument("--sqlite-path", default=settings.sqlite_path)
+    parser.add_argument("--markets", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--trades", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk insert")
+    parser.add_argument("--history-days", type=int, default=180, help="Spread created_at over this many days")
+    parser.add_argument("--market-skew", type=float, default=1.1, help="Zipf exponent of market popularity")
+    parser.add_argument("--whale-alpha", type=float, default=1.2, help="Pareto shape of user activity; lower is more skewed")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.target == "sqlite" and args.sqlite_path == ":memory:":
+        print("ERROR: --sqlite-path must point to a file; an in-memory database is discarded on exit.")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    asyncio.run(generate(args))
+    print(f"\n✓ Generated dataset in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
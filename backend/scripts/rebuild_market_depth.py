@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Rebuild the market_depth aggregate from the trades table.
+
+Run this after bulk-loading trades outside the API, or whenever depth drifts from the
+trade history. Pass --market-id to reconcile a single market.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import settings
+from core.supabase import require_supabase_client
+
+
+def rebuild_market_depth(market_id: str | None = None) -> None:
+    """Recompute depth rows via the rebuild_market_depth database function."""
+    supabase = require_supabase_client()
+
+    scope = f"market {market_id}" if market_id else "all markets"
+    print(f"Rebuilding market depth for {scope}...")
+    result = supabase.rpc("rebuild_market_depth", {"p_market_id": market_id}).execute()
+    print(f"✓ Rebuilt {result.data or 0} depth rows")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Rebuild market_depth from trades.")
+    parser.add_argument("--market-id", default=None, help="Only rebuild this market")
+    args = parser.parse_args()
+
+    print(f"Supabase URL: {settings.supabase_url}")
+
+    if not settings.supabase_url or not settings.supabase_service_role_key:
+        print("ERROR: Supabase credentials not configured!")
+        print("Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables.")
+        sys.exit(1)
+
+    try:
+        rebuild_market_depth(args.market_id)
+    except Exception as e:
+        print(f"\n✗ Rebuild failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
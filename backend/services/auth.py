@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import time
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 
+import jwt
 from fastapi import HTTPException, status
-from supabase import Client
+from supabase import AsyncClient
 
+from core.cache import TTLCache
+from core.config import settings
+from core.tokens import TokenVerificationUnavailable, unverified_expiry, verify_access_token
 from schemas.user import (
     AuthResponse,
     AuthTokens,
@@ -14,15 +21,27 @@ from schemas.user import (
     UserBase,
     UserProfile,
 )
+from services.storage import Storage
 
+# Users resolved from access tokens, keyed by the token's SHA-256 digest so raw tokens
+# are never held in memory. Entries never outlive the token's own expiry.
+token_cache: TTLCache[str, UserBase] = TTLCache(
+    max_entries=settings.auth_token_cache_max_entries,
+    ttl_seconds=settings.auth_token_cache_ttl_seconds,
+)
 
-class AuthService:
-    def __init__(self, supabase: Client) -> None:
-        self.supabase = supabase
 
-    def register(self, payload: RegisterRequest) -> AuthResponse:
+class AuthService:
+    def __init__(self, storage: Storage, auth_client: Optional[AsyncClient] = None) -> None:
+        self.storage = storage
+        # Supabase Auth issues and revokes sessions; without it tokens can still be
+        # verified locally against SUPABASE_JWT_SECRET
+        self.auth_client = auth_client
+
+    async def register(self, payload: RegisterRequest) -> AuthResponse:
+        client = self._require_auth_client()
         try:
-            response = self.supabase.auth.sign_up(
+            response = await client.auth.sign_up(
                 {
                     "email": payload.email,
                     "password": payload.password,
@@ -35,7 +54,7 @@ class AuthService:
         if not response.user or not response.session:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unable to create user")
 
-        self._sync_profile(
+        await self._sync_profile(
             user_id=response.user.id,
             email=response.user.email or payload.email,
             display_name=payload.display_name,
@@ -44,16 +63,17 @@ class AuthService:
 
         return self._build_auth_response(response.user, response.session.access_token, response.session.refresh_token)
 
-    def login(self, payload: LoginRequest) -> AuthResponse:
+    async def login(self, payload: LoginRequest) -> AuthResponse:
+        client = self._require_auth_client()
         try:
-            response = self.supabase.auth.sign_in_with_password({"email": payload.email, "password": payload.password})
+            response = await client.auth.sign_in_with_password({"email": payload.email, "password": payload.password})
         except Exception as exc:  # pragma: no cover
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
 
         if not response.user or not response.session:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        self._sync_profile(
+        await self._sync_profile(
             user_id=response.user.id,
             email=response.user.email or payload.email,
             display_name=self._display_name_from_metadata(response.user.user_metadata),
@@ -62,9 +82,39 @@ class AuthService:
 
         return self._build_auth_response(response.user, response.session.access_token, response.session.refresh_token)
 
-    def get_user_from_token(self, access_token: str) -> UserBase:
+    async def get_user_from_token(self, access_token: str) -> UserBase:
+        cache_key = hashlib.sha256(access_token.encode()).hexdigest()
+        cached = token_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            claims = await verify_access_token(access_token)
+        except TokenVerificationUnavailable:
+            user = await self._get_user_from_supabase(access_token)
+            # Supabase accepted the token, so its expiry can bound the entry without a signature check
+            expiry = unverified_expiry(access_token)
+            ttl_seconds = settings.auth_token_cache_ttl_seconds
+            if expiry is not None:
+                ttl_seconds = min(ttl_seconds, expiry - time.time())
+            if ttl_seconds > 0:
+                token_cache.set(cache_key, user, ttl_seconds=ttl_seconds)
+            return user
+        except jwt.ExpiredSignatureError as exc:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Access token expired") from exc
+        except jwt.InvalidTokenError as exc:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid access token") from exc
+
+        user = self._user_from_claims(claims)
+        remaining = claims["exp"] - time.time()
+        token_cache.set(cache_key, user, ttl_seconds=min(settings.auth_token_cache_ttl_seconds, remaining))
+        return user
+
+    async def _get_user_from_supabase(self, access_token: str) -> UserBase:
+        if self.auth_client is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid access token")
         try:
-            result = self.supabase.auth.get_user(access_token)
+            result = await self.auth_client.auth.get_user(access_token)
         except Exception as exc:  # pragma: no cover
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid access token") from exc
 
@@ -80,24 +130,23 @@ class AuthService:
             }
         )
 
-    def get_profile(self, user_id: str) -> UserProfile:
-        response = self.supabase.table("profiles").select("*").eq("id", user_id).single().execute()
-        profile = response.data
-        if not profile:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-
-        trades = (
-            self.supabase.table("trades")
-            .select("market_id, stake, side")
-            .eq("user_id", user_id)
-            .execute()
-            .data
-            or []
+    def _user_from_claims(self, claims: dict[str, Any]) -> UserBase:
+        return UserBase.model_validate(
+            {
+                "id": claims["sub"],
+                "email": claims.get("email"),
+                "displayName": self._display_name_from_metadata(claims.get("user_metadata")),
+            }
         )
 
-        total_trades = len(trades)
-        open_positions = len({trade["market_id"] for trade in trades})
-        realised_pnl = 0.0  # Placeholder until settlement logic exists
+    async def get_profile(self, user_id: str) -> UserProfile:
+        profile, stats = await asyncio.gather(
+            self.storage.profiles.get(user_id),
+            self.storage.profiles.stats(user_id),
+        )
+        if not profile:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+        stats = stats or {}
 
         mapped = {
             "id": profile["id"],
@@ -105,13 +154,14 @@ class AuthService:
             "displayName": profile.get("display_name"),
             "joinedAt": profile.get("joined_at"),
             "lastSeenAt": profile.get("last_seen_at"),
-            "totalTrades": total_trades,
-            "openPositions": open_positions,
-            "realisedPnL": round(realised_pnl, 2),
+            "totalTrades": stats.get("total_trades", 0),
+            "openPositions": stats.get("open_positions", 0),
+            "totalStaked": round(stats.get("total_staked", 0.0), 2),
+            "realisedPnL": round(stats.get("realised_pnl", 0.0), 2),
         }
         return UserProfile.model_validate(mapped)
 
-    def _sync_profile(
+    async def _sync_profile(
         self,
         *,
         user_id: str,
@@ -127,7 +177,15 @@ class AuthService:
             "joined_at": (joined_at or datetime.now(timezone.utc)).isoformat(),
             "last_seen_at": last_seen_at.isoformat() if last_seen_at else None,
         }
-        self.supabase.table("profiles").upsert(profile_payload).execute()
+        await self.storage.profiles.upsert(profile_payload)
+
+    def _require_auth_client(self) -> AsyncClient:
+        if self.auth_client is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Supabase Auth is not configured. Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY.",
+            )
+        return self.auth_client
 
     def _display_name_from_metadata(self, metadata: Optional[dict]) -> Optional[str]:
         if not metadata:
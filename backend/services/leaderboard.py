@@ -0,0 +1,220 @@
+"""Trader rankings by unrealised P&L, rebuilt from stored positions on a cadence.
+
+Standings are built from the ``user_positions`` aggregate, one row per trader and market
+kept current by a trigger on ``trades``, and marked against the current quote of each
+market held, the same way ``PortfolioService`` values a portfolio. They sit in a
+``SortedList`` ordered by P&L, so the top N and any one trader's rank are O(log n) reads
+rather than a portfolio valuation per user.
+
+Every ``leaderboard_remark_seconds`` the standings are rebuilt in the background from
+storage and swapped in whole, so trades booked by any worker, script or direct SQL reach
+the rankings within one cadence, and every worker converges on the same standings.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sortedcontainers import SortedList
+
+from core.config import settings
+from schemas.leaderboard import LeaderboardEntry, LeaderboardResponse
+from services.markets import MarketService
+from services.storage import Storage
+
+logger = logging.getLogger(__name__)
+
+# Markets quoted per request while marking, as storage chunks its ``in.(...)`` filters
+_MARK_CHUNK_SIZE = 500
+
+
+@dataclass(slots=True)
+class Standing:
+    user_id: str
+    # (market_id, side) -> shares
+    positions: dict[tuple[str, str], float] = field(default_factory=dict)
+    cost_basis: float = 0.0
+    market_value: float = 0.0
+    trades: int = 0
+    key: Optional[tuple[float, str]] = None  # entry in the ranking
+
+    @property
+    def pnl(self) -> float:
+        return self.market_value - self.cost_basis
+
+    @property
+    def roi(self) -> float:
+        return self.pnl / self.cost_basis * 100 if self.cost_basis > 0 else 0.0
+
+
+class Leaderboard:
+    """Every trader's standing, ranked by P&L, as of the last rebuild."""
+
+    def __init__(self, *, remark_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.remark_seconds = remark_seconds
+        self._clock = clock
+        self._standings: dict[str, Standing] = {}
+        self._ranking: SortedList = SortedList()  # (-pnl, user_id), best first
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._rebuild_task: Optional[asyncio.Task[None]] = None
+        self._rebuilt_at = float("-inf")
+        self.marked_at: Optional[datetime] = None
+        self.positions = 0
+        self.markets = 0
+        self.rebuilds = 0
+
+    async def load(self, storage: Storage) -> None:
+        """Build the standings on first use."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            await self.rebuild(storage)
+            self._loaded = True
+
+    async def refresh(self, storage: Storage) -> None:
+        """Load on first use, then rebuild in the background once the standings are stale."""
+        await self.load(storage)
+        stale = self._clock() - self._rebuilt_at >= self.remark_seconds
+        if stale and (self._rebuild_task is None or self._rebuild_task.done()):
+            self._rebuild_task = asyncio.get_running_loop().create_task(self._rebuild_in_background(storage))
+
+    async def rebuild(self, storage: Storage) -> None:
+        """Read every trader's positions, mark them to current quotes and swap in the new ranking."""
+        self._rebuilt_at = self._clock()
+        standings: dict[str, Standing] = {}
+        held: dict[str, None] = {}
+        positions = 0
+        after: Optional[tuple[str, str]] = None
+        page_size = settings.export_page_size
+        while True:
+            rows = await storage.profiles.positions(limit=page_size, after=after)
+            self._fold_positions(standings, held, rows)
+            positions += len(rows)
+            if len(rows) < page_size:
+                break
+            after = (rows[-1]["user_id"], rows[-1]["market_id"])
+
+        marks = await self._marks(storage, list(held))
+        for standing in standings.values():
+            # A market that no longer quotes (it was deleted) has no mark and counts for nothing
+            standing.market_value = sum(
+                shares * marks[market_id][0 if side == "YES" else 1] / 100
+                for (market_id, side), shares in standing.positions.items()
+                if market_id in marks
+            )
+            standing.key = (-standing.pnl, standing.user_id)
+        self._standings = standings
+        self._ranking = SortedList(standing.key for standing in standings.values())
+        self.marked_at = datetime.now(timezone.utc)
+        self.positions = positions
+        self.markets = len(held)
+        self.rebuilds += 1
+
+    def top(self, offset: int, limit: int) -> list[tuple[int, Standing]]:
+        """Standings ranked ``offset + 1`` to ``offset + limit``, with their ranks."""
+        standings = self._standings
+        keys = self._ranking.islice(offset, offset + limit)
+        return [(offset + index + 1, standings[user_id]) for index, (_, user_id) in enumerate(keys)]
+
+    def standing(self, user_id: str) -> Optional[tuple[int, Standing]]:
+        standing = self._standings.get(user_id)
+        if standing is None or standing.key is None:
+            return None
+        return self._ranking.index(standing.key) + 1, standing
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "loaded": self._loaded,
+            "traders": len(self._ranking),
+            "markets": self.markets,
+            "positions": self.positions,
+            "rebuilds": self.rebuilds,
+        }
+
+    @staticmethod
+    def _fold_positions(
+        standings: dict[str, Standing], held: dict[str, None], rows: Iterable[dict[str, Any]]
+    ) -> None:
+        """Add ``user_positions`` rows, each a trader's totals on one market."""
+        for row in rows:
+            user_id, market_id = row["user_id"], row["market_id"]
+            standing = standings.get(user_id)
+            if standing is None:
+                standing = standings[user_id] = Standing(user_id)
+            for side, column in (("YES", "yes_shares"), ("NO", "no_shares")):
+                if row[column]:
+                    standing.positions[(market_id, side)] = row[column]
+            standing.cost_basis += row["total_staked"]
+            standing.trades += row["trade_count"]
+            held[market_id] = None
+
+    @staticmethod
+    async def _marks(storage: Storage, market_ids: list[str]) -> dict[str, tuple[float, float]]:
+        """Current (yes, no) price in cents of each market that still quotes."""
+        service = MarketService(storage)
+        marks: dict[str, tuple[float, float]] = {}
+        for start in range(0, len(market_ids), _MARK_CHUNK_SIZE):
+            markets = await service.get_markets(market_ids[start : start + _MARK_CHUNK_SIZE])
+            for market_id, market in markets.items():
+                marks[market_id] = (market.quote.yes_price_cents, market.quote.no_price_cents)
+        return marks
+
+    async def _rebuild_in_background(self, storage: Storage) -> None:
+        try:
+            await self.rebuild(storage)
+        except Exception:  # pragma: no cover - a failed rebuild keeps the previous standings
+            logger.exception("Failed to rebuild the leaderboard")
+
+
+class LeaderboardService:
+    def __init__(self, storage: Storage) -> None:
+        self.storage = storage
+
+    async def get_leaderboard(self, *, limit: int, offset: int = 0) -> LeaderboardResponse:
+        await leaderboard.refresh(self.storage)
+        ranked = leaderboard.top(offset, limit)
+        names = await self._display_names([standing.user_id for _, standing in ranked])
+        return LeaderboardResponse(
+            entries=[self._entry(rank, standing, names.get(standing.user_id)) for rank, standing in ranked],
+            total_traders=len(leaderboard),
+            marked_at=leaderboard.marked_at,
+        )
+
+    async def get_standing(self, user_id: str) -> LeaderboardEntry:
+        await leaderboard.refresh(self.storage)
+        ranked = leaderboard.standing(user_id)
+        if ranked is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No trades yet")
+        rank, standing = ranked
+        names = await self._display_names([user_id])
+        return self._entry(rank, standing, names.get(user_id))
+
+    async def _display_names(self, user_ids: list[str]) -> dict[str, Optional[str]]:
+        profiles = await self.storage.profiles.get_many(user_ids)
+        return {profile["id"]: profile.get("display_name") for profile in profiles}
+
+    def _entry(self, rank: int, standing: Standing, display_name: Optional[str]) -> LeaderboardEntry:
+        return LeaderboardEntry(
+            rank=rank,
+            user_id=standing.user_id,
+            display_name=display_name,
+            pnl=round(standing.pnl, 2) or 0.0,
+            roi=round(standing.roi, 2) or 0.0,
+            volume=round(standing.cost_basis, 2),
+            trades=standing.trades,
+        )
+
+
+# Shared by every LeaderboardService in the process
+leaderboard = Leaderboard(remark_seconds=settings.leaderboard_remark_seconds)
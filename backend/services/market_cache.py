@@ -0,0 +1,289 @@
+"""The shared tier of market caching: quotes, rows and list pages reachable from every worker.
+
+Sits behind each worker's own ``quote_cache``. Keys in the ``SharedCache``:
+
+- ``markets:gen`` counts changes to any market row (creates and updates);
+- ``markets:v:{id}`` counts changes that may move a market's quote (trades, updates);
+- ``markets:quote:{id}``, ``markets:row:{id}`` and ``markets:page:{digest}`` hold a
+  quoted market, a market row and one ``list_markets`` page, each prefixed with the
+  counter value (``v`` for quotes, ``gen`` otherwise) read before the data behind it.
+
+Counters and entries are fetched in the same round-trip and an entry only counts as a
+hit while its counter is unchanged, so a copy computed from reads that a concurrent
+write overtook is never served, whichever worker stored it. Writes bump the counters
+and publish the changed ids on ``markets:changed``; every other worker then drops its
+own cached quotes for them. Entries expire after ``ttl_seconds``, which bounds
+staleness from writes made outside the API.
+
+A failed call puts the tier out of use for ``retry_seconds``: reads, stores and
+subscribing skip the store until then, so an outage does not cost every request a
+connect timeout. Changes are still published, since other workers rely on them.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import orjson
+
+from schemas.market import MarketWithQuote
+from services.shared_cache import SharedCache, SharedCacheError
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "markets:changed"
+_GENERATION = "markets:gen"
+
+
+def _pack(version: int, payload: bytes) -> bytes:
+    return b"%d\n%s" % (version, payload)
+
+
+def _unpack(value: Optional[bytes], version: int) -> Optional[bytes]:
+    """The payload of ``value`` if it was stored under ``version``."""
+    if value is None:
+        return None
+    prefix, _, payload = value.partition(b"\n")
+    return payload if prefix == b"%d" % version else None
+
+
+@dataclass(slots=True)
+class SharedLookup:
+    """What the shared tier held for some markets, and the counters to store fresh copies under.
+
+    ``available`` is false when the tier is off or unreachable; nothing is stored then.
+    """
+
+    available: bool = False
+    generation: int = 0
+    versions: dict[str, int] = field(default_factory=dict)
+    quotes: dict[str, MarketWithQuote] = field(default_factory=dict)
+    rows: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class SharedPage:
+    available: bool = False
+    generation: int = 0
+    rows: Optional[list[dict[str, Any]]] = None
+    next_cursor: Optional[str] = None
+
+
+class SharedMarketCache:
+    """Shared quotes, rows and pages; a no-op when ``backend`` is ``None``.
+
+    ``on_change`` receives the ids another worker changed and ``on_gap`` is called when
+    such messages may have been missed.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[SharedCache],
+        *,
+        ttl_seconds: float,
+        on_change: Callable[[list[str]], None],
+        on_gap: Callable[[], None],
+        retry_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._on_change = on_change
+        self._on_gap = on_gap
+        self._origin = secrets.token_hex(8)
+        self._subscribed = False
+        self._subscribe_failed = False
+        self._healthy = True
+        self._retry_at = float("-inf")
+        self.hits = {"quote": 0, "row": 0, "page": 0}
+        self.misses = {"quote": 0, "row": 0, "page": 0}
+        self.errors = 0
+        self.published = 0
+        self.received = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def lookup(self, market_ids: Sequence[str], *, rows: bool = True) -> SharedLookup:
+        """Shared quotes of ``market_ids`` and, with ``rows``, the rows of the unquoted ones."""
+        if self.backend is None or not market_ids:
+            return SharedLookup()
+        keys = [_GENERATION, *(f"markets:v:{market_id}" for market_id in market_ids)]
+        keys.extend(f"markets:quote:{market_id}" for market_id in market_ids)
+        if rows:
+            keys.extend(f"markets:row:{market_id}" for market_id in market_ids)
+        values = await self._get(keys)
+        if values is None:
+            return SharedLookup()
+
+        count = len(market_ids)
+        result = SharedLookup(available=True, generation=int(values[0] or 0))
+        for index, market_id in enumerate(market_ids):
+            version = result.versions[market_id] = int(values[1 + index] or 0)
+            quote = _unpack(values[1 + count + index], version)
+            if quote is not None:
+                result.quotes[market_id] = MarketWithQuote.model_validate_json(quote)
+                continue
+            self.misses["quote"] += 1
+            if not rows:
+                continue
+            row = _unpack(values[1 + 2 * count + index], result.generation)
+            if row is not None:
+                result.rows[market_id] = orjson.loads(row)
+                self.hits["row"] += 1
+            else:
+                self.misses["row"] += 1
+        self.hits["quote"] += len(result.quotes)
+        return result
+
+    async def store(
+        self,
+        lookup: SharedLookup,
+        markets: Iterable[MarketWithQuote] = (),
+        rows: Iterable[dict[str, Any]] = (),
+    ) -> None:
+        """Share freshly computed quotes and freshly read rows under the counters ``lookup`` read."""
+        if self.backend is None or not lookup.available:
+            return
+        items = {
+            f"markets:quote:{market.id}": _pack(
+                lookup.versions[market.id], market.model_dump_json(by_alias=True).encode()
+            )
+            for market in markets
+            if market.id in lookup.versions
+        }
+        items.update((f"markets:row:{row['id']}", _pack(lookup.generation, orjson.dumps(row))) for row in rows)
+        await self._set(items)
+
+    async def page(self, *query: object) -> SharedPage:
+        if self.backend is None:
+            return SharedPage()
+        key = self._page_key(query)
+        values = await self._get([_GENERATION, key])
+        if values is None:
+            return SharedPage()
+        generation = int(values[0] or 0)
+        payload = _unpack(values[1], generation)
+        if payload is None:
+            self.misses["page"] += 1
+            return SharedPage(available=True, generation=generation)
+        self.hits["page"] += 1
+        page = orjson.loads(payload)
+        return SharedPage(available=True, generation=generation, rows=page["rows"], next_cursor=page["nextCursor"])
+
+    async def store_page(
+        self, page: SharedPage, rows: list[dict[str, Any]], next_cursor: Optional[str], *query: object
+    ) -> None:
+        if self.backend is None or not page.available:
+            return
+        payload = orjson.dumps({"rows": rows, "nextCursor": next_cursor})
+        await self._set({self._page_key(query): _pack(page.generation, payload)})
+
+    async def publish_change(self, market_ids: Sequence[str], *, rows: bool = False) -> None:
+        """Retire shared entries of ``market_ids`` (and every row and page with ``rows``) and tell the other workers."""
+        if self.backend is None or not market_ids:
+            return
+        counters = [f"markets:v:{market_id}" for market_id in market_ids]
+        if rows:
+            counters.append(_GENERATION)
+        message = orjson.dumps({"origin": self._origin, "marketIds": list(market_ids)})
+        try:
+            await self.backend.incr_many(counters)
+            await self.backend.publish(CHANNEL, message)
+        except SharedCacheError as exc:
+            self._failed(exc)
+            return
+        self.published += 1
+
+    async def subscribe(self) -> None:
+        """Start listening for other workers' changes; later calls do nothing."""
+        if self.backend is None or self._subscribed or self._cooling_down():
+            return
+        self._subscribed = True
+        try:
+            await self.backend.subscribe(CHANNEL, self._receive)
+        except SharedCacheError as exc:
+            self._subscribed = False
+            self._subscribe_failed = True
+            self._failed(exc)
+            return
+        if self._subscribe_failed:
+            # Changes published before the subscription went through were never seen
+            self._subscribe_failed = False
+            self._on_gap()
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+        self._subscribed = False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "errors": self.errors,
+            "published": self.published,
+            "received": self.received,
+        }
+
+    def _receive(self, message: Optional[bytes]) -> None:
+        if message is None:
+            self._on_gap()
+            return
+        try:
+            change = orjson.loads(message)
+            origin, market_ids = change["origin"], change["marketIds"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning("Ignoring malformed shared cache message %r", message[:200])
+            return
+        # This worker already forgot its own changes before publishing them
+        if origin != self._origin:
+            self.received += 1
+            self._on_change(market_ids)
+
+    async def _get(self, keys: list[str]) -> Optional[list[Optional[bytes]]]:
+        assert self.backend is not None
+        await self.subscribe()
+        if self._cooling_down():
+            return None
+        try:
+            values = await self.backend.get_many(keys)
+        except SharedCacheError as exc:
+            self._failed(exc)
+            return None
+        self._healthy = True
+        return values
+
+    async def _set(self, items: dict[str, bytes]) -> None:
+        assert self.backend is not None
+        if not items or self._cooling_down():
+            return
+        try:
+            await self.backend.set_many(items, self.ttl_seconds)
+        except SharedCacheError as exc:
+            self._failed(exc)
+
+    def _page_key(self, query: tuple[object, ...]) -> str:
+        digest = hashlib.blake2b(repr(query).encode(), digest_size=12).hexdigest()
+        return f"markets:page:{digest}"
+
+    def _cooling_down(self) -> bool:
+        return self._clock() < self._retry_at
+
+    def _failed(self, exc: SharedCacheError) -> None:
+        self.errors += 1
+        self._retry_at = self._clock() + self.retry_seconds
+        # Once per outage, not once per request
+        if self._healthy:
+            logger.warning(
+                "Shared cache unavailable, reading through to storage; retrying every %gs: %s", self.retry_seconds, exc
+            )
+        self._healthy = False
@@ -1,46 +1,227 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 from fastapi import HTTPException, status
-from supabase import Client
 
+from core.cache import SingleFlight, TTLCache, VersionClock
 from core.config import settings
+from core.http_cache import make_etag
+from core.metrics import span
+from core.pagination import decode_cursor, paginate
 from schemas.market import (
+    Candle,
     MarketCreate,
+    MarketHistoryResponse,
     MarketListResponse,
     MarketUpdate,
     MarketWithQuote,
     SettlementDate,
 )
-from services.pricing import MarketPricingInputs, calculate_market_quote
+from services.market_cache import SharedMarketCache
+from services.pricing import (
+    MarketPricingInputs,
+    calculate_market_quote,
+    calculate_market_quotes_batch,
+    market_pricing_inputs,
+)
+from services.shared_cache import create_shared_cache
+from services.storage import Storage
+
+# Quoted markets keyed by market id, shared by every MarketService in the process.
+# Trades and market updates invalidate their entry; the TTL bounds staleness from
+# writes made by other processes.
+quote_cache: TTLCache[str, MarketWithQuote] = TTLCache(
+    max_entries=settings.quote_cache_max_entries,
+    ttl_seconds=settings.quote_cache_ttl_seconds,
+)
+
+# Bumped whenever a market's quote or fields change, so a read can tell whether a write
+# landed while it ran and keep its possibly stale result out of the cache.
+market_versions: VersionClock[str] = VersionClock()
+
+# Cache-missing reads of the same market, or the same list page, that are in flight at
+# once share one trip to the shared tier and storage. A change detaches the reads it
+# may have overtaken, so requests arriving after a write never join one from before it.
+market_reads: SingleFlight[str, MarketWithQuote] = SingleFlight(
+    "market", enabled=settings.read_coalescing_enabled
+)
+page_reads: SingleFlight[tuple[Any, ...], MarketListResponse] = SingleFlight(
+    "market_page", enabled=settings.read_coalescing_enabled
+)
+
+
+# Told the ids of markets another worker changed, once this worker has forgotten them
+remote_change_listeners: list[Callable[[list[str]], None]] = []
+
+
+def _forget(market_ids: list[str]) -> None:
+    """Drop this worker's cached quotes and in-flight reads of changed markets."""
+    for market_id in market_ids:
+        quote_cache.invalidate(market_id)
+        market_versions.bump(market_id)
+        market_reads.forget(market_id)
+    page_reads.clear()
+
+
+def _validator(market: MarketWithQuote) -> tuple[object, ...]:
+    return (
+        market.id,
+        market.updated_at,
+        market.total_volume,
+        market.open_interest,
+        market.quote.yes_price_cents,
+    )
+
+
+def _calculated_at(record: dict[str, Any], depth: dict[str, Any]) -> datetime:
+    """When the inputs of a market's quote last changed in storage: its row or its depth."""
+    changed = [
+        datetime.fromisoformat(value) if isinstance(value, str) else value
+        for value in (record.get("updated_at"), depth["updated_at"])
+        if value
+    ]
+    return max(changed) if changed else datetime.now(timezone.utc)
+
+
+def _changed_elsewhere(market_ids: list[str]) -> None:
+    _forget(market_ids)
+    for listener in remote_change_listeners:
+        listener(market_ids)
+
+
+def _forget_everything() -> None:
+    quote_cache.clear()
+    market_versions.reset()
+    market_reads.clear()
+    page_reads.clear()
+
+
+# Quotes, rows and list pages shared by every worker when SHARED_CACHE_BACKEND is set,
+# consulted after quote_cache misses and before storage; a no-op otherwise
+shared_markets = SharedMarketCache(
+    create_shared_cache(),
+    ttl_seconds=settings.shared_cache_ttl_seconds,
+    retry_seconds=settings.shared_cache_retry_seconds,
+    on_change=_changed_elsewhere,
+    on_gap=_forget_everything,
+)
 
 
 class MarketService:
-    def __init__(self, supabase: Client) -> None:
-        self.supabase = supabase
-
-    def list_markets(self, *, category: Optional[str] = None, status_filter: Optional[str] = None) -> MarketListResponse:
-        query = self.supabase.table("markets").select("*")
-        if category:
-            query = query.eq("category", category)
-        if status_filter:
-            query = query.eq("status", status_filter)
-
-        response = query.order("created_at", desc=True).execute()
-        records = response.data or []
-        items = [self._attach_quote(record) for record in records]
-        return MarketListResponse(items=items, count=len(items))
-
-    def get_market(self, market_id: str) -> MarketWithQuote:
-        response = self.supabase.table("markets").select("*").eq("id", market_id).single().execute()
-        record = response.data
-        if not record:
+    def __init__(self, storage: Storage) -> None:
+        self.storage = storage
+
+    async def list_markets(
+        self,
+        *,
+        category: Optional[str] = None,
+        status_filter: Optional[str] = None,
+        limit: int = settings.page_default_limit,
+        cursor: Optional[str] = None,
+    ) -> MarketListResponse:
+        query = (category, status_filter, limit, cursor)
+        return await page_reads.run(query, lambda: self._read_page(*query))
+
+    async def get_market(self, market_id: str, *, use_cache: bool = True) -> MarketWithQuote:
+        if not use_cache:
+            return await self._read_market(market_id)
+        cached = quote_cache.get(market_id)
+        if cached is not None:
+            return cached
+        return await market_reads.run(market_id, lambda: self._read_market(market_id))
+
+    async def get_markets(self, market_ids: Iterable[str]) -> dict[str, MarketWithQuote]:
+        """Quote many markets, fetching rows and depth for the cache misses concurrently."""
+        markets: dict[str, MarketWithQuote] = {}
+        missing = []
+        for market_id in dict.fromkeys(market_ids):
+            cached = quote_cache.get(market_id)
+            if cached is not None:
+                markets[market_id] = cached
+            else:
+                missing.append(market_id)
+
+        if missing:
+            since = market_versions.current
+            lookup = await shared_markets.lookup(missing)
+            for market_id, shared in lookup.quotes.items():
+                markets[market_id] = self._remember(shared, since=since)
+            unquoted = [market_id for market_id in missing if market_id not in lookup.quotes]
+            unread = [market_id for market_id in unquoted if market_id not in lookup.rows]
+            read, depths = await asyncio.gather(
+                self._market_rows(unread),
+                self._market_depths(unquoted),
+            )
+            records = [lookup.rows[market_id] for market_id in unquoted if market_id in lookup.rows] + read
+            fresh = self._attach_quotes(records, depths, since=since)
+            for market in fresh:
+                markets[market.id] = market
+            await shared_markets.store(lookup, fresh, read)
+        return markets
+
+    async def get_history(
+        self,
+        market_id: str,
+        *,
+        interval: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = settings.page_default_limit,
+    ) -> MarketHistoryResponse:
+        """The latest ``limit`` candles starting in ``[start, end)``, oldest first.
+
+        Intervals without trades have no candle.
+        """
+        rows = await self.storage.markets.candles(
+            market_id,
+            period=interval,
+            start=self._timestamp(start),
+            end=self._timestamp(end),
+            limit=limit,
+        )
+        # Only an empty history needs telling apart from an unknown market
+        if not rows and not await self.storage.markets.get(market_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Market not found")
-        return self._attach_quote(record)
+        candles = [
+            Candle(
+                start=row["bucket_start"],
+                open=row["open"],
+                high=row["high"],
+                low=row["low"],
+                close=row["close"],
+                volume=round(row["volume"], 2),
+                trades=row["trade_count"],
+            )
+            for row in reversed(rows)
+        ]
+        return MarketHistoryResponse(market_id=market_id, interval=interval, candles=candles)
+
+    async def invalidate_quotes(self, market_ids: Iterable[str], *, rows: bool = False) -> None:
+        """Forget the markets' cached quotes, in every worker.
+
+        Call once the write has landed; pass ``rows`` when market fields changed too.
+        """
+        changed = list(dict.fromkeys(market_ids))
+        _forget(changed)
+        await shared_markets.publish_change(changed, rows=rows)
 
-    def create_market(self, payload: MarketCreate) -> MarketWithQuote:
+    def market_etag(self, market: MarketWithQuote, *variant: object) -> str:
+        """ETag of a quoted market, from the persisted state its body is built from.
+
+        The row's ``updated_at`` moves on every change to its fields and the depth figures
+        on every trade, whoever wrote them, so the tag follows the body however the write
+        reached storage; a cached quote delays both by at most the cache TTL.
+        """
+        return make_etag(*variant, *_validator(market))
+
+    def list_etag(self, page: MarketListResponse, *variant: object) -> str:
+        """ETag of a ``list_markets`` page, from the cursor and the validators of its items."""
+        return make_etag(*variant, page.next_cursor, *(part for market in page.items for part in _validator(market)))
+
+    async def create_market(self, payload: MarketCreate) -> MarketWithQuote:
         record = {
             "question": payload.question,
             "category": payload.category,
@@ -48,18 +229,20 @@ class MarketService:
             "resolution_date": payload.resolution_date.isoformat(),
             "status": "open",
             "tags": payload.tags,
+            "pricing_engine": payload.pricing_engine,
             "baseline_probability": payload.initial_liquidity / 1000.0,
             "initial_liquidity": payload.initial_liquidity,
             "settlement_dates": self._generate_settlement_dates(payload.resolution_date),
         }
 
-        response = self.supabase.table("markets").insert(record).execute()
-        if not response.data or len(response.data) == 0:
+        created = await self.storage.markets.insert(record)
+        if not created:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create market")
-        created = response.data[0] if isinstance(response.data, list) else response.data
-        return self._attach_quote(created)
+        await self.invalidate_quotes([created["id"]], rows=True)
+        # A market that was just created has no trades, so there is no depth to read
+        return self._attach_quote(created, self._empty_depth())
 
-    def update_market(self, market_id: str, payload: MarketUpdate) -> MarketWithQuote:
+    async def update_market(self, market_id: str, payload: MarketUpdate) -> MarketWithQuote:
         update: dict[str, Any] = {}
         if payload.question is not None:
             update["question"] = payload.question
@@ -75,23 +258,116 @@ class MarketService:
             update["tags"] = payload.tags
 
         if not update:
-            return self.get_market(market_id)
+            return await self.get_market(market_id)
+
+        since = market_versions.current
+        updated, depths = await asyncio.gather(
+            self.storage.markets.update(market_id, update),
+            self._market_depths([market_id]),
+        )
+        if not updated:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Market not found")
+        await self.invalidate_quotes([market_id], rows=True)
+        return self._attach_quote(updated, depths[market_id], since=since)
+
+    async def _read_page(
+        self, category: Optional[str], status_filter: Optional[str], limit: int, cursor: Optional[str]
+    ) -> MarketListResponse:
+        since = market_versions.current
+        query = (category, status_filter, limit, cursor)
+        page = await shared_markets.page(*query)
+        if page.rows is not None:
+            records, next_cursor = page.rows, page.next_cursor
+        else:
+            rows = await self.storage.markets.page(
+                category=category,
+                status=status_filter,
+                limit=limit + 1,
+                after=decode_cursor(cursor) if cursor else None,
+            )
+            records, next_cursor = paginate(rows, limit)
+            await shared_markets.store_page(page, records, next_cursor, *query)
+        cached = {record["id"]: quote_cache.get(record["id"]) for record in records}
+        missing = [record for record in records if cached[record["id"]] is None]
+        fresh = iter(await self._quote_records(missing, since=since))
+        items = [cached[record["id"]] or next(fresh) for record in records]
+        # Every item was validated when it was quoted; do not walk them all again
+        return MarketListResponse.model_construct(items=items, count=len(items), next_cursor=next_cursor)
 
-        response = self.supabase.table("markets").update(update).eq("id", market_id).execute()
-        if not response.data or len(response.data) == 0:
+    async def _read_market(self, market_id: str) -> MarketWithQuote:
+        since = market_versions.current
+        lookup = await shared_markets.lookup([market_id])
+        shared = lookup.quotes.get(market_id)
+        if shared is not None:
+            return self._remember(shared, since=since)
+
+        record = lookup.rows.get(market_id)
+        if record is None:
+            record, depths = await asyncio.gather(
+                self.storage.markets.get(market_id),
+                self._market_depths([market_id]),
+            )
+        else:
+            depths = await self._market_depths([market_id])
+        if not record:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Market not found")
-        updated = response.data[0] if isinstance(response.data, list) else response.data
-        return self._attach_quote(updated)
-
-    def _attach_quote(self, record: dict[str, Any]) -> MarketWithQuote:
-        depth = self._market_depth(record["id"])
-        inputs = MarketPricingInputs(
-            baseline_probability=record.get("baseline_probability", settings.pricing_baseline / 100.0),
-            yes_shares=depth["yes_shares"],
-            no_shares=depth["no_shares"],
-            liquidity=record.get("initial_liquidity", depth["yes_shares"] + depth["no_shares"] + 1.0),
+        market = self._attach_quote(record, depths[market_id], since=since)
+        await shared_markets.store(lookup, [market], [] if market_id in lookup.rows else [record])
+        return market
+
+    def _attach_quotes(
+        self, records: list[dict[str, Any]], depths: dict[str, dict[str, Any]], *, since: Optional[int] = None
+    ) -> list[MarketWithQuote]:
+        if not records:
+            return []
+        with span("pricing"):
+            inputs = [self._pricing_inputs(record, depths[record["id"]]) for record in records]
+            batch = calculate_market_quotes_batch(
+                baseline_probability=[item.baseline_probability for item in inputs],
+                yes_shares=[item.yes_shares for item in inputs],
+                no_shares=[item.no_shares for item in inputs],
+                liquidity=[item.liquidity for item in inputs],
+                boost=[item.boost for item in inputs],
+                engine=[item.engine for item in inputs],
+            )
+        quotes = zip(
+            batch["yesPriceCents"].tolist(),
+            batch["noPriceCents"].tolist(),
+            batch["impliedProbability"].tolist(),
         )
-        quote = calculate_market_quote(inputs)
+        return [
+            self._attach_quote(
+                record,
+                depths[record["id"]],
+                quote={
+                    "yesPriceCents": yes_price,
+                    "noPriceCents": no_price,
+                    "impliedProbability": implied_probability,
+                },
+                since=since,
+            )
+            for record, (yes_price, no_price, implied_probability) in zip(records, quotes)
+        ]
+
+    def _attach_quote(
+        self,
+        record: dict[str, Any],
+        depth: dict[str, Any],
+        quote: Optional[dict[str, object]] = None,
+        *,
+        since: Optional[int] = None,
+    ) -> MarketWithQuote:
+        """Quote and validate a market row, caching it unless a market changed after ``since``.
+
+        ``since`` is ``market_versions.current`` from before the row and depth were read; if
+        anything was bumped meanwhile they may predate a write, so the result is not cached.
+        The quote's ``lastCalculatedAt`` is when the row or its depth last changed in storage,
+        so every worker renders an unchanged market byte for byte the same.
+        """
+        if quote is None:
+            with span("pricing"):
+                quote = calculate_market_quote(self._pricing_inputs(record, depth))
+        quote["lastCalculatedAt"] = _calculated_at(record, depth)
         total_volume = depth["total_volume"]
         open_interest = depth["yes_shares"] + depth["no_shares"]
 
@@ -109,25 +385,70 @@ class MarketService:
             "updatedAt": record.get("updated_at") or datetime.now(timezone.utc).isoformat(),
             "description": record.get("description"),
             "tags": record.get("tags") or [],
+            "pricingEngine": record.get("pricing_engine") or "blended",
             "openInterest": round(open_interest, 2),
             "totalVolume": round(total_volume, 2),
             "quote": quote,
             "settlementDates": settlement_dates,
         }
-        return MarketWithQuote.model_validate(mapped)
-
-    def _market_depth(self, market_id: str) -> dict[str, float]:
-        response = (
-            self.supabase.table("trades")
-            .select("side, shares, stake")
-            .eq("market_id", market_id)
-            .execute()
-        )
-        rows = response.data or []
-        yes_shares = sum(row.get("shares", 0.0) for row in rows if row.get("side") == "YES")
-        no_shares = sum(row.get("shares", 0.0) for row in rows if row.get("side") == "NO")
-        total_volume = sum(row.get("stake", 0.0) for row in rows)
-        return {"yes_shares": yes_shares, "no_shares": no_shares, "total_volume": total_volume}
+        with span("validation"):
+            market = MarketWithQuote.model_validate(mapped)
+        if since is None or market_versions.unchanged_since(since):
+            quote_cache.set(market.id, market)
+        return market
+
+    def _remember(self, market: MarketWithQuote, *, since: int) -> MarketWithQuote:
+        """Adopt a quote another worker shared, cached as if priced here."""
+        if market_versions.unchanged_since(since):
+            quote_cache.set(market.id, market)
+        return market
+
+    async def _quote_records(self, records: list[dict[str, Any]], *, since: int) -> list[MarketWithQuote]:
+        """Quote rows already read, taking what the shared tier has, in ``records`` order."""
+        if not records:
+            return []
+        lookup = await shared_markets.lookup([record["id"] for record in records], rows=False)
+        unquoted = [record for record in records if record["id"] not in lookup.quotes]
+        depths = await self._market_depths(record["id"] for record in unquoted)
+        fresh = self._attach_quotes(unquoted, depths, since=since)
+        await shared_markets.store(lookup, fresh)
+        shared = {market_id: self._remember(market, since=since) for market_id, market in lookup.quotes.items()}
+        computed = iter(fresh)
+        return [shared.get(record["id"]) or next(computed) for record in records]
+
+    def _pricing_inputs(self, record: dict[str, Any], depth: dict[str, Any]) -> MarketPricingInputs:
+        return market_pricing_inputs(record, depth)
+
+    def _timestamp(self, value: Optional[datetime]) -> Optional[str]:
+        """UTC ISO-8601 text, comparable with stored timestamps on every backend."""
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+    def _empty_depth(self) -> dict[str, Any]:
+        return {"yes_shares": 0.0, "no_shares": 0.0, "total_volume": 0.0, "updated_at": None}
+
+    async def _market_rows(self, market_ids: list[str]) -> list[dict[str, Any]]:
+        return await self.storage.markets.get_many(market_ids) if market_ids else []
+
+    async def _market_depths(self, market_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Read pre-aggregated depth for many markets with a single market_depth lookup."""
+        ids = list(dict.fromkeys(market_ids))
+        depths = {market_id: self._empty_depth() for market_id in ids}
+        if not ids:
+            return depths
+
+        for row in await self.storage.markets.depths(ids):
+            depth = depths.get(row.get("market_id"))
+            if depth is None:
+                continue
+            depth["yes_shares"] = row.get("yes_shares") or 0.0
+            depth["no_shares"] = row.get("no_shares") or 0.0
+            depth["total_volume"] = row.get("total_volume") or 0.0
+            depth["updated_at"] = row.get("updated_at")
+        return depths
 
     def _generate_settlement_dates(self, resolution_date: datetime) -> list[dict[str, str]]:
         from datetime import timedelta
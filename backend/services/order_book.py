@@ -0,0 +1,437 @@
+"""In-memory limit order books, matched ahead of the market maker.
+
+Each market keeps a YES and a NO ladder of resting limit orders: price levels sorted with
+``bisect``, each level a FIFO queue. A YES order at ``p`` crosses a NO order at ``q`` when
+``p + q >= 100``, because together they fund a full YES/NO pair. Incoming orders take the
+best resting price first, oldest order first within a level, and pay the complement of
+the resting (maker) price.
+
+Books live in process memory, so the API must run as a single worker: resting orders
+would only match in the worker that took them, and workers sharing the log would
+overwrite each other's writes when they compact it. ``check_deployment`` refuses to
+start otherwise; set ``ORDER_BOOK_ENABLED=false`` to run more workers, and limit orders
+the market maker cannot fill are then rejected rather than rested. Every change is
+appended to a write-ahead log before it is applied, and the log is replayed and compacted
+at startup, so resting orders survive a restart. Log I/O runs in worker threads, never
+on the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import threading
+from collections import Counter, defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shares and stakes below these are treated as fully consumed
+_SHARE_EPSILON = 1e-6
+_MIN_STAKE = 0.01
+
+
+def opposite(side: str) -> str:
+    return "NO" if side == "YES" else "YES"
+
+
+@dataclass(slots=True)
+class RestingOrder:
+    id: str
+    user_id: str
+    market_id: str
+    side: str
+    limit_price_cents: float
+    shares: float  # unfilled shares
+    created_at: str
+
+
+@dataclass(slots=True)
+class Fill:
+    """``shares`` of a resting order taken by an incoming order at ``price_cents``."""
+
+    maker: RestingOrder
+    shares: float
+    price_cents: float  # paid by the incoming order; the maker pays 100 - price_cents
+
+
+class PriceLadder:
+    """Resting orders for one side of one market, grouped by limit price."""
+
+    def __init__(self) -> None:
+        self._prices: list[float] = []  # ascending
+        self._levels: dict[float, deque[RestingOrder]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._prices)
+
+    def add(self, order: RestingOrder) -> None:
+        level = self._levels.get(order.limit_price_cents)
+        if level is None:
+            bisect.insort(self._prices, order.limit_price_cents)
+            level = self._levels[order.limit_price_cents] = deque()
+        level.append(order)
+
+    def remove(self, order: RestingOrder) -> None:
+        level = self._levels[order.limit_price_cents]
+        level.remove(order)
+        if not level:
+            del self._levels[order.limit_price_cents]
+            del self._prices[bisect.bisect_left(self._prices, order.limit_price_cents)]
+
+    def best_first(self) -> Iterator[RestingOrder]:
+        """Orders from the highest price down, oldest first within a level."""
+        for price in reversed(self._prices):
+            yield from self._levels[price]
+
+    def levels(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "priceCents": price,
+                "shares": round(sum(order.shares for order in self._levels[price]), 4),
+                "orders": len(self._levels[price]),
+            }
+            for price in reversed(self._prices)
+        ]
+
+
+class OrderBook:
+    def __init__(self) -> None:
+        self.ladders = {"YES": PriceLadder(), "NO": PriceLadder()}
+
+
+class WriteAheadLog:
+    """Append-only JSON-lines journal of order book changes."""
+
+    def __init__(self, path: str, *, fsync: bool = True) -> None:
+        self.path = Path(path)
+        self.fsync = fsync
+        self._file: Optional[Any] = None
+        # Appends for different markets arrive from different worker threads
+        self._lock = threading.Lock()
+
+    def append(self, events: list[dict[str, Any]]) -> None:
+        """Durably record ``events``; one write and at most one fsync per call. Blocking."""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def replay(self) -> Iterator[dict[str, Any]]:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as handle:
+            for number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Only the last append can be torn by a crash; nothing after it was acknowledged
+                    logger.warning("Ignoring truncated order book log entry at %s:%d", self.path, number)
+                    return
+
+    def rewrite(self, events: list[dict[str, Any]]) -> None:
+        """Atomically replace the log with ``events``. Blocking."""
+        with self._lock:
+            self._close()
+            temporary = self.path.with_name(self.path.name + ".tmp")
+            with open(temporary, "w", encoding="utf-8") as handle:
+                handle.write("".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events))
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, self.path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class MatchSession:
+    """Tentative matches against the books, applied only on ``commit``.
+
+    Lets callers persist the resulting trades before any resting order is consumed. Matched
+    shares are reserved on the engine, so other sessions skip them and the market locks
+    need only be held while matching; ``release`` hands the shares back instead.
+    """
+
+    def __init__(self, engine: OrderBookEngine) -> None:
+        self._engine = engine
+        self.fills: list[Fill] = []
+
+    def match(
+        self, user_id: str, market_id: str, side: str, limit_price_cents: Optional[float], stake: float
+    ) -> tuple[list[Fill], float]:
+        """Cross an order for ``stake`` dollars at up to ``limit_price_cents``; returns fills and unspent stake."""
+        book = self._engine.books.get(market_id)
+        if book is None or limit_price_cents is None:
+            return [], stake
+
+        # A maker at q leaves the incoming order to pay 100 - q, so it must bid at least this
+        threshold = 100.0 - limit_price_cents - 1e-9
+        remaining = round(stake, 2)
+        reserved = self._engine._reserved
+        fills: list[Fill] = []
+        for maker in book.ladders[opposite(side)].best_first():
+            if maker.limit_price_cents < threshold or remaining < _MIN_STAKE:
+                break
+            if maker.user_id == user_id:
+                continue
+            available = maker.shares - reserved.get(maker.id, 0.0)
+            if available <= _SHARE_EPSILON:
+                continue
+            price = round(100.0 - maker.limit_price_cents, 2)
+            shares = round(min(available, remaining / price * 100.0), 4)
+            if shares <= 0:
+                break
+            reserved[maker.id] = reserved.get(maker.id, 0.0) + shares
+            remaining = max(0.0, round(remaining - shares * price / 100.0, 2))
+            fills.append(Fill(maker=maker, shares=shares, price_cents=price))
+
+        self.fills.extend(fills)
+        return fills, remaining
+
+    async def commit(self) -> None:
+        """Consume the matched shares; no market lock is needed, as they are reserved."""
+        if not self.fills:
+            return
+        fills, self.fills = self.fills, []
+        # A failed log write leaves the shares reserved: their trades are already persisted
+        await self._engine.apply([{"op": "fill", "orderId": fill.maker.id, "shares": fill.shares} for fill in fills])
+        self._engine._unreserve(fills)
+
+    def release(self) -> None:
+        """Drop the matches without consuming anything."""
+        fills, self.fills = self.fills, []
+        self._engine._unreserve(fills)
+
+
+class OrderBookEngine:
+    """Every market's order book plus the locks that serialise matching per market.
+
+    At most ``max_resting_per_user`` orders of one user and ``max_resting_per_market``
+    orders on one market rest at a time; ``can_rest`` checks an order against both.
+    """
+
+    def __init__(
+        self,
+        wal: Optional[WriteAheadLog] = None,
+        *,
+        enabled: bool = True,
+        max_resting_per_user: int = 100,
+        max_resting_per_market: int = 5000,
+    ) -> None:
+        self.wal = wal
+        self.enabled = enabled
+        self.max_resting_per_user = max_resting_per_user
+        self.max_resting_per_market = max_resting_per_market
+        self.books: dict[str, OrderBook] = {}
+        self._orders: dict[str, RestingOrder] = {}
+        # Shares of resting orders matched by sessions that have not committed yet
+        self._reserved: dict[str, float] = {}
+        self._resting_by_user: Counter[str] = Counter()
+        self._resting_by_market: Counter[str] = Counter()
+        self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        self.matched_shares = 0.0
+        self.fills = 0
+        self.rested = 0
+        self.cancelled = 0
+
+    async def load(self) -> None:
+        """Rebuild the books from the write-ahead log, then compact it to the live orders.
+
+        Runs once, from the app's startup or else the first call that needs the books.
+        """
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            if self.wal is not None:
+                # Nothing else reads the books until ``_loaded`` is set, so the thread has them to itself
+                await asyncio.to_thread(self._replay, self.wal)
+            self._loaded = True
+
+    def close(self) -> None:
+        if self.wal is not None:
+            self.wal.close()
+
+    @asynccontextmanager
+    async def locked(self, market_ids: Iterable[str]) -> AsyncIterator[None]:
+        """Hold the matching locks for ``market_ids``, taken in sorted order to avoid deadlock."""
+        await self.load()
+        locks = [self._locks[market_id] for market_id in sorted(set(market_ids))]
+        acquired: list[asyncio.Lock] = []
+        try:
+            for lock in locks:
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    def session(self) -> MatchSession:
+        """A match session; hold ``locked`` for the markets it will touch."""
+        return MatchSession(self)
+
+    def has_resting(self, market_id: str, side: str) -> bool:
+        """Whether ``side`` of ``market_id`` has resting orders; only a hint outside ``locked``."""
+        book = self.books.get(market_id)
+        return book is not None and bool(book.ladders[side])
+
+    def can_rest(self, order: RestingOrder, pending: Sequence[RestingOrder] = ()) -> bool:
+        """Whether ``order`` may rest, alongside ``pending`` orders about to, within the resting caps."""
+        if not self.enabled:
+            return False
+        user = self._resting_by_user[order.user_id] + sum(other.user_id == order.user_id for other in pending)
+        market = self._resting_by_market[order.market_id] + sum(
+            other.market_id == order.market_id for other in pending
+        )
+        return user < self.max_resting_per_user and market < self.max_resting_per_market
+
+    async def rest(self, orders: list[RestingOrder]) -> None:
+        if orders:
+            await self.apply([{"op": "rest", "order": asdict(order)} for order in orders])
+
+    async def cancel(self, order_id: str, user_id: str) -> Optional[RestingOrder]:
+        """Cancel one of ``user_id``'s resting orders; ``None`` if there is no such order.
+
+        Shares reserved by a match in flight are filled rather than cancelled, so the
+        returned order only counts the shares the cancel took off the book.
+        """
+        await self.load()
+        order = self._orders.get(order_id)
+        if order is None or order.user_id != user_id:
+            return None
+        async with self.locked([order.market_id]):
+            # A concurrent match may have filled it while we waited for the lock
+            if order_id not in self._orders:
+                return None
+            await self.apply([{"op": "cancel", "orderId": order_id}])
+        reserved = self._reserved.get(order_id, 0.0)
+        return replace(order, shares=round(order.shares - reserved, 4)) if reserved else order
+
+    async def orders_for_user(self, user_id: str) -> list[RestingOrder]:
+        await self.load()
+        orders = [order for order in self._orders.values() if order.user_id == user_id]
+        return sorted(orders, key=lambda order: (order.created_at, order.id))
+
+    async def snapshot(self, market_id: str) -> dict[str, Any]:
+        await self.load()
+        book = self.books.get(market_id) or OrderBook()
+        return {
+            "marketId": market_id,
+            "yes": book.ladders["YES"].levels(),
+            "no": book.ladders["NO"].levels(),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "markets": sum(1 for book in self.books.values() if book.ladders["YES"] or book.ladders["NO"]),
+            "restingOrders": len(self._orders),
+            "rested": self.rested,
+            "fills": self.fills,
+            "matchedShares": round(self.matched_shares, 4),
+            "cancelled": self.cancelled,
+        }
+
+    async def apply(self, events: list[dict[str, Any]]) -> None:
+        """Log ``events`` to the write-ahead log, then apply them to the books.
+
+        Rests and cancels hold the locks of the markets involved. Fills of reserved shares
+        do not, so two appends may reach the log and the books in different orders; fills
+        only subtract shares, and a fill after its order's cancel is ignored, so replaying
+        the log rebuilds the same books either way.
+        """
+        if self.wal is not None:
+            await asyncio.to_thread(self.wal.append, events)
+        for event in events:
+            self._apply(event)
+
+    def _replay(self, wal: WriteAheadLog) -> None:
+        for event in wal.replay():
+            self._apply(event)
+        wal.rewrite([{"op": "rest", "order": asdict(order)} for order in self._orders.values()])
+
+    def _apply(self, event: dict[str, Any]) -> None:
+        op = event["op"]
+        if op == "rest":
+            order = RestingOrder(**event["order"])
+            self._orders[order.id] = order
+            self._resting_by_user[order.user_id] += 1
+            self._resting_by_market[order.market_id] += 1
+            self.books.setdefault(order.market_id, OrderBook()).ladders[order.side].add(order)
+            self.rested += 1
+            return
+
+        order = self._orders.get(event["orderId"])
+        if order is None:
+            return
+        if op == "fill":
+            order.shares = round(order.shares - event["shares"], 4)
+            self.fills += 1
+            self.matched_shares += event["shares"]
+            if order.shares > _SHARE_EPSILON:
+                return
+        elif op == "cancel":
+            self.cancelled += 1
+        else:
+            raise ValueError(f"Unknown order book event: {op}")
+        del self._orders[order.id]
+        self._forget_count(self._resting_by_user, order.user_id)
+        self._forget_count(self._resting_by_market, order.market_id)
+        self.books[order.market_id].ladders[order.side].remove(order)
+
+    def _unreserve(self, fills: Iterable[Fill]) -> None:
+        for fill in fills:
+            left = self._reserved.get(fill.maker.id, 0.0) - fill.shares
+            if left > _SHARE_EPSILON:
+                self._reserved[fill.maker.id] = left
+            else:
+                self._reserved.pop(fill.maker.id, None)
+
+    @staticmethod
+    def _forget_count(counts: Counter[str], key: str) -> None:
+        counts[key] -= 1
+        if counts[key] <= 0:
+            del counts[key]
+
+
+def check_deployment() -> None:
+    """Refuse to serve the order book from a deployment with more than one worker process."""
+    if not settings.order_book_enabled:
+        return
+    if settings.web_concurrency > 1 or settings.shared_cache_backend in ("redis", "shm"):
+        raise RuntimeError(
+            "The order book lives in one worker's memory, but WEB_CONCURRENCY or SHARED_CACHE_BACKEND "
+            "configures several workers; run a single worker or set ORDER_BOOK_ENABLED=false"
+        )
+
+
+# Shared by every TradeService in the process
+order_book = OrderBookEngine(
+    WriteAheadLog(settings.order_book_wal_path, fsync=settings.order_book_wal_fsync)
+    if settings.order_book_wal_path and settings.order_book_enabled
+    else None,
+    enabled=settings.order_book_enabled,
+    max_resting_per_user=settings.order_book_max_resting_per_user,
+    max_resting_per_market=settings.order_book_max_resting_per_market,
+)
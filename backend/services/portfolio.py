@@ -1,42 +1,49 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Any
-
-from supabase import Client
+from typing import Any, Optional
 
+from core.config import settings
 from schemas.market import MarketWithQuote
 from schemas.portfolio import Holding, PortfolioSnapshot, PortfolioSummary
 from services.markets import MarketService
+from services.storage import Keyset, Storage
 
+_TRADE_COLUMNS = ("id", "created_at", "market_id", "side", "shares", "stake")
 
-class PortfolioService:
-    def __init__(self, supabase: Client) -> None:
-        self.supabase = supabase
-        self.market_service = MarketService(supabase)
 
-    def get_portfolio(self, user_id: str) -> PortfolioSnapshot:
-        trades = (
-            self.supabase.table("trades")
-            .select("market_id, side, shares, price_cents, stake")
-            .eq("user_id", user_id)
-            .execute()
-            .data
-            or []
-        )
+class PortfolioService:
+    def __init__(self, storage: Storage) -> None:
+        self.storage = storage
+        self.market_service = MarketService(storage)
 
+    async def get_portfolio(self, user_id: str) -> PortfolioSnapshot:
+        # Pages of the trade history are folded as they arrive, so only the holdings stay in memory
         grouped = defaultdict(lambda: {"shares": 0.0, "stake": 0.0})
-        for trade in trades:
-            key = (trade["market_id"], trade["side"])
-            grouped[key]["shares"] += trade.get("shares", 0.0)
-            grouped[key]["stake"] += trade.get("stake", 0.0)
+        after: Optional[Keyset] = None
+        page_size = settings.export_page_size
+        while True:
+            trades = await self.storage.trades.page(
+                user_id=user_id, market_id=None, limit=page_size, after=after, columns=_TRADE_COLUMNS
+            )
+            for trade in trades:
+                key = (trade["market_id"], trade["side"])
+                grouped[key]["shares"] += trade.get("shares", 0.0)
+                grouped[key]["stake"] += trade.get("stake", 0.0)
+            if len(trades) < page_size:
+                break
+            after = (trades[-1]["created_at"], trades[-1]["id"])
+
+        markets = await self.market_service.get_markets(market_id for market_id, _ in grouped)
 
         holdings = []
         cost_basis = 0.0
         market_value = 0.0
 
         for (market_id, side), metrics in grouped.items():
-            market = self.market_service.get_market(market_id)
+            market = markets.get(market_id)
+            if market is None:
+                continue
             mark_price = self._mark_price_for_side(market, side)
             quantity = metrics["shares"]
             if quantity:
@@ -2,11 +2,19 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from math import exp
+from math import exp, log, log1p, tanh
+from typing import Any, Mapping, Optional, Protocol, Sequence, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
 
 from core.config import settings
 
 
+# Keeps LMSR log-odds finite for baselines of exactly 0 or 1
+_LMSR_MIN_PRIOR = 0.01
+
+
 @dataclass(slots=True)
 class MarketPricingInputs:
     baseline_probability: float = 0.5  # expressed as decimal
@@ -14,21 +22,120 @@ class MarketPricingInputs:
     no_shares: float = 0.0
     liquidity: float = 1.0
     boost: float = 0.0  # allows future feature toggles
+    engine: str = "blended"  # key into PRICING_ENGINES
+
+
+class PricingEngine(Protocol):
+    """How a market maker quotes a market and fills orders from its running share totals."""
+
+    def yes_price(self, inputs: MarketPricingInputs) -> float:
+        """Marginal YES price in cents, unrounded."""
+        ...
+
+    def yes_prices(
+        self,
+        baseline_probability: np.ndarray,
+        yes_shares: np.ndarray,
+        no_shares: np.ndarray,
+        liquidity: np.ndarray,
+        boost: np.ndarray,
+    ) -> np.ndarray:
+        """Vectorised ``yes_price`` over column arrays, one element per market."""
+        ...
+
+    def buy(self, inputs: MarketPricingInputs, side: str, stake: float) -> tuple[float, float]:
+        """Average price in cents and shares for spending ``stake`` dollars on ``side``."""
+        ...
 
 
 def _logistic(value: float) -> float:
     return 1.0 / (1.0 + exp(-value))
 
 
+class BlendedPricingEngine:
+    """Blend of the market's baseline and a logistic of share skew.
+
+    Every order fills at the pre-trade quote, so order size has no price impact.
+    """
+
+    def yes_price(self, inputs: MarketPricingInputs) -> float:
+        liquidity = max(inputs.liquidity, 1.0)
+        skew = (inputs.yes_shares - inputs.no_shares) / liquidity
+        momentum = _logistic(skew * settings.pricing_sensitivity)
+        blended_probability = (
+            0.55 * inputs.baseline_probability + 0.4 * momentum + 0.05 * inputs.boost
+        )
+        return min(max(blended_probability * 100.0, settings.pricing_floor), settings.pricing_ceiling)
+
+    def yes_prices(
+        self,
+        baseline_probability: np.ndarray,
+        yes_shares: np.ndarray,
+        no_shares: np.ndarray,
+        liquidity: np.ndarray,
+        boost: np.ndarray,
+    ) -> np.ndarray:
+        skew = (yes_shares - no_shares) / np.maximum(liquidity, 1.0)
+        momentum = 1.0 / (1.0 + np.exp(-(skew * settings.pricing_sensitivity)))
+        blended_probability = 0.55 * baseline_probability + 0.4 * momentum + 0.05 * boost
+        return np.minimum(np.maximum(blended_probability * 100.0, settings.pricing_floor), settings.pricing_ceiling)
+
+    def buy(self, inputs: MarketPricingInputs, side: str, stake: float) -> tuple[float, float]:
+        yes_price = self.yes_price(inputs)
+        price = round(yes_price if side == "YES" else 100.0 - yes_price, 2)
+        return price, stake / price * 100.0
+
+
+class LmsrPricingEngine:
+    """Hanson's logarithmic market scoring rule.
+
+    The cost of the outstanding shares is ``C(q) = b * ln(exp(q_yes / b) + exp(q_no / b))``
+    with ``b`` the market's liquidity, so a trade costs ``C(after) - C(before)`` and larger
+    orders pay more per share. Share totals are offset so an empty market quotes its baseline
+    probability. Quotes and fills are closed-form in the running totals, O(1) per trade.
+    """
+
+    def _logit(self, inputs: MarketPricingInputs) -> float:
+        """Log-odds of YES."""
+        prior = min(max(inputs.baseline_probability, _LMSR_MIN_PRIOR), 1.0 - _LMSR_MIN_PRIOR)
+        return (inputs.yes_shares - inputs.no_shares) / max(inputs.liquidity, 1.0) + log(prior / (1.0 - prior))
+
+    def yes_price(self, inputs: MarketPricingInputs) -> float:
+        # 0.5 * (1 + tanh(x / 2)) is the logistic function without overflow for large |x|
+        return 50.0 * (1.0 + tanh(self._logit(inputs) / 2.0))
+
+    def yes_prices(
+        self,
+        baseline_probability: np.ndarray,
+        yes_shares: np.ndarray,
+        no_shares: np.ndarray,
+        liquidity: np.ndarray,
+        boost: np.ndarray,
+    ) -> np.ndarray:
+        prior = np.clip(baseline_probability, _LMSR_MIN_PRIOR, 1.0 - _LMSR_MIN_PRIOR)
+        logit = (yes_shares - no_shares) / np.maximum(liquidity, 1.0) + np.log(prior / (1.0 - prior))
+        return 50.0 * (1.0 + np.tanh(logit / 2.0))
+
+    def buy(self, inputs: MarketPricingInputs, side: str, stake: float) -> tuple[float, float]:
+        b = max(inputs.liquidity, 1.0)
+        logit = self._logit(inputs) if side == "YES" else -self._logit(inputs)
+        # Solving C(q + shares) = C(q) + stake for shares on the bought side gives
+        # shares = stake + b * ln(1 - p_other * exp(-stake / b)) - b * ln(p_side)
+        other_probability = 0.5 * (1.0 - tanh(logit / 2.0))
+        log_probability = -(max(-logit, 0.0) + log1p(exp(-abs(logit))))
+        shares = stake + b * log1p(-other_probability * exp(-stake / b)) - b * log_probability
+        return stake / shares * 100.0, shares
+
+
+PRICING_ENGINES: dict[str, PricingEngine] = {
+    "blended": BlendedPricingEngine(),
+    "lmsr": LmsrPricingEngine(),
+}
+
+
 def calculate_market_quote(inputs: MarketPricingInputs) -> dict[str, object]:
     """Convert market depth into tradable YES/NO prices."""
-    liquidity = max(inputs.liquidity, 1.0)
-    skew = (inputs.yes_shares - inputs.no_shares) / liquidity
-    momentum = _logistic(skew * settings.pricing_sensitivity)
-    blended_probability = (
-        0.55 * inputs.baseline_probability + 0.4 * momentum + 0.05 * inputs.boost
-    )
-    yes_price = min(max(blended_probability * 100.0, settings.pricing_floor), settings.pricing_ceiling)
+    yes_price = PRICING_ENGINES[inputs.engine].yes_price(inputs)
     no_price = 100.0 - yes_price
     implied_probability = round(yes_price / 100.0, 4)
 
@@ -38,3 +145,99 @@ def calculate_market_quote(inputs: MarketPricingInputs) -> dict[str, object]:
         "impliedProbability": implied_probability,
         "lastCalculatedAt": datetime.now(timezone.utc),
     }
+
+
+def market_pricing_inputs(record: Mapping[str, Any], depth: Mapping[str, float]) -> MarketPricingInputs:
+    """Pricing inputs for a ``markets`` row and its ``market_depth`` totals."""
+    return MarketPricingInputs(
+        baseline_probability=record.get("baseline_probability", settings.pricing_baseline / 100.0),
+        yes_shares=depth["yes_shares"],
+        no_shares=depth["no_shares"],
+        liquidity=record.get("initial_liquidity", depth["yes_shares"] + depth["no_shares"] + 1.0),
+        engine=record.get("pricing_engine") or "blended",
+    )
+
+
+def fill_order(
+    inputs: MarketPricingInputs, side: str, stake: float, limit_price_cents: Optional[float] = None
+) -> Optional[tuple[float, float]]:
+    """Price in cents and shares the market maker fills ``stake`` dollars of ``side`` at.
+
+    ``None`` if that price is above the limit. Mirrored by the ``market_fill`` SQL function.
+    """
+    price, shares = PRICING_ENGINES[inputs.engine].buy(inputs, side, stake)
+    price, shares = round(price, 2), round(shares, 4)
+    if limit_price_cents is not None and price > limit_price_cents:
+        return None
+    return price, shares
+
+
+def price_orders(
+    markets: Mapping[str, Mapping[str, Any]],
+    depths: Mapping[str, Mapping[str, float]],
+    orders: Sequence[Mapping[str, Any]],
+) -> list[Optional[dict[str, Any]]]:
+    """Price ``orders`` in sequence, each against the depth the earlier ones left behind.
+
+    Every order's market must be in ``markets``. Returns trade fields (``market_id``,
+    ``side``, ``price_cents``, ``shares``, ``stake``) aligned with ``orders``, with ``None``
+    for limit orders the market maker's price has not reached. Mirrored by the
+    ``book_trades`` SQL function.
+    """
+    running = {
+        market_id: {"yes_shares": depth["yes_shares"], "no_shares": depth["no_shares"]}
+        for market_id, depth in depths.items()
+    }
+    priced: list[Optional[dict[str, Any]]] = []
+    for order in orders:
+        depth = running.setdefault(order["market_id"], {"yes_shares": 0.0, "no_shares": 0.0})
+        inputs = market_pricing_inputs(markets[order["market_id"]], depth)
+        stake = round(order["stake"], 2)
+        fill = fill_order(inputs, order["side"], stake, order.get("limit_price_cents"))
+        if fill is None:
+            priced.append(None)
+            continue
+        price, shares = fill
+        depth["yes_shares" if order["side"] == "YES" else "no_shares"] += shares
+        priced.append(
+            {
+                "market_id": order["market_id"],
+                "side": order["side"],
+                "price_cents": price,
+                "shares": shares,
+                "stake": stake,
+            }
+        )
+    return priced
+
+
+def calculate_market_quotes_batch(
+    baseline_probability: ArrayLike,
+    yes_shares: ArrayLike,
+    no_shares: ArrayLike,
+    liquidity: ArrayLike,
+    boost: ArrayLike = 0.0,
+    engine: Union[str, Sequence[str]] = "blended",
+) -> dict[str, np.ndarray]:
+    """Vectorised ``calculate_market_quote`` over column arrays, one element per market."""
+    columns = np.broadcast_arrays(
+        *(
+            np.asarray(column, dtype=np.float64)
+            for column in (baseline_probability, yes_shares, no_shares, liquidity, boost)
+        )
+    )
+    if isinstance(engine, str):
+        yes_price = PRICING_ENGINES[engine].yes_prices(*columns)
+    else:
+        engines = np.asarray(engine)
+        yes_price = np.empty(columns[0].shape, dtype=np.float64)
+        for name in np.unique(engines):
+            selected = engines == name
+            yes_price[selected] = PRICING_ENGINES[str(name)].yes_prices(*(column[selected] for column in columns))
+    no_price = 100.0 - yes_price
+
+    return {
+        "yesPriceCents": np.round(yes_price, 2),
+        "noPriceCents": np.round(no_price, 2),
+        "impliedProbability": np.round(yes_price / 100.0, 4),
+    }
@@ -0,0 +1,144 @@
+"""In-process fan-out of market quote updates to streaming subscribers."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+from core.config import settings
+from schemas.market import MarketWithQuote
+from services.markets import MarketService, remote_change_listeners
+
+logger = logging.getLogger(__name__)
+
+
+def quote_message(market: MarketWithQuote) -> dict[str, Any]:
+    return {
+        "type": "quote",
+        "marketId": market.id,
+        "quote": market.quote.model_dump(mode="json", by_alias=True),
+        "totalVolume": market.total_volume,
+        "openInterest": market.open_interest,
+    }
+
+
+class QuoteSubscription:
+    """One client's mailbox. Holds only the latest undelivered quote per market."""
+
+    def __init__(self) -> None:
+        self.market_ids: set[str] = set()
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, market_id: str, message: dict[str, Any]) -> None:
+        self._pending[market_id] = message
+        self._ready.set()
+
+    async def next_batch(self) -> list[dict[str, Any]]:
+        await self._ready.wait()
+        self._ready.clear()
+        batch, self._pending = list(self._pending.values()), {}
+        return batch
+
+
+class QuoteBroker:
+    """Collects trade notifications and publishes one fresh quote per market per window.
+
+    Notifications for the same market that arrive within ``coalesce_seconds`` of each
+    other are folded into a single quote read and a single push per subscriber.
+    """
+
+    def __init__(self, *, coalesce_seconds: float) -> None:
+        self.coalesce_seconds = coalesce_seconds
+        self._subscribers: dict[str, set[QuoteSubscription]] = defaultdict(set)
+        self._last_sent: dict[str, dict[str, Any]] = {}
+        self._dirty: set[str] = set()
+        self._market_service: Optional[MarketService] = None
+        self._flush_task: Optional[asyncio.Task[None]] = None
+        self.notifications = 0
+        self.coalesced = 0
+        self.published = 0
+
+    def subscribe(
+        self, subscription: QuoteSubscription, market_ids: Iterable[str], market_service: MarketService
+    ) -> None:
+        self._market_service = market_service
+        for market_id in market_ids:
+            subscription.market_ids.add(market_id)
+            self._subscribers[market_id].add(subscription)
+
+    def unsubscribe(self, subscription: QuoteSubscription, market_ids: Optional[Iterable[str]] = None) -> None:
+        for market_id in list(subscription.market_ids if market_ids is None else market_ids):
+            subscription.market_ids.discard(market_id)
+            subscribers = self._subscribers.get(market_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[market_id]
+                self._last_sent.pop(market_id, None)
+
+    def notify(self, market_id: str, market_service: Optional[MarketService] = None) -> None:
+        """Mark a market's quote as changed; it is re-read after the coalescing window.
+
+        The quote is read through ``market_service``, or the last one seen if none is given.
+        """
+        if market_service is not None:
+            self._market_service = market_service
+        if market_id not in self._subscribers:
+            return
+        self.notifications += 1
+        if market_id in self._dirty:
+            self.coalesced += 1
+        self._dirty.add(market_id)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_after_window())
+
+    def notify_many(self, market_ids: Iterable[str]) -> None:
+        for market_id in market_ids:
+            self.notify(market_id)
+
+    def publish(self, market: MarketWithQuote) -> None:
+        """Push ``market``'s quote to its subscribers unless it is unchanged since the last push."""
+        message = quote_message(market)
+        comparable = {key: value for key, value in message.items() if key != "quote"}
+        comparable["prices"] = (market.quote.yes_price_cents, market.quote.no_price_cents)
+        if self._last_sent.get(market.id) == comparable:
+            return
+        self._last_sent[market.id] = comparable
+        for subscription in self._subscribers.get(market.id, ()):
+            subscription.push(market.id, message)
+        self.published += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "subscribedMarkets": len(self._subscribers),
+            "notifications": self.notifications,
+            "coalesced": self.coalesced,
+            "published": self.published,
+        }
+
+    async def _flush_after_window(self) -> None:
+        # Markets notified while a refresh is awaited go out with the next window
+        while self._dirty:
+            await asyncio.sleep(self.coalesce_seconds)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        service = self._market_service
+        watched = [market_id for market_id in dirty if market_id in self._subscribers]
+        if service is None or not watched:
+            return
+        try:
+            markets = await service.get_markets(watched)
+        except Exception:  # pragma: no cover - a failed refresh must not kill the broker
+            logger.exception("Failed to refresh quotes for %d streamed markets", len(watched))
+            return
+        for market in markets.values():
+            self.publish(market)
+
+quote_broker = QuoteBroker(coalesce_seconds=settings.quote_stream_coalesce_seconds)
+# Markets other workers traded or updated reach this worker's subscribers too
+remote_change_listeners.append(quote_broker.notify_many)
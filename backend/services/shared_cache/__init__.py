@@ -0,0 +1,38 @@
+"""Optional cache shared by every API worker, so N workers do not repeat each read N times.
+
+``SHARED_CACHE_BACKEND`` picks the store: ``none`` (the default) keeps every cache in
+its own process; ``memory`` holds the shared tier in this process, for tests and single
+workers; ``redis`` uses a Redis-protocol server at ``SHARED_CACHE_URL``; ``shm`` uses
+a SQLite database at ``SHARED_CACHE_PATH`` on a memory-backed filesystem, for workers
+on one host without a server.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from core.config import settings
+from services.shared_cache.base import MessageHandler, SharedCache, SharedCacheError
+from services.shared_cache.memory import MemorySharedCache
+from services.shared_cache.redis import RedisSharedCache
+from services.shared_cache.shm import SharedMemoryCache
+
+__all__ = [
+    "MemorySharedCache",
+    "MessageHandler",
+    "RedisSharedCache",
+    "SharedCache",
+    "SharedCacheError",
+    "SharedMemoryCache",
+    "create_shared_cache",
+]
+
+
+def create_shared_cache() -> Optional[SharedCache]:
+    """The store configured by the settings, or ``None`` when the shared tier is off."""
+    if settings.shared_cache_backend == "memory":
+        return MemorySharedCache()
+    if settings.shared_cache_backend == "redis":
+        return RedisSharedCache(settings.shared_cache_url, timeout_seconds=settings.shared_cache_timeout_seconds)
+    if settings.shared_cache_backend == "shm":
+        return SharedMemoryCache(settings.shared_cache_path, poll_seconds=settings.shared_cache_poll_seconds)
+    return None
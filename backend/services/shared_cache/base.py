@@ -0,0 +1,45 @@
+"""Interface of the store that lets every API worker share cached reads.
+
+Values are opaque bytes; callers own their encoding. A failed call raises
+``SharedCacheError`` and callers carry on as if the cache were empty, so losing the
+store costs database work, never requests.
+"""
+from __future__ import annotations
+
+from typing import Callable, Mapping, Optional, Protocol, Sequence
+
+# Called with each message published on a subscribed channel, or with ``None`` when
+# delivery was interrupted and messages may have been missed
+MessageHandler = Callable[[Optional[bytes]], None]
+
+
+class SharedCacheError(Exception):
+    """The shared cache could not be reached or rejected a command."""
+
+
+class SharedCache(Protocol):
+    name: str
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        """Values of ``keys`` in order, ``None`` for missing or expired ones."""
+        ...
+
+    async def set_many(self, items: Mapping[str, bytes], ttl_seconds: float) -> None:
+        ...
+
+    async def incr_many(self, keys: Sequence[str]) -> list[int]:
+        """Increment counters that never expire, starting from zero; returns the new values.
+
+        Counters share the keyspace with entries: ``get_many`` reads them as decimal bytes.
+        """
+        ...
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        ...
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Deliver the channel's messages to ``handler`` from a background task until ``close``."""
+        ...
+
+    async def close(self) -> None:
+        ...
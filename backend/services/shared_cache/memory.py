@@ -0,0 +1,68 @@
+"""Shared cache held in this process's memory.
+
+Only one worker can see it, so it shares nothing across processes; it exists for tests,
+benchmarks and single-worker runs that want the shared tier's code path.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Callable, Mapping, Optional, Sequence
+
+from services.shared_cache.base import MessageHandler
+
+# Expired entries are dropped when read, and swept once the store doubles in size
+_SWEEP_MIN_ENTRIES = 1024
+
+
+class MemorySharedCache:
+    name = "memory"
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._entries: dict[str, tuple[float, bytes]] = {}
+        self._handlers: dict[str, list[MessageHandler]] = defaultdict(list)
+        self._sweep_at = _SWEEP_MIN_ENTRIES
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        now = self._clock()
+        values: list[Optional[bytes]] = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            values.append(entry[1] if entry is not None else None)
+        return values
+
+    async def set_many(self, items: Mapping[str, bytes], ttl_seconds: float) -> None:
+        now = self._clock()
+        expires_at = now + ttl_seconds
+        for key, value in items.items():
+            self._entries[key] = (expires_at, value)
+        if len(self._entries) > self._sweep_at:
+            self._entries = {key: entry for key, entry in self._entries.items() if entry[0] > now}
+            self._sweep_at = max(_SWEEP_MIN_ENTRIES, 2 * len(self._entries))
+
+    async def incr_many(self, keys: Sequence[str]) -> list[int]:
+        # Counters share the keyspace with entries, as on a Redis server
+        values = []
+        for key in keys:
+            (current,) = await self.get_many([key])
+            value = int(current or 0) + 1
+            self._entries[key] = (float("inf"), b"%d" % value)
+            values.append(value)
+        return values
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        # Deliver on a later loop iteration, as a pub/sub server would
+        loop = asyncio.get_running_loop()
+        for handler in list(self._handlers.get(channel, ())):
+            loop.call_soon(handler, message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers[channel].append(handler)
+
+    async def close(self) -> None:
+        self._handlers.clear()
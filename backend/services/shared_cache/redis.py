@@ -0,0 +1,194 @@
+"""Shared cache on a Redis-protocol server (Redis, Valkey, KeyDB or a local stand-in).
+
+Speaks RESP2 over asyncio streams, so no client library is needed. Commands share one
+connection: each call writes its commands in one pipelined batch and reads the replies
+back in order. A subscription holds a second connection in subscribe mode: ``subscribe``
+returns once the server has confirmed it, and a dropped connection is reopened and
+resubscribed every ``reconnect_seconds`` until that is confirmed again, at which point
+the gap is reported to the handler.
+
+``SHARED_CACHE_URL`` takes the usual form, ``redis://[[user]:password@]host[:port][/db]``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Mapping, Optional, Sequence, Union
+from urllib.parse import unquote, urlsplit
+
+from services.shared_cache.base import MessageHandler, SharedCacheError
+
+logger = logging.getLogger(__name__)
+
+Argument = Union[str, bytes, int]
+
+
+class ReplyError(Exception):
+    """An error reply (``-ERR ...``) from the server."""
+
+
+_CONNECTION_ERRORS = (OSError, EOFError, asyncio.TimeoutError, ValueError)
+
+
+def encode_command(command: Sequence[Argument]) -> bytes:
+    parts = [arg if isinstance(arg, bytes) else str(arg).encode() for arg in command]
+    return b"*%d\r\n" % len(parts) + b"".join(b"$%d\r\n%s\r\n" % (len(part), part) for part in parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise EOFError("connection closed by the server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return ReplyError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        return None if length < 0 else (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(payload)
+        return None if length < 0 else [await read_reply(reader) for _ in range(length)]
+    raise ValueError(f"unexpected reply {line!r}")
+
+
+class RedisSharedCache:
+    name = "redis"
+
+    def __init__(self, url: str, *, timeout_seconds: float = 1.0, reconnect_seconds: float = 1.0) -> None:
+        parsed = urlsplit(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported shared cache URL {url!r}; expected redis://host:port/db")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password is not None else None
+        self.timeout_seconds = timeout_seconds
+        self.reconnect_seconds = reconnect_seconds
+        self._connection: Optional[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._lock = asyncio.Lock()
+        self._listeners: list[asyncio.Task[None]] = []
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        if not keys:
+            return []
+        (values,) = await self._execute(("MGET", *keys))
+        return values
+
+    async def set_many(self, items: Mapping[str, bytes], ttl_seconds: float) -> None:
+        if items:
+            milliseconds = max(1, int(ttl_seconds * 1000))
+            await self._execute(*(("SET", key, value, "PX", milliseconds) for key, value in items.items()))
+
+    async def incr_many(self, keys: Sequence[str]) -> list[int]:
+        if not keys:
+            return []
+        return await self._execute(*(("INCR", key) for key in keys))
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._execute(("PUBLISH", channel, message))
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Returns once the server has confirmed the subscription, or raises ``SharedCacheError``."""
+        try:
+            connection = await self._subscribed(channel)
+        except _CONNECTION_ERRORS as exc:
+            raise SharedCacheError(f"Redis at {self.host}:{self.port}: {exc!r}") from exc
+        self._listeners.append(asyncio.get_running_loop().create_task(self._listen(channel, handler, connection)))
+
+    async def close(self) -> None:
+        for listener in self._listeners:
+            listener.cancel()
+        self._listeners.clear()
+        self._drop()
+
+    async def _execute(self, *commands: Sequence[Argument]) -> list[Any]:
+        async with self._lock:
+            try:
+                if self._connection is None:
+                    self._connection = await self._open()
+                reader, writer = self._connection
+                writer.write(b"".join(encode_command(command) for command in commands))
+                await writer.drain()
+                replies = await asyncio.wait_for(self._read_replies(reader, len(commands)), self.timeout_seconds)
+            except _CONNECTION_ERRORS as exc:
+                self._drop()
+                raise SharedCacheError(f"Redis at {self.host}:{self.port}: {exc!r}") from exc
+            except asyncio.CancelledError:
+                # Replies may still be in flight; they would be read as answers to the next call
+                self._drop()
+                raise
+        for reply in replies:
+            if isinstance(reply, ReplyError):
+                raise SharedCacheError(f"Redis at {self.host}:{self.port}: {reply}")
+        return replies
+
+    async def _read_replies(self, reader: asyncio.StreamReader, count: int) -> list[Any]:
+        return [await read_reply(reader) for _ in range(count)]
+
+    async def _open(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout_seconds)
+        handshake: list[Sequence[Argument]] = []
+        if self.password is not None:
+            handshake.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if self.db:
+            handshake.append(("SELECT", self.db))
+        if handshake:
+            writer.write(b"".join(encode_command(command) for command in handshake))
+            await writer.drain()
+            replies = await asyncio.wait_for(self._read_replies(reader, len(handshake)), self.timeout_seconds)
+            errors = [reply for reply in replies if isinstance(reply, ReplyError)]
+            if errors:
+                writer.close()
+                raise SharedCacheError(f"Redis at {self.host}:{self.port} refused the connection: {errors[0]}")
+        return reader, writer
+
+    def _drop(self) -> None:
+        if self._connection is not None:
+            self._connection[1].close()
+            self._connection = None
+
+    async def _subscribed(self, channel: str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """A connection subscribed to ``channel``, once the server has confirmed it."""
+        reader, writer = await self._open()
+        try:
+            writer.write(encode_command(("SUBSCRIBE", channel)))
+            await writer.drain()
+            # Nothing is published to a connection before its subscription is confirmed
+            reply = await asyncio.wait_for(read_reply(reader), self.timeout_seconds)
+        except BaseException:
+            writer.close()
+            raise
+        if not isinstance(reply, list) or reply[:1] != [b"subscribe"]:
+            writer.close()
+            raise SharedCacheError(f"Redis at {self.host}:{self.port} refused SUBSCRIBE {channel}: {reply}")
+        return reader, writer
+
+    async def _listen(
+        self, channel: str, handler: MessageHandler, connection: tuple[asyncio.StreamReader, asyncio.StreamWriter]
+    ) -> None:
+        while True:
+            reader, writer = connection
+            try:
+                while True:
+                    reply = await read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        handler(reply[2])
+            except _CONNECTION_ERRORS as exc:
+                logger.warning("Shared cache subscription to %r lost (%r); resubscribing", channel, exc)
+            finally:
+                writer.close()
+            while True:
+                await asyncio.sleep(self.reconnect_seconds)
+                try:
+                    connection = await self._subscribed(channel)
+                    break
+                except (*_CONNECTION_ERRORS, SharedCacheError):
+                    continue
+            logger.info("Shared cache subscription to %r restored", channel)
+            # Anything published while we were away is lost
+            handler(None)
@@ -0,0 +1,200 @@
+"""Shared cache in a SQLite database on a memory-backed filesystem, for workers on one host.
+
+Every worker opens the same file (``SHARED_CACHE_PATH``, ``/dev/shm`` by default, so
+nothing touches a disk) in WAL mode, which lets them read while one of them writes.
+A writer may wait up to a second for another worker's lock, so statements run in a
+thread rather than on the event loop. There is no server to push
+messages: ``publish`` appends to a table that each subscriber polls every
+``poll_seconds``, and messages older than ``retention_seconds`` are pruned.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Mapping, Optional, Sequence
+
+from services.shared_cache.base import MessageHandler, SharedCacheError
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    message BLOB NOT NULL,
+    published_at REAL NOT NULL
+);
+"""
+
+# Writes between sweeps of expired entries and old messages
+_SWEEP_EVERY = 256
+# Keys per ``IN (...)`` lookup: SQLITE_MAX_VARIABLE_NUMBER is 999 on builds before 3.32
+_KEY_CHUNK_SIZE = 500
+
+
+class SharedMemoryCache:
+    name = "shm"
+
+    def __init__(self, path: str, *, poll_seconds: float = 0.05, retention_seconds: float = 60.0) -> None:
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        self._lock = threading.RLock()
+        self._writes = 0
+        self._listeners: list[asyncio.Task[None]] = []
+        try:
+            self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            with self._lock:
+                self._connection.execute("PRAGMA busy_timeout = 1000")
+                self._connection.execute("PRAGMA journal_mode = WAL")
+                # A cache needs no durability
+                self._connection.execute("PRAGMA synchronous = OFF")
+                self._connection.executescript(SCHEMA)
+        except sqlite3.Error as exc:
+            raise SharedCacheError(f"Shared cache at {path}: {exc}") from exc
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        if not keys:
+            return []
+        return await asyncio.to_thread(self._get_many, keys)
+
+    async def set_many(self, items: Mapping[str, bytes], ttl_seconds: float) -> None:
+        if items:
+            await asyncio.to_thread(self._set_many, items, ttl_seconds)
+
+    async def incr_many(self, keys: Sequence[str]) -> list[int]:
+        if not keys:
+            return []
+        return await asyncio.to_thread(self._incr_many, keys)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await asyncio.to_thread(self._publish, channel, message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        last_id = await asyncio.to_thread(self._last_message_id)
+        self._listeners.append(asyncio.get_running_loop().create_task(self._poll(channel, handler, last_id)))
+
+    async def close(self) -> None:
+        for listener in self._listeners:
+            listener.cancel()
+        self._listeners.clear()
+        await asyncio.to_thread(self._close)
+
+    def _get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        found: dict[str, bytes] = {}
+        now = time.time()
+        with self._guard():
+            for start in range(0, len(keys), _KEY_CHUNK_SIZE):
+                chunk = keys[start : start + _KEY_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                found.update(
+                    self._connection.execute(
+                        f"SELECT key, value FROM entries WHERE key IN ({placeholders}) AND expires_at > ?",
+                        [*chunk, now],
+                    ).fetchall()
+                )
+        return [found.get(key) for key in keys]
+
+    def _set_many(self, items: Mapping[str, bytes], ttl_seconds: float) -> None:
+        now = time.time()
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                [(key, value, now + ttl_seconds) for key, value in items.items()],
+            )
+            self._sweep(connection, now)
+
+    def _incr_many(self, keys: Sequence[str]) -> list[int]:
+        # Counters are entries that never expire, so ``get_many`` reads them like Redis does
+        values = []
+        now = time.time()
+        with self._transaction() as connection:
+            for key in keys:
+                current = connection.execute(
+                    "SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                value = int(current[0]) + 1 if current else 1
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, b"%d" % value, float("inf")),
+                )
+                values.append(value)
+        return values
+
+    def _publish(self, channel: str, message: bytes) -> None:
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO messages (channel, message, published_at) VALUES (?, ?, ?)", (channel, message, now)
+            )
+            self._sweep(connection, now)
+
+    def _last_message_id(self) -> int:
+        with self._guard():
+            (last_id,) = self._connection.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()
+        return last_id
+
+    def _messages(self, channel: str, last_id: int) -> list[tuple[int, bytes]]:
+        with self._guard():
+            return self._connection.execute(
+                "SELECT id, message FROM messages WHERE channel = ? AND id > ? ORDER BY id", (channel, last_id)
+            ).fetchall()
+
+    def _close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @contextmanager
+    def _guard(self) -> Iterator[None]:
+        with self._lock:
+            try:
+                yield
+            except sqlite3.Error as exc:
+                raise SharedCacheError(f"Shared cache at {self.path}: {exc}") from exc
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._guard():
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def _sweep(self, connection: sqlite3.Connection, now: float) -> None:
+        self._writes += 1
+        if self._writes % _SWEEP_EVERY:
+            return
+        connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        connection.execute("DELETE FROM messages WHERE published_at < ?", (now - self.retention_seconds,))
+
+    async def _poll(self, channel: str, handler: MessageHandler, last_id: int) -> None:
+        failing = False
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                rows = await asyncio.to_thread(self._messages, channel, last_id)
+            except SharedCacheError as exc:
+                if not failing:
+                    logger.warning("Polling shared cache channel %r failed (%s); retrying", channel, exc)
+                failing = True
+                continue
+            if failing:
+                # Messages may have been pruned while polling failed
+                handler(None)
+                failing = False
+            for message_id, message in rows:
+                last_id = message_id
+                handler(message)
@@ -0,0 +1,53 @@
+"""Pluggable persistence for markets, trades and profiles.
+
+``STORAGE_BACKEND=supabase`` (the default) talks to PostgREST; ``STORAGE_BACKEND=sqlite``
+runs the whole API against a local SQLite database at ``SQLITE_PATH`` so it can be
+exercised offline.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from core.config import settings
+from core.supabase import require_async_supabase_client
+from services.storage.base import (
+    Booking,
+    Keyset,
+    MarketRepository,
+    ProfileRepository,
+    Row,
+    Storage,
+    TradeRepository,
+)
+from services.storage.instrumented import instrument_storage
+from services.storage.sqlite import create_sqlite_storage
+from services.storage.supabase import create_supabase_storage
+
+__all__ = [
+    "Booking",
+    "Keyset",
+    "MarketRepository",
+    "ProfileRepository",
+    "Row",
+    "Storage",
+    "TradeRepository",
+    "create_sqlite_storage",
+    "create_supabase_storage",
+    "get_storage",
+    "instrument_storage",
+]
+
+_storage: Optional[Storage] = None
+
+
+async def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        if settings.storage_backend == "sqlite":
+            _storage = create_sqlite_storage(settings.sqlite_path)
+            if settings.metrics_enabled:
+                # The Supabase client instruments itself; SQLite is timed per repository call
+                _storage = instrument_storage(_storage)
+        else:
+            _storage = create_supabase_storage(await require_async_supabase_client())
+    return _storage
@@ -0,0 +1,123 @@
+"""Repository interfaces the domain services use to reach persistent storage.
+
+Rows are plain dicts keyed by database column name, exactly as PostgREST returns them,
+so services map them to API schemas the same way regardless of backend.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol, Sequence
+
+Row = dict[str, Any]
+# (created_at, id) of the last row already returned, for (created_at DESC, id DESC) keyset pages
+Keyset = tuple[str, str]
+
+
+@dataclass(slots=True)
+class Booking:
+    """Outcome of booking one order against the market maker."""
+
+    trade: Optional[Row] = None
+    market_found: bool = True
+
+
+class MarketRepository(Protocol):
+    async def page(
+        self,
+        *,
+        category: Optional[str],
+        status: Optional[str],
+        limit: int,
+        after: Optional[Keyset],
+    ) -> list[Row]:
+        ...
+
+    async def get(self, market_id: str) -> Optional[Row]:
+        ...
+
+    async def get_many(self, market_ids: Sequence[str]) -> list[Row]:
+        ...
+
+    async def insert(self, record: Row) -> Optional[Row]:
+        ...
+
+    async def insert_many(self, records: Sequence[Row]) -> int:
+        """Insert ``records`` in one statement without reading them back; returns the count."""
+        ...
+
+    async def update(self, market_id: str, changes: Row) -> Optional[Row]:
+        ...
+
+    async def depths(self, market_ids: Sequence[str]) -> list[Row]:
+        """Rows of the ``market_depth`` aggregate for the given markets."""
+        ...
+
+    async def candles(
+        self, market_id: str, *, period: str, start: Optional[str], end: Optional[str], limit: int
+    ) -> list[Row]:
+        """Up to ``limit`` ``market_candles`` rows with ``start <= bucket_start < end``, newest first."""
+        ...
+
+    async def rebuild_depth(self, market_id: Optional[str] = None) -> int:
+        """Recompute ``market_depth`` from ``trades``; returns the number of rows rebuilt."""
+        ...
+
+
+class TradeRepository(Protocol):
+    async def insert(self, record: Row) -> Optional[Row]:
+        ...
+
+    async def book_many(self, *, user_id: str, orders: Sequence[Row]) -> list[Booking]:
+        """Book ``orders`` (``market_id``, ``side``, ``stake``, ``limit_price_cents``) atomically.
+
+        Each market's orders are priced in submission order against the depth the previous
+        one left. Returns one ``Booking`` per order, in order.
+        """
+        ...
+
+    async def insert_many(self, records: Sequence[Row]) -> int:
+        ...
+
+    async def page(
+        self,
+        *,
+        user_id: Optional[str],
+        market_id: Optional[str],
+        limit: int,
+        after: Optional[Keyset],
+        columns: Optional[Sequence[str]] = None,
+    ) -> list[Row]:
+        ...
+
+
+class ProfileRepository(Protocol):
+    async def get(self, user_id: str) -> Optional[Row]:
+        ...
+
+    async def get_many(self, user_ids: Sequence[str]) -> list[Row]:
+        ...
+
+    async def stats(self, user_id: str) -> Optional[Row]:
+        """The user's ``user_stats`` row, or ``None`` if they have never traded."""
+        ...
+
+    async def rebuild_stats(self, user_id: Optional[str] = None) -> int:
+        """Recompute ``user_positions`` and ``user_stats`` from ``trades``; returns the stats rows rebuilt."""
+        ...
+
+    async def positions(self, *, limit: int, after: Optional[tuple[str, str]]) -> list[Row]:
+        """Up to ``limit`` ``user_positions`` rows after ``after``, in ``(user_id, market_id)`` order."""
+        ...
+
+    async def upsert(self, record: Row) -> None:
+        ...
+
+    async def upsert_many(self, records: Sequence[Row]) -> int:
+        ...
+
+
+@dataclass(slots=True)
+class Storage:
+    markets: MarketRepository
+    trades: TradeRepository
+    profiles: ProfileRepository
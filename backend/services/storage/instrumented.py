@@ -0,0 +1,44 @@
+"""Storage wrapper that reports every repository call to ``core.metrics``.
+
+Supabase storage is instrumented at the client (``core.supabase.InstrumentedAsyncClient``)
+so each PostgREST request is labelled with its table. SQLite has no client to wrap, so its
+repositories are timed instead; every awaited repository method is one round-trip, the
+same unit ``benchmarks/counting_storage.py`` counts, labelled with the repository name.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from core.metrics import observe_query
+from services.storage.base import Storage
+
+
+class TimedRepository:
+    def __init__(self, inner: Any, table: str) -> None:
+        self._inner = inner
+        self._table = table
+
+    def __getattr__(self, attribute: str) -> Any:
+        target = getattr(self._inner, attribute)
+        if not callable(target):
+            return target
+        return self._timed(target)
+
+    def _timed(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                observe_query(self._table, time.perf_counter() - started)
+
+        return call
+
+
+def instrument_storage(storage: Storage) -> Storage:
+    return Storage(
+        markets=TimedRepository(storage.markets, "markets"),
+        trades=TimedRepository(storage.trades, "trades"),
+        profiles=TimedRepository(storage.profiles, "profiles"),
+    )
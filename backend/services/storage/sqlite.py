@@ -0,0 +1,634 @@
+"""Storage backed by a local SQLite database, for offline runs, load tests and benchmarks.
+
+The schema mirrors ``scripts/create_tables.sql`` (minus auth and RLS), including the trigger
+that folds each trade into ``market_depth``. Use ``:memory:`` for a throwaway database.
+Every query runs in a worker thread, so a slow statement or a busy write lock never
+blocks the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional, Sequence
+
+from core.metrics import span
+from services.pricing import price_orders
+from services.storage.base import Booking, Keyset, Row, Storage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    email TEXT,
+    display_name TEXT,
+    joined_at TEXT,
+    last_seen_at TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS markets (
+    id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open' CHECK (status IN ('open', 'closed', 'resolved', 'suspended')),
+    resolution_date TEXT NOT NULL,
+    description TEXT,
+    tags TEXT NOT NULL DEFAULT '[]',
+    baseline_probability REAL DEFAULT 0.5,
+    initial_liquidity REAL DEFAULT 500.0,
+    pricing_engine TEXT NOT NULL DEFAULT 'blended' CHECK (pricing_engine IN ('blended', 'lmsr')),
+    settlement_dates TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS trades (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    market_id TEXT NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    side TEXT NOT NULL CHECK (side IN ('YES', 'NO')),
+    price_cents REAL NOT NULL,
+    shares REAL NOT NULL,
+    stake REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS market_depth (
+    market_id TEXT PRIMARY KEY REFERENCES markets(id) ON DELETE CASCADE,
+    yes_shares REAL NOT NULL DEFAULT 0,
+    no_shares REAL NOT NULL DEFAULT 0,
+    total_volume REAL NOT NULL DEFAULT 0,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    last_trade_at TEXT,
+    updated_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_markets_created_at_id ON markets(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trades_created_at_id ON trades(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trades_user_created_at_id ON trades(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trades_market_created_at_id ON trades(market_id, created_at DESC, id DESC);
+
+CREATE TRIGGER IF NOT EXISTS apply_trade_to_market_depth AFTER INSERT ON trades
+BEGIN
+    INSERT INTO market_depth (market_id, yes_shares, no_shares, total_volume, trade_count, last_trade_at, updated_at)
+    VALUES (
+        NEW.market_id,
+        CASE WHEN NEW.side = 'YES' THEN NEW.shares ELSE 0 END,
+        CASE WHEN NEW.side = 'NO' THEN NEW.shares ELSE 0 END,
+        NEW.stake,
+        1,
+        NEW.created_at,
+        NEW.created_at
+    )
+    ON CONFLICT (market_id) DO UPDATE SET
+        yes_shares = yes_shares + excluded.yes_shares,
+        no_shares = no_shares + excluded.no_shares,
+        total_volume = total_volume + excluded.total_volume,
+        trade_count = trade_count + 1,
+        last_trade_at = MAX(COALESCE(last_trade_at, ''), excluded.last_trade_at),
+        updated_at = excluded.updated_at;
+END;
+
+CREATE TABLE IF NOT EXISTS market_prices (
+    trade_id TEXT PRIMARY KEY REFERENCES trades(id) ON DELETE CASCADE,
+    market_id TEXT NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    yes_price_cents REAL NOT NULL,
+    volume REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_prices_market_created_at ON market_prices(market_id, created_at);
+
+CREATE TABLE IF NOT EXISTS market_candles (
+    market_id TEXT NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    period TEXT NOT NULL CHECK (period IN ('1m', '1h', '1d')),
+    bucket_start TEXT NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    trade_count INTEGER NOT NULL,
+    open_at TEXT NOT NULL,
+    close_at TEXT NOT NULL,
+    PRIMARY KEY (market_id, period, bucket_start)
+);
+
+-- Timestamps are UTC ISO-8601 text, so truncating the string truncates the time
+CREATE TRIGGER IF NOT EXISTS record_market_price AFTER INSERT ON trades
+BEGIN
+    INSERT INTO market_prices (trade_id, market_id, yes_price_cents, volume, created_at)
+    VALUES (
+        NEW.id,
+        NEW.market_id,
+        CASE WHEN NEW.side = 'YES' THEN NEW.price_cents ELSE 100.0 - NEW.price_cents END,
+        NEW.stake,
+        NEW.created_at
+    );
+
+    INSERT INTO market_candles
+        (market_id, period, bucket_start, open, high, low, close, volume, trade_count, open_at, close_at)
+    SELECT
+        p.market_id,
+        b.period,
+        b.bucket_start,
+        p.yes_price_cents,
+        p.yes_price_cents,
+        p.yes_price_cents,
+        p.yes_price_cents,
+        p.volume,
+        1,
+        p.created_at,
+        p.created_at
+    FROM market_prices p
+    CROSS JOIN (
+        SELECT '1m' AS period, substr(NEW.created_at, 1, 16) || ':00.000000+00:00' AS bucket_start
+        UNION ALL SELECT '1h', substr(NEW.created_at, 1, 13) || ':00:00.000000+00:00'
+        UNION ALL SELECT '1d', substr(NEW.created_at, 1, 10) || 'T00:00:00.000000+00:00'
+    ) b
+    WHERE p.trade_id = NEW.id
+    ON CONFLICT (market_id, period, bucket_start) DO UPDATE SET
+        open = CASE WHEN excluded.open_at < open_at THEN excluded.open ELSE open END,
+        high = MAX(high, excluded.high),
+        low = MIN(low, excluded.low),
+        close = CASE WHEN excluded.close_at >= close_at THEN excluded.close ELSE close END,
+        volume = volume + excluded.volume,
+        trade_count = trade_count + 1,
+        open_at = MIN(open_at, excluded.open_at),
+        close_at = MAX(close_at, excluded.close_at);
+END;
+
+CREATE TABLE IF NOT EXISTS user_positions (
+    user_id TEXT NOT NULL,
+    market_id TEXT NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+    yes_shares REAL NOT NULL DEFAULT 0,
+    no_shares REAL NOT NULL DEFAULT 0,
+    total_staked REAL NOT NULL DEFAULT 0,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, market_id)
+);
+
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    total_trades INTEGER NOT NULL DEFAULT 0,
+    open_positions INTEGER NOT NULL DEFAULT 0,
+    total_staked REAL NOT NULL DEFAULT 0,
+    realised_pnl REAL NOT NULL DEFAULT 0,
+    last_trade_at TEXT,
+    updated_at TEXT
+);
+
+-- Writes are serialised, so checking for the position before upserting it cannot race
+CREATE TRIGGER IF NOT EXISTS apply_trade_to_user_stats AFTER INSERT ON trades
+BEGIN
+    INSERT INTO user_stats (user_id, total_trades, open_positions, total_staked, last_trade_at, updated_at)
+    VALUES (
+        NEW.user_id,
+        1,
+        NOT EXISTS (SELECT 1 FROM user_positions WHERE user_id = NEW.user_id AND market_id = NEW.market_id),
+        NEW.stake,
+        NEW.created_at,
+        NEW.created_at
+    )
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_trades = total_trades + 1,
+        open_positions = open_positions + excluded.open_positions,
+        total_staked = total_staked + excluded.total_staked,
+        last_trade_at = MAX(COALESCE(last_trade_at, ''), excluded.last_trade_at),
+        updated_at = excluded.updated_at;
+
+    INSERT INTO user_positions (user_id, market_id, yes_shares, no_shares, total_staked, trade_count)
+    VALUES (
+        NEW.user_id,
+        NEW.market_id,
+        CASE WHEN NEW.side = 'YES' THEN NEW.shares ELSE 0 END,
+        CASE WHEN NEW.side = 'NO' THEN NEW.shares ELSE 0 END,
+        NEW.stake,
+        1
+    )
+    ON CONFLICT (user_id, market_id) DO UPDATE SET
+        yes_shares = yes_shares + excluded.yes_shares,
+        no_shares = no_shares + excluded.no_shares,
+        total_staked = total_staked + excluded.total_staked,
+        trade_count = trade_count + 1;
+END;
+"""
+
+_JSON_COLUMNS = {"markets": ("tags", "settlement_dates")}
+_COLUMNS = {
+    "profiles": ("id", "email", "display_name", "joined_at", "last_seen_at", "created_at", "updated_at"),
+    "markets": (
+        "id",
+        "question",
+        "category",
+        "status",
+        "resolution_date",
+        "description",
+        "tags",
+        "baseline_probability",
+        "initial_liquidity",
+        "pricing_engine",
+        "settlement_dates",
+        "created_at",
+        "updated_at",
+    ),
+    "trades": ("id", "user_id", "market_id", "side", "price_cents", "shares", "stake", "created_at"),
+}
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER on older builds
+_IN_CHUNK_SIZE = 500
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _chunks(values: Sequence[str]) -> Iterator[Sequence[str]]:
+    for start in range(0, len(values), _IN_CHUNK_SIZE):
+        yield values[start : start + _IN_CHUNK_SIZE]
+
+
+def _fetch_in(db: SqliteDatabase, table: str, select: str, column: str, values: Sequence[str]) -> list[Row]:
+    """``select`` filtered to ``column IN values``, one query per chunk. Blocking."""
+    rows: list[Row] = []
+    for chunk in _chunks(values):
+        placeholders = ", ".join("?" for _ in chunk)
+        rows.extend(db.fetch_all(table, f"{select} WHERE {column} IN ({placeholders})", chunk))
+    return rows
+
+
+class SqliteDatabase:
+    """A single shared connection, serialised by ``lock``.
+
+    Its methods block; repositories call them through ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        with self.lock:
+            self.connection.execute("PRAGMA foreign_keys = ON")
+            if path != ":memory:":
+                self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.executescript(SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the database write lock until the block commits (or rolls back on error)."""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def fetch_all(self, table: str, sql: str, params: Sequence[Any] = ()) -> list[Row]:
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [self.decode(table, row) for row in rows]
+
+    def fetch_one(self, table: str, sql: str, params: Sequence[Any] = ()) -> Optional[Row]:
+        with self.lock:
+            row = self.connection.execute(sql, params).fetchone()
+        return self.decode(table, row) if row is not None else None
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        with self.lock:
+            return self.connection.execute(sql, params).rowcount
+
+    def insert(self, table: str, record: Row) -> Row:
+        row = self.encode(table, record)
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        created = self.fetch_one(
+            table, f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) RETURNING *", list(row.values())
+        )
+        assert created is not None
+        return created
+
+    def insert_many(self, table: str, records: Sequence[Row], conflict: str = "") -> int:
+        """Insert rows that share one set of columns in a single transaction."""
+        if not records:
+            return 0
+        with self.transaction():
+            return self.insert_rows(table, records, conflict)
+
+    def insert_rows(self, table: str, records: Sequence[Row], conflict: str = "") -> int:
+        """``executemany`` insert for use inside an open transaction."""
+        rows = [self.encode(table, record) for record in records]
+        columns = list(rows[0])
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) {conflict}"
+        with self.lock:
+            self.connection.executemany(sql, [[row[column] for column in columns] for row in rows])
+        return len(rows)
+
+    def encode(self, table: str, record: Row) -> Row:
+        unknown = set(record) - set(_COLUMNS[table])
+        if unknown:
+            raise ValueError(f"Unknown {table} columns: {', '.join(sorted(unknown))}")
+        json_columns = _JSON_COLUMNS.get(table, ())
+        return {
+            column: json.dumps(value) if column in json_columns and value is not None else value
+            for column, value in record.items()
+        }
+
+    def decode(self, table: str, row: sqlite3.Row) -> Row:
+        decoded = dict(row)
+        for column in _JSON_COLUMNS.get(table, ()):
+            if isinstance(decoded.get(column), str):
+                decoded[column] = json.loads(decoded[column])
+        return decoded
+
+
+def _keyset_clause(after: Optional[Keyset], clauses: list[str], params: list[Any]) -> None:
+    if after:
+        created_at, row_id = after
+        clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+        params.extend([created_at, created_at, row_id])
+
+
+def _where(clauses: list[str]) -> str:
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+class SqliteMarketRepository:
+    def __init__(self, db: SqliteDatabase) -> None:
+        self.db = db
+
+    async def page(
+        self,
+        *,
+        category: Optional[str],
+        status: Optional[str],
+        limit: int,
+        after: Optional[Keyset],
+    ) -> list[Row]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        _keyset_clause(after, clauses, params)
+        sql = f"SELECT * FROM markets {_where(clauses)} ORDER BY created_at DESC, id DESC LIMIT ?"
+        return await asyncio.to_thread(self.db.fetch_all, "markets", sql, [*params, limit])
+
+    async def get(self, market_id: str) -> Optional[Row]:
+        return await asyncio.to_thread(self.db.fetch_one, "markets", "SELECT * FROM markets WHERE id = ?", [market_id])
+
+    async def get_many(self, market_ids: Sequence[str]) -> list[Row]:
+        return await asyncio.to_thread(_fetch_in, self.db, "markets", "SELECT * FROM markets", "id", list(market_ids))
+
+    async def insert(self, record: Row) -> Optional[Row]:
+        now = _now()
+        return await asyncio.to_thread(
+            self.db.insert, "markets", {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **record}
+        )
+
+    async def insert_many(self, records: Sequence[Row]) -> int:
+        now = _now()
+        return await asyncio.to_thread(
+            self.db.insert_many,
+            "markets",
+            [{"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **record} for record in records],
+        )
+
+    async def update(self, market_id: str, changes: Row) -> Optional[Row]:
+        row = self.db.encode("markets", {**changes, "updated_at": _now()})
+        assignments = ", ".join(f"{column} = ?" for column in row)
+        return await asyncio.to_thread(
+            self.db.fetch_one,
+            "markets",
+            f"UPDATE markets SET {assignments} WHERE id = ? RETURNING *",
+            [*row.values(), market_id],
+        )
+
+    async def depths(self, market_ids: Sequence[str]) -> list[Row]:
+        return await asyncio.to_thread(
+            _fetch_in,
+            self.db,
+            "market_depth",
+            "SELECT market_id, yes_shares, no_shares, total_volume, updated_at FROM market_depth",
+            "market_id",
+            list(market_ids),
+        )
+
+    async def candles(
+        self, market_id: str, *, period: str, start: Optional[str], end: Optional[str], limit: int
+    ) -> list[Row]:
+        sql = (
+            "SELECT bucket_start, open, high, low, close, volume, trade_count FROM market_candles "
+            "WHERE market_id = ? AND period = ?"
+        )
+        params: list[Any] = [market_id, period]
+        if start:
+            sql += " AND bucket_start >= ?"
+            params.append(start)
+        if end:
+            sql += " AND bucket_start < ?"
+            params.append(end)
+        return await asyncio.to_thread(
+            self.db.fetch_all, "market_candles", sql + " ORDER BY bucket_start DESC LIMIT ?", [*params, limit]
+        )
+
+    async def rebuild_depth(self, market_id: Optional[str] = None) -> int:
+        return await asyncio.to_thread(self._rebuild_depth, market_id)
+
+    def _rebuild_depth(self, market_id: Optional[str]) -> int:
+        scope = "WHERE market_id = ?" if market_id else ""
+        params = [market_id] if market_id else []
+        with self.db.transaction():
+            self.db.execute(f"DELETE FROM market_depth {scope}", params)
+            rebuilt = self.db.execute(
+                "INSERT INTO market_depth "
+                "(market_id, yes_shares, no_shares, total_volume, trade_count, last_trade_at, updated_at) "
+                "SELECT market_id, "
+                "COALESCE(SUM(CASE WHEN side = 'YES' THEN shares END), 0), "
+                "COALESCE(SUM(CASE WHEN side = 'NO' THEN shares END), 0), "
+                "COALESCE(SUM(stake), 0), COUNT(*), MAX(created_at), ? "
+                f"FROM trades {scope} GROUP BY market_id",
+                [_now(), *params],
+            )
+        return rebuilt
+
+
+class SqliteTradeRepository:
+    def __init__(self, db: SqliteDatabase) -> None:
+        self.db = db
+
+    async def insert(self, record: Row) -> Optional[Row]:
+        return await asyncio.to_thread(
+            self.db.insert, "trades", {"id": str(uuid.uuid4()), "created_at": _now(), **record}
+        )
+
+    async def insert_many(self, records: Sequence[Row]) -> int:
+        now = _now()
+        return await asyncio.to_thread(
+            self.db.insert_many, "trades", [{"id": str(uuid.uuid4()), "created_at": now, **record} for record in records]
+        )
+
+    async def book_many(self, *, user_id: str, orders: Sequence[Row]) -> list[Booking]:
+        if not orders:
+            return []
+        return await asyncio.to_thread(self._book_many, user_id, orders)
+
+    def _book_many(self, user_id: str, orders: Sequence[Row]) -> list[Booking]:
+        market_ids = list(dict.fromkeys(order["market_id"] for order in orders))
+        # BEGIN IMMEDIATE takes the write lock up front, standing in for FOR UPDATE on depth rows
+        with self.db.transaction():
+            markets = {
+                row["id"]: row
+                for row in _fetch_in(
+                    self.db,
+                    "markets",
+                    "SELECT id, baseline_probability, initial_liquidity, pricing_engine FROM markets",
+                    "id",
+                    market_ids,
+                )
+            }
+            depths = {
+                row["market_id"]: row
+                for row in _fetch_in(
+                    self.db, "market_depth", "SELECT market_id, yes_shares, no_shares FROM market_depth", "market_id", market_ids
+                )
+            }
+            known = [order for order in orders if order["market_id"] in markets]
+            with span("pricing"):
+                priced = iter(price_orders(markets, depths, known))
+            now = _now()
+            bookings = []
+            for order in orders:
+                if order["market_id"] not in markets:
+                    bookings.append(Booking(market_found=False))
+                    continue
+                trade = next(priced)
+                if trade is not None:
+                    trade = {"id": str(uuid.uuid4()), "user_id": user_id, **trade, "created_at": now}
+                bookings.append(Booking(trade=trade))
+            trades = [booking.trade for booking in bookings if booking.trade is not None]
+            if trades:
+                self.db.insert_rows("trades", trades)
+        return bookings
+
+    async def page(
+        self,
+        *,
+        user_id: Optional[str],
+        market_id: Optional[str],
+        limit: int,
+        after: Optional[Keyset],
+        columns: Optional[Sequence[str]] = None,
+    ) -> list[Row]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if user_id:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if market_id:
+            clauses.append("market_id = ?")
+            params.append(market_id)
+        _keyset_clause(after, clauses, params)
+        sql = (
+            f"SELECT {self._select_list(columns)} FROM trades {_where(clauses)} "
+            "ORDER BY created_at DESC, id DESC LIMIT ?"
+        )
+        return await asyncio.to_thread(self.db.fetch_all, "trades", sql, [*params, limit])
+
+    def _select_list(self, columns: Optional[Sequence[str]]) -> str:
+        if not columns:
+            return "*"
+        unknown = set(columns) - set(_COLUMNS["trades"])
+        if unknown:
+            raise ValueError(f"Unknown trades columns: {', '.join(sorted(unknown))}")
+        return ", ".join(columns)
+
+
+class SqliteProfileRepository:
+    def __init__(self, db: SqliteDatabase) -> None:
+        self.db = db
+
+    async def get(self, user_id: str) -> Optional[Row]:
+        return await asyncio.to_thread(self.db.fetch_one, "profiles", "SELECT * FROM profiles WHERE id = ?", [user_id])
+
+    async def get_many(self, user_ids: Sequence[str]) -> list[Row]:
+        return await asyncio.to_thread(_fetch_in, self.db, "profiles", "SELECT * FROM profiles", "id", list(user_ids))
+
+    async def stats(self, user_id: str) -> Optional[Row]:
+        return await asyncio.to_thread(
+            self.db.fetch_one, "user_stats", "SELECT * FROM user_stats WHERE user_id = ?", [user_id]
+        )
+
+    async def rebuild_stats(self, user_id: Optional[str] = None) -> int:
+        return await asyncio.to_thread(self._rebuild_stats, user_id)
+
+    def _rebuild_stats(self, user_id: Optional[str]) -> int:
+        scope = "WHERE user_id = ?" if user_id else ""
+        params = [user_id] if user_id else []
+        with self.db.transaction():
+            self.db.execute(f"DELETE FROM user_positions {scope}", params)
+            self.db.execute(f"DELETE FROM user_stats {scope}", params)
+            self.db.execute(
+                "INSERT INTO user_positions "
+                "(user_id, market_id, yes_shares, no_shares, total_staked, trade_count) "
+                "SELECT user_id, market_id, "
+                "COALESCE(SUM(CASE WHEN side = 'YES' THEN shares END), 0), "
+                "COALESCE(SUM(CASE WHEN side = 'NO' THEN shares END), 0), "
+                "COALESCE(SUM(stake), 0), COUNT(*) "
+                f"FROM trades {scope} GROUP BY user_id, market_id",
+                params,
+            )
+            rebuilt = self.db.execute(
+                "INSERT INTO user_stats "
+                "(user_id, total_trades, open_positions, total_staked, last_trade_at, updated_at) "
+                "SELECT user_id, COUNT(*), COUNT(DISTINCT market_id), COALESCE(SUM(stake), 0), MAX(created_at), ? "
+                f"FROM trades {scope} GROUP BY user_id",
+                [_now(), *params],
+            )
+        return rebuilt
+
+    async def positions(self, *, limit: int, after: Optional[tuple[str, str]]) -> list[Row]:
+        where, params = "", []
+        if after:
+            where = "WHERE user_id > ? OR (user_id = ? AND market_id > ?)"
+            params = [after[0], *after]
+        return await asyncio.to_thread(
+            self.db.fetch_all,
+            "user_positions",
+            "SELECT user_id, market_id, yes_shares, no_shares, total_staked, trade_count FROM user_positions "
+            f"{where} ORDER BY user_id, market_id LIMIT ?",
+            [*params, limit],
+        )
+
+    async def upsert(self, record: Row) -> None:
+        await self.upsert_many([record])
+
+    async def upsert_many(self, records: Sequence[Row]) -> int:
+        if not records:
+            return 0
+        now = _now()
+        rows = [{"created_at": now, **record, "updated_at": now} for record in records]
+        updates = ", ".join(
+            f"{column} = excluded.{column}" for column in rows[0] if column not in ("id", "created_at")
+        )
+        return await asyncio.to_thread(
+            self.db.insert_many, "profiles", rows, f"ON CONFLICT (id) DO UPDATE SET {updates}"
+        )
+
+
+def create_sqlite_storage(path: str = ":memory:") -> Storage:
+    db = SqliteDatabase(path)
+    return Storage(
+        markets=SqliteMarketRepository(db),
+        trades=SqliteTradeRepository(db),
+        profiles=SqliteProfileRepository(db),
+    )
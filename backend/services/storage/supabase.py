@@ -0,0 +1,235 @@
+"""Storage backed by Supabase's PostgREST API."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterator, Optional, Sequence
+
+from postgrest.types import ReturnMethod
+from supabase import AsyncClient
+
+from core.config import settings
+from services.storage.base import Booking, Keyset, Row, Storage
+
+# Ids per ``in.(...)`` filter: keeps request URLs short and each response under PostgREST's max-rows
+_IN_CHUNK_SIZE = 500
+
+
+def keyset_filter(after: Keyset) -> str:
+    """PostgREST ``or`` filter selecting rows after ``after`` in ``(created_at DESC, id DESC)`` order.
+
+    ``after`` is interpolated into the filter, so it must come from ``decode_cursor``,
+    which only lets a timestamp and a UUID through, or from a row storage returned.
+    """
+    created_at, row_id = after
+    return f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{row_id}")'
+
+
+def _pricing_settings() -> Row:
+    """The ``pricing_settings`` row the booking functions quote with, so SQL quotes match services/pricing.py."""
+    return {
+        "id": True,
+        "default_baseline": settings.pricing_baseline / 100.0,
+        "sensitivity": settings.pricing_sensitivity,
+        "floor_cents": settings.pricing_floor,
+        "ceiling_cents": settings.pricing_ceiling,
+    }
+
+
+def _chunks(values: Sequence[str]) -> Iterator[list[str]]:
+    for start in range(0, len(values), _IN_CHUNK_SIZE):
+        yield list(values[start : start + _IN_CHUNK_SIZE])
+
+
+async def _select_in(fetch: Callable[[list[str]], Awaitable[Any]], values: Sequence[str]) -> list[Row]:
+    """Rows of ``fetch`` run on each chunk of ``values``, concurrently, merged in chunk order."""
+    if not values:
+        return []
+    responses = await asyncio.gather(*(fetch(chunk) for chunk in _chunks(values)))
+    return [row for response in responses for row in response.data or []]
+
+
+def _first(data: Any) -> Optional[Row]:
+    if isinstance(data, list):
+        return data[0] if data else None
+    return data or None
+
+
+async def _insert_many(client: AsyncClient, table: str, records: Sequence[Row]) -> int:
+    if not records:
+        return 0
+    await client.table(table).insert(list(records), returning=ReturnMethod.minimal).execute()
+    return len(records)
+
+
+class SupabaseMarketRepository:
+    def __init__(self, client: AsyncClient) -> None:
+        self.client = client
+
+    async def page(
+        self,
+        *,
+        category: Optional[str],
+        status: Optional[str],
+        limit: int,
+        after: Optional[Keyset],
+    ) -> list[Row]:
+        query = self.client.table("markets").select("*")
+        if category:
+            query = query.eq("category", category)
+        if status:
+            query = query.eq("status", status)
+        if after:
+            query = query.or_(keyset_filter(after))
+        response = await query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        return response.data or []
+
+    async def get(self, market_id: str) -> Optional[Row]:
+        response = await self.client.table("markets").select("*").eq("id", market_id).limit(1).execute()
+        return _first(response.data)
+
+    async def get_many(self, market_ids: Sequence[str]) -> list[Row]:
+        return await _select_in(
+            lambda chunk: self.client.table("markets").select("*").in_("id", chunk).execute(), market_ids
+        )
+
+    async def insert(self, record: Row) -> Optional[Row]:
+        response = await self.client.table("markets").insert(record).execute()
+        return _first(response.data)
+
+    async def insert_many(self, records: Sequence[Row]) -> int:
+        return await _insert_many(self.client, "markets", records)
+
+    async def update(self, market_id: str, changes: Row) -> Optional[Row]:
+        response = await self.client.table("markets").update(changes).eq("id", market_id).execute()
+        return _first(response.data)
+
+    async def depths(self, market_ids: Sequence[str]) -> list[Row]:
+        return await _select_in(
+            lambda chunk: self.client.table("market_depth")
+            .select("market_id, yes_shares, no_shares, total_volume, updated_at")
+            .in_("market_id", chunk)
+            .execute(),
+            market_ids,
+        )
+
+    async def candles(
+        self, market_id: str, *, period: str, start: Optional[str], end: Optional[str], limit: int
+    ) -> list[Row]:
+        query = (
+            self.client.table("market_candles")
+            .select("bucket_start, open, high, low, close, volume, trade_count")
+            .eq("market_id", market_id)
+            .eq("period", period)
+        )
+        if start:
+            query = query.gte("bucket_start", start)
+        if end:
+            query = query.lt("bucket_start", end)
+        response = await query.order("bucket_start", desc=True).limit(limit).execute()
+        return response.data or []
+
+    async def rebuild_depth(self, market_id: Optional[str] = None) -> int:
+        response = await self.client.rpc("rebuild_market_depth", {"p_market_id": market_id}).execute()
+        return int(response.data or 0)
+
+
+class SupabaseTradeRepository:
+    def __init__(self, client: AsyncClient) -> None:
+        self.client = client
+        self._pricing_synced = False
+
+    async def insert(self, record: Row) -> Optional[Row]:
+        response = await self.client.table("trades").insert(record).execute()
+        return _first(response.data)
+
+    async def insert_many(self, records: Sequence[Row]) -> int:
+        return await _insert_many(self.client, "trades", records)
+
+    async def book_many(self, *, user_id: str, orders: Sequence[Row]) -> list[Booking]:
+        bookings = [Booking(market_found=False) for _ in orders]
+        if not orders:
+            return bookings
+        await self._sync_pricing()
+        response = await self.client.rpc("book_trades", {"p_user_id": user_id, "p_orders": list(orders)}).execute()
+        for row in response.data or []:
+            # Orders whose limit was not reached come back with only their ordinal set
+            ordinal = row.pop("ordinal")
+            bookings[ordinal] = Booking(trade=row if row.get("id") else None)
+        return bookings
+
+    async def _sync_pricing(self) -> None:
+        """Write this process's pricing settings for the booking functions, once."""
+        if self._pricing_synced:
+            return
+        await self.client.table("pricing_settings").upsert(
+            _pricing_settings(), returning=ReturnMethod.minimal
+        ).execute()
+        self._pricing_synced = True
+
+    async def page(
+        self,
+        *,
+        user_id: Optional[str],
+        market_id: Optional[str],
+        limit: int,
+        after: Optional[Keyset],
+        columns: Optional[Sequence[str]] = None,
+    ) -> list[Row]:
+        query = self.client.table("trades").select(", ".join(columns) if columns else "*")
+        if user_id:
+            query = query.eq("user_id", user_id)
+        if market_id:
+            query = query.eq("market_id", market_id)
+        if after:
+            query = query.or_(keyset_filter(after))
+        response = await query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        return response.data or []
+
+
+class SupabaseProfileRepository:
+    def __init__(self, client: AsyncClient) -> None:
+        self.client = client
+
+    async def get(self, user_id: str) -> Optional[Row]:
+        response = await self.client.table("profiles").select("*").eq("id", user_id).limit(1).execute()
+        return _first(response.data)
+
+    async def get_many(self, user_ids: Sequence[str]) -> list[Row]:
+        return await _select_in(
+            lambda chunk: self.client.table("profiles").select("*").in_("id", chunk).execute(), user_ids
+        )
+
+    async def stats(self, user_id: str) -> Optional[Row]:
+        response = await self.client.table("user_stats").select("*").eq("user_id", user_id).limit(1).execute()
+        return _first(response.data)
+
+    async def rebuild_stats(self, user_id: Optional[str] = None) -> int:
+        response = await self.client.rpc("rebuild_user_stats", {"p_user_id": user_id}).execute()
+        return int(response.data or 0)
+
+    async def positions(self, *, limit: int, after: Optional[tuple[str, str]]) -> list[Row]:
+        query = self.client.table("user_positions").select(
+            "user_id, market_id, yes_shares, no_shares, total_staked, trade_count"
+        )
+        if after:
+            user_id, market_id = after
+            query = query.or_(f'user_id.gt."{user_id}",and(user_id.eq."{user_id}",market_id.gt."{market_id}")')
+        response = await query.order("user_id").order("market_id").limit(limit).execute()
+        return response.data or []
+
+    async def upsert(self, record: Row) -> None:
+        await self.client.table("profiles").upsert(record).execute()
+
+    async def upsert_many(self, records: Sequence[Row]) -> int:
+        if not records:
+            return 0
+        await self.client.table("profiles").upsert(list(records), returning=ReturnMethod.minimal).execute()
+        return len(records)
+
+
+def create_supabase_storage(client: AsyncClient) -> Storage:
+    return Storage(
+        markets=SupabaseMarketRepository(client),
+        trades=SupabaseTradeRepository(client),
+        profiles=SupabaseProfileRepository(client),
+    )
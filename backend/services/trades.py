@@ -1,92 +1,429 @@
 from __future__ import annotations
 
+import logging
+import uuid
+from collections import Counter
+from dataclasses import asdict
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, AsyncIterator, Optional, Sequence, Union
 
 from fastapi import HTTPException, status
-from supabase import Client
 
-from schemas.market import MarketWithQuote
-from schemas.trade import TradeCreate, TradeListResponse, TradeRecord
+from core.config import settings
+from core.metrics import span
+from core.pagination import decode_cursor, paginate
+from schemas.order import RestingOrderRecord
+from schemas.trade import (
+    OrderResult,
+    TradeBatchResponse,
+    TradeBatchResult,
+    TradeCreate,
+    TradeCreateRequest,
+    TradeRecord,
+)
 from services.markets import MarketService
+from services.order_book import MatchSession, RestingOrder, opposite, order_book
+from services.quote_stream import quote_broker
+from services.storage import Storage
+
+logger = logging.getLogger(__name__)
+
+OrderRequest = Union[TradeCreate, TradeCreateRequest]
+
+# Why an order was rejected, and the status a single-order request fails with
+MARKET_NOT_FOUND = "Market not found"
+RESTING_LIMIT_REACHED = "Too many resting orders; cancel some before placing more"
+ORDER_BOOK_DISABLED = "The order book is disabled; limit orders the market maker cannot fill are not rested"
+BOOKING_FAILED = "Market maker unavailable; the unfilled part of the order was not booked"
+LIMIT_NOT_REACHED = "Limit price not reached; place the order through POST /orders to rest it on the book"
+_REJECTION_STATUS = {
+    MARKET_NOT_FOUND: status.HTTP_404_NOT_FOUND,
+    RESTING_LIMIT_REACHED: status.HTTP_409_CONFLICT,
+    ORDER_BOOK_DISABLED: status.HTTP_409_CONFLICT,
+    BOOKING_FAILED: status.HTTP_503_SERVICE_UNAVAILABLE,
+}
+
+# Remainders smaller than a cent are dropped rather than booked or rested
+_MIN_STAKE = 0.01
+
+_TRADE_COLUMNS = ("id", "user_id", "market_id", "side", "price_cents", "shares", "stake", "created_at")
+_TRADE_ALIASES = {name: info.alias or name for name, info in TradeRecord.model_fields.items()}
+
+
+def _timestamp(value: Any) -> Any:
+    """Stored ISO-8601 text as a datetime, so orjson renders it the way pydantic would."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
 
 
 class TradeService:
-    def __init__(self, supabase: Client) -> None:
-        self.supabase = supabase
-        self.market_service = MarketService(supabase)
+    def __init__(self, storage: Storage) -> None:
+        self.storage = storage
+        self.market_service = MarketService(storage)
 
-    def place_trade(self, payload: TradeCreate) -> TradeRecord:
-        market = self.market_service.get_market(payload.market_id)
-        execution_price = self._determine_price(market, payload)
-        shares = round((payload.stake / execution_price) * 100.0, 4)
+    async def place_trade(self, payload: TradeCreate) -> TradeRecord:
+        """Book one order with the market maker and return the single trade it produced.
 
-        record = {
-            "user_id": payload.user_id,
+        This is ``POST /trades``, whose clients expect exactly one trade back, so it skips the
+        order book: a fill against resting orders can come in several pieces, and a limit order
+        the market maker cannot fill would rest. ``place_order`` does both.
+        """
+        order = {
             "market_id": payload.market_id,
             "side": payload.side,
-            "price_cents": execution_price,
-            "shares": shares,
-            "stake": round(payload.stake, 2),
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "stake": payload.stake,
+            "limit_price_cents": payload.limit_price_cents,
         }
+        booking = (await self.storage.trades.book_many(user_id=payload.user_id, orders=[order]))[0]
+        if not booking.market_found:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=MARKET_NOT_FOUND)
+        if booking.trade is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=LIMIT_NOT_REACHED)
+
+        await self.market_service.invalidate_quotes([payload.market_id])
+        quote_broker.notify(payload.market_id, self.market_service)
+        return TradeRecord.model_validate(self._trade_payload(booking.trade))
+
+    async def place_order(self, payload: TradeCreate) -> OrderResult:
+        result = (await self.place_orders(payload.user_id, [payload]))[0]
+        if result.status == "rejected":
+            raise HTTPException(status_code=_REJECTION_STATUS[result.error], detail=result.error)
+        return result
 
-        # Insert trade and get the created record
-        response = self.supabase.table("trades").insert(record).execute()
-        if not response.data or len(response.data) == 0:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to book trade")
-        
-        created = response.data[0] if isinstance(response.data, list) else response.data
-        return TradeRecord.model_validate(
-            {
-                "id": created["id"],
-                "userId": created["user_id"],
-                "marketId": created["market_id"],
-                "side": created["side"],
-                "priceCents": created["price_cents"],
-                "shares": created["shares"],
-                "stake": created["stake"],
-                "createdAt": created["created_at"],
-            }
+    async def place_trades(self, user_id: str, orders: list[TradeCreateRequest]) -> TradeBatchResponse:
+        """Place a batch of orders for one user; orders on unknown markets are rejected without failing the batch."""
+        results = [
+            TradeBatchResult(
+                index=index,
+                status=result.status,
+                fills=result.fills,
+                resting_order=result.resting_order,
+                error=result.error,
+            )
+            for index, result in enumerate(await self.place_orders(user_id, orders))
+        ]
+        counts = Counter(result.status for result in results)
+        return TradeBatchResponse(
+            results=results,
+            filled=counts["filled"],
+            partially_filled=counts["partially_filled"],
+            resting=counts["resting"],
+            rejected=counts["rejected"],
         )
 
-    def list_trades(self, *, user_id: Optional[str] = None, market_id: Optional[str] = None) -> TradeListResponse:
-        query = self.supabase.table("trades").select("*").order("created_at", desc=True)
-        if user_id:
-            query = query.eq("user_id", user_id)
-        if market_id:
-            query = query.eq("market_id", market_id)
-
-        response = query.execute()
-        rows = response.data or []
-        items = [
-            TradeRecord.model_validate(
-                {
-                    "id": row["id"],
-                    "userId": row["user_id"],
-                    "marketId": row["market_id"],
-                    "side": row["side"],
-                    "priceCents": row["price_cents"],
-                    "shares": row["shares"],
-                    "stake": row["stake"],
-                    "createdAt": row["created_at"],
-                }
+    async def place_orders(self, user_id: str, orders: Sequence[OrderRequest]) -> list[OrderResult]:
+        """Fill orders from resting limit orders first and the market maker second.
+
+        The order book locks of the markets involved are held only while matching and
+        while resting: matched shares stay reserved on the book, so the trades are persisted
+        and the market maker is called with the locks released. Book fills go in with one
+        bulk insert and every remainder is booked with the market maker in one more storage
+        call, priced in submission order. Limit orders the market maker cannot fill at their
+        limit are matched once more against orders that rested in the meantime, and what is
+        left rests on the book, up to the order book's resting caps.
+
+        If the market maker call fails once book fills are persisted, the fills are still
+        reported and the unbooked remainders carry ``BOOKING_FAILED``.
+        """
+        limits = await self._matching_limits(orders)
+        now = datetime.now(timezone.utc).isoformat(timespec="microseconds")
+        session = order_book.session()
+        async with order_book.locked(order.market_id for order in orders):
+            matches = [
+                session.match(user_id, order.market_id, order.side, limit, order.stake)
+                for order, limit in zip(orders, limits)
+            ]
+        fills = [
+            [self._fill_row(user_id, order.market_id, order.side, fill.price_cents, fill.shares, now) for fill in order_fills]
+            for order, (order_fills, _) in zip(orders, matches)
+        ]
+        # Trades are the record of truth: persist them before the book forgets the makers
+        await self._persist_fills(session, [row for order_rows in fills for row in order_rows], now)
+        persisted = any(fills)
+
+        remainders = [(index, remaining) for index, (_, remaining) in enumerate(matches) if remaining >= _MIN_STAKE]
+        bookings = {}
+        errors: dict[int, str] = {}
+        if remainders:
+            try:
+                booked = await self.storage.trades.book_many(
+                    user_id=user_id,
+                    orders=[
+                        {
+                            "market_id": orders[index].market_id,
+                            "side": orders[index].side,
+                            "stake": remaining,
+                            "limit_price_cents": orders[index].limit_price_cents,
+                        }
+                        for index, remaining in remainders
+                    ],
+                )
+            except Exception:
+                if not persisted:
+                    raise
+                # The book fills above are already persisted and their makers consumed
+                logger.exception("Booking %d order remainders failed after book fills", len(remainders))
+                errors.update((index, BOOKING_FAILED) for index, _ in remainders)
+            else:
+                bookings = {index: booking for (index, _), booking in zip(remainders, booked)}
+        for index, booking in bookings.items():
+            if not booking.market_found:
+                errors[index] = MARKET_NOT_FOUND
+            elif booking.trade is not None:
+                fills[index].append(booking.trade)
+
+        unfilled = [
+            (index, remaining)
+            for index, remaining in remainders
+            if index in bookings and bookings[index].market_found and bookings[index].trade is None
+        ]
+        rested = await self._rest_remainders(user_id, orders, unfilled, fills, errors, now)
+
+        results: list[OrderResult] = []
+        for index, order in enumerate(orders):
+            error = errors.get(index)
+            rest = rested.get(index)
+            if error is not None and not fills[index]:
+                results.append(OrderResult(status="rejected", error=error))
+                continue
+            if fills[index] and (rest or error):
+                outcome = "partially_filled"
+            else:
+                outcome = "resting" if rest else "filled"
+            with span("validation"):
+                results.append(
+                    OrderResult(
+                        status=outcome,
+                        fills=[TradeRecord.model_validate(self._trade_payload(row)) for row in fills[index]],
+                        resting_order=RestingOrderRecord.model_validate(asdict(rest)) if rest else None,
+                        error=error,
+                    )
+                )
+
+        traded = {order.market_id for order, result in zip(orders, results) if result.fills}
+        await self.market_service.invalidate_quotes(traded)
+        for market_id in traded:
+            quote_broker.notify(market_id, self.market_service)
+        return results
+
+    async def _rest_remainders(
+        self,
+        user_id: str,
+        orders: Sequence[OrderRequest],
+        unfilled: list[tuple[int, float]],
+        fills: list[list[dict[str, Any]]],
+        errors: dict[int, str],
+        now: str,
+    ) -> dict[int, RestingOrder]:
+        """Rest the ``unfilled`` limit order remainders, by order index.
+
+        Orders that rested on these markets while the remainders were being booked may
+        cross them, so each remainder is matched against the book again before it rests.
+        Those fills are added to ``fills``, refusals to ``errors``.
+        """
+        if not unfilled:
+            return {}
+        session = order_book.session()
+        resting: dict[int, RestingOrder] = {}
+        late_fills: dict[int, list[dict[str, Any]]] = {}
+        async with order_book.locked(orders[index].market_id for index, _ in unfilled):
+            for index, remaining in unfilled:
+                order = orders[index]
+                order_fills, remaining = session.match(
+                    user_id, order.market_id, order.side, order.limit_price_cents, remaining
+                )
+                late_fills[index] = [
+                    self._fill_row(user_id, order.market_id, order.side, fill.price_cents, fill.shares, now)
+                    for fill in order_fills
+                ]
+                if remaining < _MIN_STAKE:
+                    continue
+                candidate = RestingOrder(
+                    id=str(uuid.uuid4()),
+                    user_id=user_id,
+                    market_id=order.market_id,
+                    side=order.side,
+                    limit_price_cents=order.limit_price_cents,
+                    shares=round(remaining / order.limit_price_cents * 100.0, 4),
+                    created_at=now,
+                )
+                if order_book.can_rest(candidate, list(resting.values())):
+                    resting[index] = candidate
+                else:
+                    errors[index] = ORDER_BOOK_DISABLED if not order_book.enabled else RESTING_LIMIT_REACHED
+            await order_book.rest(list(resting.values()))
+
+        try:
+            await self._persist_fills(session, [row for rows in late_fills.values() for row in rows], now)
+        except Exception:
+            # The remainders rested already; the shares these fills would have taken are dropped
+            logger.exception("Persisting fills against newly rested orders failed")
+            for index, rows in late_fills.items():
+                if rows:
+                    errors[index] = BOOKING_FAILED
+        else:
+            for index, rows in late_fills.items():
+                fills[index].extend(rows)
+        return resting
+
+    async def _persist_fills(self, session: MatchSession, rows: list[dict[str, Any]], now: str) -> None:
+        """Insert the incoming orders' fill ``rows`` and their makers' side, then consume the makers.
+
+        On failure nothing is consumed and the session's reserved shares go back on the book.
+        """
+        rows = rows + [
+            self._fill_row(
+                fill.maker.user_id, fill.maker.market_id, fill.maker.side, fill.maker.limit_price_cents, fill.shares, now
             )
-            for row in rows
+            for fill in session.fills
+        ]
+        if not rows:
+            return
+        try:
+            await self.storage.trades.insert_many(rows)
+        except Exception:
+            session.release()
+            raise
+        await session.commit()
+
+    async def list_resting_orders(self, user_id: str) -> list[RestingOrderRecord]:
+        orders = await order_book.orders_for_user(user_id)
+        return [RestingOrderRecord.model_validate(asdict(order)) for order in orders]
+
+    async def cancel_order(self, user_id: str, order_id: str) -> RestingOrderRecord:
+        cancelled = await order_book.cancel(order_id, user_id)
+        if cancelled is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+        return RestingOrderRecord.model_validate(asdict(cancelled))
+
+    async def _matching_limits(self, orders: Sequence[OrderRequest]) -> list[Optional[float]]:
+        """Price each order may cross the book at: its own limit, or the market maker's quote.
+
+        Market orders only take resting orders that beat the market maker, so markets with
+        opposing resting orders are quoted first; every other market order skips the book.
+        """
+        contested = [
+            order.market_id
+            for order in orders
+            if order.limit_price_cents is None and order_book.has_resting(order.market_id, opposite(order.side))
         ]
-        return TradeListResponse(items=items, count=len(items))
+        quotes = await self.market_service.get_markets(contested) if contested else {}
+        limits: list[Optional[float]] = []
+        for order in orders:
+            market = quotes.get(order.market_id)
+            if order.limit_price_cents is not None or market is None:
+                limits.append(order.limit_price_cents)
+            else:
+                limits.append(market.quote.yes_price_cents if order.side == "YES" else market.quote.no_price_cents)
+        return limits
+
+    async def list_trades(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        market_id: Optional[str] = None,
+        limit: int = settings.page_default_limit,
+        cursor: Optional[str] = None,
+        fields: Optional[set[str]] = None,
+    ) -> dict[str, Any]:
+        """One page of trades in the ``TradeListResponse`` shape, ready for ``ORJSONResponse``.
 
-    def _determine_price(self, market: MarketWithQuote, payload: TradeCreate) -> float:
-        quote = market.quote
-        if payload.side == "YES":
-            market_price = quote.yes_price_cents
+        Rows come straight from the trades table, so they are renamed to the API's fields
+        rather than validated into a ``TradeRecord`` each; only ``createdAt`` is parsed, so
+        it renders exactly as the model would.
+        """
+        # TradeRecord field names match the trades columns, so sparse fields project directly
+        columns = sorted(fields | {"id", "created_at"}) if fields else None
+        rows, next_cursor = await self._fetch_page(
+            user_id=user_id, market_id=market_id, limit=limit, cursor=cursor, columns=columns
+        )
+        if fields:
+            items = [
+                {
+                    _TRADE_ALIASES[field]: _timestamp(row[field]) if field == "created_at" else row[field]
+                    for field in fields
+                }
+                for row in rows
+            ]
         else:
-            market_price = quote.no_price_cents
-
-        if payload.limit_price_cents is not None:
-            if payload.side == "YES" and payload.limit_price_cents < market_price:
-                # Will execute at limit if price is better for user
-                return payload.limit_price_cents
-            if payload.side == "NO" and payload.limit_price_cents < market_price:
-                return payload.limit_price_cents
-        return market_price
+            items = [self._trade_item(row) for row in rows]
+        return {"items": items, "count": len(items), "nextCursor": next_cursor}
+
+    async def iter_trades(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        market_id: Optional[str] = None,
+        page_size: int = settings.export_page_size,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Walk the full trade history page by page, yielding API-shaped rows.
+
+        Only one page is held in memory at a time, so exports stay flat in memory however
+        long the history is.
+        """
+        cursor: Optional[str] = None
+        while True:
+            rows, cursor = await self._fetch_page(
+                user_id=user_id, market_id=market_id, limit=page_size, cursor=cursor, columns=_TRADE_COLUMNS
+            )
+            if rows:
+                yield [self._trade_payload(row) for row in rows]
+            if cursor is None:
+                return
+
+    async def _fetch_page(
+        self,
+        *,
+        user_id: Optional[str],
+        market_id: Optional[str],
+        limit: int,
+        cursor: Optional[str],
+        columns: Optional[Sequence[str]],
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        rows = await self.storage.trades.page(
+            user_id=user_id,
+            market_id=market_id,
+            limit=limit + 1,
+            after=decode_cursor(cursor) if cursor else None,
+            columns=columns,
+        )
+        return paginate(rows, limit)
+
+    def _fill_row(
+        self, user_id: str, market_id: str, side: str, price_cents: float, shares: float, created_at: str
+    ) -> dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "market_id": market_id,
+            "side": side,
+            "price_cents": price_cents,
+            "shares": shares,
+            "stake": round(shares * price_cents / 100.0, 2),
+            "created_at": created_at,
+        }
+
+    def _trade_item(self, row: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": row["id"],
+            "userId": row["user_id"],
+            "marketId": row["market_id"],
+            "side": row["side"],
+            "priceCents": row["price_cents"],
+            "shares": row["shares"],
+            "stake": row["stake"],
+            "createdAt": _timestamp(row["created_at"]),
+        }
+
+    def _trade_payload(self, row: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": row["id"],
+            "userId": row["user_id"],
+            "marketId": row["market_id"],
+            "side": row["side"],
+            "priceCents": row["price_cents"],
+            "shares": row["shares"],
+            "stake": row["stake"],
+            "createdAt": row["created_at"],
+        }
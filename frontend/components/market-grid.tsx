@@ -1,6 +1,6 @@
 "use client"
 
-import { useEffect, useState } from "react"
+import { useEffect, useMemo, useState } from "react"
 import { MarketCard } from "@/components/market-card"
 import type { MarketWithQuote } from "@/lib/api"
 import { marketsApi } from "@/lib/api"
@@ -11,40 +11,55 @@ interface MarketGridProps {
 }
 
 export function MarketGrid({ category, searchQuery = "" }: MarketGridProps) {
-  const [markets, setMarkets] = useState<MarketWithQuote[]>([])
+  const [allMarkets, setAllMarkets] = useState<MarketWithQuote[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
   useEffect(() => {
+    let cancelled = false
+
     async function fetchMarkets() {
       try {
         setLoading(true)
         setError(null)
-        const response = await marketsApi.listMarkets({
-          category: category || undefined,
-          status: "open",
-        })
-        
-        // Filter by search query client-side
-        let filtered = response.items
-        if (searchQuery.trim()) {
-          filtered = filtered.filter(
-            (m) =>
-              m.question.toLowerCase().includes(searchQuery.toLowerCase()) ||
-              m.category.toLowerCase().includes(searchQuery.toLowerCase())
-          )
-        }
-        
-        setMarkets(filtered)
+        // The API returns one page at a time; follow nextCursor so no market is left out,
+        // showing each page as it arrives
+        let cursor: string | undefined
+        let loaded: MarketWithQuote[] = []
+        do {
+          const response = await marketsApi.listMarkets({
+            category: category || undefined,
+            status: "open",
+            cursor,
+          })
+          if (cancelled) return
+          loaded = [...loaded, ...response.items]
+          setAllMarkets(loaded)
+          setLoading(false)
+          cursor = response.nextCursor ?? undefined
+        } while (cursor)
       } catch (err) {
+        if (cancelled) return
         setError(err instanceof Error ? err.message : "Failed to load markets")
       } finally {
-        setLoading(false)
+        if (!cancelled) setLoading(false)
       }
     }
 
     fetchMarkets()
-  }, [category, searchQuery])
+    return () => {
+      cancelled = true
+    }
+  }, [category])
+
+  // Filter by search query client-side
+  const markets = useMemo(() => {
+    const query = searchQuery.trim().toLowerCase()
+    if (!query) return allMarkets
+    return allMarkets.filter(
+      (m) => m.question.toLowerCase().includes(query) || m.category.toLowerCase().includes(query)
+    )
+  }, [allMarkets, searchQuery])
 
   if (loading) {
     return (
@@ -104,6 +104,7 @@ export interface MarketWithQuote {
   updatedAt: string
   description?: string
   tags: string[]
+  pricingEngine: "blended" | "lmsr"
   quote: {
     yesPriceCents: number
     noPriceCents: number
@@ -121,6 +122,7 @@ export interface MarketWithQuote {
 export interface MarketListResponse {
   items: MarketWithQuote[]
   count: number
+  nextCursor?: string | null
 }
 
 export interface MarketCreate {
@@ -130,13 +132,37 @@ export interface MarketCreate {
   description?: string
   tags?: string[]
   initialLiquidity?: number
+  pricingEngine?: "blended" | "lmsr"
+}
+
+export interface Candle {
+  start: string
+  open: number
+  high: number
+  low: number
+  close: number
+  volume: number
+  trades: number
+}
+
+export interface MarketHistoryResponse {
+  marketId: string
+  interval: "1m" | "1h" | "1d"
+  candles: Candle[]
 }
 
 export const marketsApi = {
-  async listMarkets(params?: { category?: string; status?: string }): Promise<MarketListResponse> {
+  async listMarkets(params?: {
+    category?: string
+    status?: string
+    limit?: number
+    cursor?: string
+  }): Promise<MarketListResponse> {
     const searchParams = new URLSearchParams()
     if (params?.category) searchParams.set("category", params.category)
     if (params?.status) searchParams.set("status", params.status)
+    if (params?.limit) searchParams.set("limit", String(params.limit))
+    if (params?.cursor) searchParams.set("cursor", params.cursor)
 
     const query = searchParams.toString()
     return fetchWithAuth(`/markets${query ? `?${query}` : ""}`)
@@ -146,6 +172,20 @@ export const marketsApi = {
     return fetchWithAuth(`/markets/${id}`)
   },
 
+  async getMarketHistory(
+    id: string,
+    params?: { interval?: "1m" | "1h" | "1d"; from?: string; to?: string; limit?: number },
+  ): Promise<MarketHistoryResponse> {
+    const searchParams = new URLSearchParams()
+    if (params?.interval) searchParams.set("interval", params.interval)
+    if (params?.from) searchParams.set("from", params.from)
+    if (params?.to) searchParams.set("to", params.to)
+    if (params?.limit) searchParams.set("limit", String(params.limit))
+
+    const query = searchParams.toString()
+    return fetchWithAuth(`/markets/${id}/history${query ? `?${query}` : ""}`)
+  },
+
   async createMarket(data: MarketCreate): Promise<MarketWithQuote> {
     return fetchWithAuth("/markets", {
       method: "POST",
@@ -180,22 +220,42 @@ export interface TradeRecord {
   createdAt: string
 }
 
+export interface RestingOrder {
+  id: string
+  userId: string
+  marketId: string
+  side: "YES" | "NO"
+  limitPriceCents: number
+  shares: number
+  createdAt: string
+}
+
+export interface OrderResult {
+  status: "filled" | "partially_filled" | "resting" | "rejected"
+  fills: TradeRecord[]
+  restingOrder?: RestingOrder | null
+  error?: string | null
+}
+
 export interface TradeListResponse {
   items: TradeRecord[]
   count: number
+  nextCursor?: string | null
 }
 
 export const tradesApi = {
-  async listTrades(params?: { marketId?: string }): Promise<TradeListResponse> {
+  async listTrades(params?: { marketId?: string; limit?: number; cursor?: string }): Promise<TradeListResponse> {
     const searchParams = new URLSearchParams()
     if (params?.marketId) searchParams.set("marketId", params.marketId)
+    if (params?.limit) searchParams.set("limit", String(params.limit))
+    if (params?.cursor) searchParams.set("cursor", params.cursor)
 
     const query = searchParams.toString()
     return fetchWithAuth(`/trades${query ? `?${query}` : ""}`)
   },
 
-  async placeTrade(data: TradeCreate): Promise<TradeRecord> {
-    return fetchWithAuth("/trades", {
+  async placeTrade(data: TradeCreate): Promise<OrderResult> {
+    return fetchWithAuth("/orders", {
       method: "POST",
       body: JSON.stringify(data),
     })
@@ -211,6 +271,7 @@ export interface UserProfile {
   lastSeenAt?: string
   totalTrades: number
   openPositions: number
+  totalStaked: number
   realisedPnL: number
 }
 
@@ -244,3 +305,35 @@ export const usersApi = {
   },
 }
 
+
+// Leaderboard API
+export interface LeaderboardEntry {
+  rank: number
+  userId: string
+  displayName?: string
+  pnl: number
+  roi: number
+  volume: number
+  trades: number
+}
+
+export interface LeaderboardResponse {
+  entries: LeaderboardEntry[]
+  totalTraders: number
+  markedAt?: string
+}
+
+export const leaderboardApi = {
+  async getLeaderboard(params?: { limit?: number; offset?: number }): Promise<LeaderboardResponse> {
+    const searchParams = new URLSearchParams()
+    if (params?.limit) searchParams.set("limit", String(params.limit))
+    if (params?.offset) searchParams.set("offset", String(params.offset))
+
+    const query = searchParams.toString()
+    return fetchWithAuth(`/leaderboard${query ? `?${query}` : ""}`)
+  },
+
+  async getMyStanding(): Promise<LeaderboardEntry> {
+    return fetchWithAuth("/leaderboard/me")
+  },
+}